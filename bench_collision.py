@@ -0,0 +1,44 @@
+import random
+import time
+
+import pong_engine
+
+
+SPEEDS = (5, 20, 50, 100, 250, 1000, 5000)
+
+
+def fire(rules, speed, shots=20000, seed=1):
+    """Удары в центр ракетки игрока 1: сколько мячей проскочило насквозь"""
+    rng = random.Random(seed)
+    tunneled = 0
+    ticks = 0
+    start = time.perf_counter()
+    for _ in range(shots):
+        state = pong_engine.new_state(rules)
+        state.paddle1_y = rng.randint(0, rules.height - rules.paddle_height)
+        # мяч стартует у правого края и летит так, чтобы прийти в ракетку
+        state.ball_x = rules.width - rules.paddle_x - rules.paddle_width - rules.ball_size
+        state.ball_y = state.paddle1_y + rng.uniform(0, rules.paddle_height - rules.ball_size)
+        state.ball_dx = -speed
+        state.ball_dy = 0.0
+        state.paddle2_y = -rules.height   # вторую ракетку убираем с поля
+        while True:
+            ticks += 1
+            scored = pong_engine.step(state)
+            if scored == 2:
+                tunneled += 1
+                break
+            if scored or state.ball_dx > 0:
+                break
+    elapsed = time.perf_counter() - start
+    return tunneled, ticks / elapsed
+
+
+if __name__ == '__main__':
+    for continuous in (False, True):
+        rules = pong_engine.Rules(pong_engine.SPEEDUP, continuous=continuous)
+        mode = "непрерывный" if continuous else "дискретный"
+        for speed in SPEEDS:
+            tunneled, rate = fire(rules, speed)
+            print(f"{mode:12} скорость {speed:5}: проскочило {tunneled:6}, "
+                  f"{rate:,.0f} тиков/с")
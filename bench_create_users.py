@@ -0,0 +1,34 @@
+import os
+import tempfile
+import time
+
+from pong_db import Database
+
+
+ACCOUNTS = 20000
+
+
+def one_by_one(accounts):
+    """Старый путь регистрации: user_exists, затем create_user"""
+    for username, password_hash in accounts:
+        if not Database.user_exists(username):
+            Database.create_user(username, password_hash)
+
+
+def main():
+    # хэши готовые: меряется только работа с базой, scrypt см. bench_password_hash.py
+    accounts = [(f"student{i}", f"hash{i}") for i in range(ACCOUNTS)]
+    for name, load in (('user_exists + create_user', one_by_one),
+                       ('create_users', Database.create_users)):
+        with tempfile.TemporaryDirectory() as tmp:
+            Database.configure(os.path.join(tmp, 'bench.db'))
+            Database.init_db()
+            start = time.perf_counter()
+            load(accounts)
+            elapsed = time.perf_counter() - start
+            Database.close()
+        print(f"{name:28} {ACCOUNTS / elapsed:10.0f} пользователей/с")
+
+
+if __name__ == '__main__':
+    main()
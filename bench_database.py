@@ -0,0 +1,54 @@
+import os
+import sqlite3
+import tempfile
+import time
+from datetime import datetime
+
+from pong_db import Database
+
+
+def insert_per_connection(path, count):
+    """Старый способ: новое соединение на каждую запись"""
+    for i in range(count):
+        conn = sqlite3.connect(path)
+        cursor = conn.cursor()
+        cursor.execute('''
+            INSERT INTO game_history (username, game_date, player1_score, player2_score, winner)
+            VALUES (?, ?, ?, ?, ?)
+        ''', ('bench', datetime.now().strftime('%Y-%m-%d %H:%M:%S'), 10, i % 10, 'Игрок 1'))
+        conn.commit()
+        conn.close()
+
+
+def insert_persistent(count):
+    for i in range(count):
+        Database.save_game_result('bench', 10, i % 10, 'Игрок 1')
+
+
+def bench(count=2000):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'bench.db')
+        Database.configure(path)
+        Database.init_db()
+
+        start = time.perf_counter()
+        insert_persistent(count)
+        persistent = count / (time.perf_counter() - start)
+
+        # сравнение в режиме rollback journal, как было до WAL
+        Database.close()
+        conn = sqlite3.connect(path)
+        conn.execute("PRAGMA journal_mode=DELETE")
+        conn.close()
+        start = time.perf_counter()
+        insert_per_connection(path, count)
+        per_connection = count / (time.perf_counter() - start)
+        Database.close()
+
+    print(f"соединение на запись: {per_connection:,.0f} вставок/с")
+    print(f"постоянное соединение + WAL: {persistent:,.0f} вставок/с "
+          f"(x{persistent / per_connection:.1f})")
+
+
+if __name__ == '__main__':
+    bench()
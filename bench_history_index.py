@@ -0,0 +1,64 @@
+import os
+import random
+import tempfile
+import time
+
+import pong_db
+from pong_db import Database
+
+
+ROWS = 1_000_000
+USERS = 2000
+
+
+def fill(conn, rows=ROWS, users=USERS, seed=1):
+    rng = random.Random(seed)
+
+    def generate():
+        for _ in range(rows):
+            day = rng.randrange(1, 29)
+            second = rng.randrange(86400)
+            date = f"2024-{rng.randrange(1, 13):02d}-{day:02d} " \
+                   f"{second // 3600:02d}:{second // 60 % 60:02d}:{second % 60:02d}"
+            score = rng.randrange(10)
+            if rng.random() < 0.5:
+                yield f"user{rng.randrange(users)}", date, 10, score, 'Игрок 1'
+            else:
+                yield f"user{rng.randrange(users)}", date, score, 10, 'Игрок 2'
+
+    with conn:
+        conn.executemany('''
+            INSERT INTO game_history (username, game_date, player1_score, player2_score, winner)
+            VALUES (?, ?, ?, ?, ?)
+        ''', generate())
+
+
+def time_queries(names, repeat=3):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for name in names:
+            Database.get_user_games(name)
+    return (time.perf_counter() - start) / (repeat * len(names)) * 1000
+
+
+def plan(conn):
+    return ' | '.join(row[3] for row in conn.execute(
+        "EXPLAIN QUERY PLAN " + pong_db.USER_GAMES_SQL, ('user1',)))
+
+
+if __name__ == '__main__':
+    with tempfile.TemporaryDirectory() as tmp:
+        Database.configure(os.path.join(tmp, 'bench.db'))
+        Database.init_db()
+        conn = Database.get_connection()
+        print(f"заполнение {ROWS:,} строк...")
+        fill(conn)
+        names = [f"user{i}" for i in range(0, USERS, USERS // 20)]
+
+        conn.execute("DROP INDEX idx_game_history_user_date_id")
+        print(f"без индекса: {time_queries(names, 1):.2f} мс на запрос; план: {plan(conn)}")
+
+        conn.execute("PRAGMA user_version = 1")
+        Database.init_db()
+        print(f"с индексом:  {time_queries(names):.2f} мс на запрос; план: {plan(conn)}")
+        Database.close()
@@ -0,0 +1,50 @@
+import os
+import statistics
+import tempfile
+import time
+
+import pong_leaderboard
+from bench_history_index import fill
+from pong_db import Database
+
+
+ROWS = 1_000_000
+USERS = 50_000
+
+
+def measure(function, repeats=50):
+    """Медиана времени вызова, мс"""
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times) * 1000
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        Database.configure(os.path.join(tmp, 'bench.db'))
+        Database.init_db()
+        start = time.perf_counter()
+        fill(Database.get_connection(), ROWS, USERS)
+        users = Database.rebuild_user_stats()
+        print(f"{ROWS:,} игр, {users:,} игроков: заполнение {time.perf_counter() - start:.1f} с")
+
+        for board in pong_leaderboard.BOARDS:
+            top = measure(lambda: pong_leaderboard.top(board, 100))
+            rank = measure(lambda: pong_leaderboard.rank('user7', board))
+            print(f"  {board:12} top-100 {top:6.2f} мс   место игрока {rank:6.2f} мс")
+
+        # для сравнения: то же без user_stats, агрегатом по game_history
+        conn = Database.get_connection()
+        naive = measure(lambda: conn.execute('''
+            SELECT username, SUM(winner = 'Игрок 1') AS wins
+            FROM game_history GROUP BY username ORDER BY wins DESC LIMIT 100
+        ''').fetchall(), repeats=3)
+        print(f"  GROUP BY по game_history: {naive:.0f} мс")
+        Database.close()
+
+
+if __name__ == '__main__':
+    main()
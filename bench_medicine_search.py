@@ -0,0 +1,70 @@
+import os
+import random
+import tempfile
+import time
+
+from pharmacy_db import Pharmacy
+
+
+ITEMS = int(os.environ.get('ITEMS', 500_000))
+BASE_NAMES = 20_000
+SYLLABLES = ['ас', 'пи', 'рин', 'бро', 'ген', 'сим', 'ва', 'ли', 'дол', 'гли', 'цин', 'ам',
+             'бро', 'кси', 'нол', 'фер', 'тал', 'мо', 'ксо', 'цил', 'ла', 'зе', 'пам', 'ни',
+             'ко', 'тин', 'ре', 'ла', 'кс', 'ди', 'кло', 'фен', 'ак', 'ибу', 'про', 'ме']
+FORMS = ['таблетки', 'капсулы', 'сироп', 'мазь', 'раствор', 'капли', 'спрей', 'гель']
+DOSES = ['50 мг', '100 мг', '200 мг', '250 мг', '500 мг', '1 г', '5 мл', '10 мл']
+MANUFACTURERS = [f"{prefix}{suffix}" for prefix in ('Фарм', 'Био', 'Мед', 'Вита', 'Генно', 'Нова')
+                 for suffix in ('стандарт', 'синтез', 'лек', 'пром', 'тех', 'вит', 'ком')]
+CATEGORIES = ['Обезболивающие', 'Антибиотики', 'Витамины', 'Противовирусные', 'Сердечные',
+              'Антигистаминные', 'Жаропонижающие', 'Успокоительные', 'Пищеварение', 'Дерматология']
+
+QUERIES = ['аспирин', 'асп', 'бромген сироп', 'фармсинтез', 'витамины', 'ибупрофен 200',
+           'асприн', 'бромгксин', 'фармсинтз таблетки', 'кл']
+
+
+def fill(conn, seed=1):
+    rng = random.Random(seed)
+    names = set()
+    while len(names) < BASE_NAMES:
+        names.add(''.join(rng.choice(SYLLABLES) for _ in range(rng.randrange(2, 5))).capitalize())
+    names = sorted(names) + ['Аспирин', 'Бромгексин', 'Ибупрофен']
+    with conn:
+        conn.executemany('''
+            INSERT INTO medicines (name, manufacturer, category, price, quantity, expiry_date)
+            VALUES (?, ?, ?, ?, ?, '2027-01-01')
+        ''', ((f"{rng.choice(names)} {rng.choice(FORMS)} {rng.choice(DOSES)}",
+               rng.choice(MANUFACTURERS), rng.choice(CATEGORIES),
+               round(rng.uniform(50, 3000), 2), rng.randrange(200)) for _ in range(ITEMS)))
+
+
+def timed(function, repeat=20):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        rows = function()
+    return (time.perf_counter() - start) / repeat * 1000, rows
+
+
+if __name__ == '__main__':
+    with tempfile.TemporaryDirectory() as tmp:
+        Pharmacy.configure(os.path.join(tmp, 'pharmacy.db'))
+        Pharmacy.init_db()
+        conn = Pharmacy.get_connection()
+        start = time.perf_counter()
+        fill(conn)
+        print(f"каталог {ITEMS:,} позиций с индексом FTS5: {time.perf_counter() - start:.1f} с")
+
+        for query in QUERIES:
+            elapsed, rows = timed(lambda: Pharmacy.search_medicines(query))
+            top = rows[0][1] if rows else '-'
+            print(f"  {query:22} {elapsed:7.2f} мс  найдено {len(rows):3}  первый: {top}")
+
+        like = '%' + QUERIES[0] + '%'
+        elapsed, rows = timed(lambda: conn.execute(
+            "SELECT id FROM medicines WHERE name LIKE ? OR manufacturer LIKE ? OR category LIKE ? "
+            "LIMIT 20", (like, like, like)).fetchall(), repeat=3)
+        print(f"  LIKE '%{QUERIES[0]}%' по таблице: {elapsed:.2f} мс")
+
+        elapsed, _ = timed(lambda: conn.execute(
+            "UPDATE medicines SET quantity = quantity - 1 WHERE id = 777"), repeat=200)
+        print(f"  изменение остатка (индекс не трогается): {elapsed:.3f} мс")
+        Pharmacy.close()
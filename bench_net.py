@@ -0,0 +1,60 @@
+import time
+from collections import deque
+
+import pong_engine
+import pong_net
+from pong_ai import CpuPlayer
+
+
+SECONDS = 60
+DELAY = 6  # тиков в одну сторону (100 мс при 60 Гц)
+
+
+def main():
+    rules = pong_engine.Rules(win_score=0)
+    server = pong_net.ServerMatch(rules)
+    clients = {}
+    cpus = {}
+    for name in ('cpu1', 'cpu2'):
+        player = server.join(name)
+        clients[player] = pong_net.ClientPrediction(rules)
+        clients[player].welcome(player, 0)
+        cpus[player] = CpuPlayer.level(rules, 'hard', player, seed=player)
+    up = {player: deque() for player in clients}
+    down = {player: deque() for player in clients}
+
+    full = len(pong_net.encode_snapshot(0, pong_net.capture(server.state), 0))
+    input_bytes = 0
+    reconcile = 0.0
+    ticks = SECONDS * 60
+    for now in range(ticks):
+        for player, client in clients.items():
+            while down[player] and down[player][0][0] <= now:
+                data = down[player].popleft()[1]
+                start = time.perf_counter()
+                client.receive_snapshot(data)
+                reconcile += time.perf_counter() - start
+            if client.server is not None:
+                _, packet = client.local_tick(cpus[player].decide(client.state))
+                input_bytes += len(packet)
+                up[player].append((now + DELAY, packet))
+        for player in clients:
+            while up[player] and up[player][0][0] <= now:
+                server.receive_input(player, *pong_net.decode_input(up[player].popleft()[1]))
+        server.tick()
+        if server.ticks % pong_net.SNAPSHOT_INTERVAL == 0:
+            for player in clients:
+                down[player].append((now + DELAY, server.snapshot_for(player)))
+
+    client = clients[1]
+    print(f"{SECONDS} с игры, задержка {DELAY} тиков в одну сторону")
+    print(f"  снимок: полный {full} байт, в среднем {client.snapshot_bytes / client.snapshots:.1f} байт")
+    print(f"  сервер -> клиент: {client.snapshot_bytes / SECONDS / 1024:.2f} КБ/с "
+          f"(без сжатия {full * client.snapshots / SECONDS / 1024:.2f} КБ/с)")
+    print(f"  клиент -> сервер: {input_bytes / 2 / SECONDS / 1024:.2f} КБ/с")
+    snapshots = sum(c.snapshots for c in clients.values())
+    print(f"  сверка со снимком: {reconcile / snapshots * 1e6:.0f} мкс")
+
+
+if __name__ == '__main__':
+    main()
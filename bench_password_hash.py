@@ -0,0 +1,41 @@
+import statistics
+import sys
+import time
+from concurrent.futures import wait
+
+import pong_auth
+from pong_auth import HashingService, KdfParams
+
+
+def latency(params, repeats=5):
+    """Медиана времени одного хэша, мс"""
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        pong_auth.hash_password('benchmark', params)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times) * 1000
+
+
+def main():
+    target = float(sys.argv[1]) if len(sys.argv) > 1 else 0.1
+    print("scrypt, r=8, p=1")
+    for power in range(10, 18):
+        params = KdfParams(2 ** power)
+        print(f"  n=2^{power:<2} {latency(params):8.1f} мс  память {128 * 8 * params.n // 1024} КБ")
+
+    params = pong_auth.calibrate(target)
+    print(f"calibrate({target}) -> n=2^{params.n.bit_length() - 1}, {latency(params):.1f} мс")
+
+    # пропускная способность пула: scrypt отпускает GIL, потоки считают параллельно
+    for workers in (1, 2, 4):
+        service = HashingService(params, workers)
+        start = time.perf_counter()
+        wait([service.hash('benchmark') for _ in range(16)])
+        elapsed = time.perf_counter() - start
+        service.shutdown()
+        print(f"  пул {workers}: {16 / elapsed:6.1f} хэшей/с")
+
+
+if __name__ == '__main__':
+    main()
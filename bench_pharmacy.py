@@ -0,0 +1,104 @@
+import os
+import random
+import tempfile
+import time
+from datetime import date, timedelta
+
+import pharmacy_db
+from pharmacy_db import Pharmacy
+
+
+SALES = 1_000_000
+MEDICINES = 2000
+SUPPLIERS = 50
+ORDERS = 20_000
+CATEGORIES = ['A', 'B', 'C', 'D', 'E', 'F', 'G', 'H']
+START = date(2024, 1, 1)
+DAYS = 730
+TODAY = START + timedelta(days=DAYS)
+
+INDEXES = ['idx_medicines_expiry', 'idx_medicines_category_name', 'idx_sales_medicine_date',
+           'idx_supplier_orders_status_delivery', 'idx_medicines_low_stock']
+
+
+def fill(conn, seed=1):
+    rng = random.Random(seed)
+
+    def day(offset):
+        return (START + timedelta(days=offset)).isoformat()
+
+    def sales():
+        for _ in range(SALES):
+            second = rng.randrange(86400)
+            moment = f"{day(rng.randrange(DAYS))} " \
+                     f"{second // 3600:02d}:{second // 60 % 60:02d}:{second % 60:02d}"
+            yield (rng.randrange(1, MEDICINES + 1), rng.randrange(1, 4),
+                   round(rng.uniform(50, 3000), 2), moment, f"Покупатель {rng.randrange(10000)}")
+
+    with conn:
+        conn.executemany('''
+            INSERT INTO medicines (name, manufacturer, category, price, quantity,
+                                   production_date, expiry_date, reorder_level)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', ((f"Лекарство {i}", 'Завод', rng.choice(CATEGORIES), rng.uniform(50, 3000),
+               rng.randrange(200), day(rng.randrange(DAYS)), day(DAYS + rng.randrange(-60, 1000)),
+               rng.randrange(5, 40)) for i in range(MEDICINES)))
+        conn.executemany('INSERT INTO suppliers (name) VALUES (?)',
+                         ((f"Поставщик {i}",) for i in range(SUPPLIERS)))
+        conn.executemany('''
+            INSERT INTO sales (medicine_id, quantity, sale_price, sale_date, customer_name)
+            VALUES (?, ?, ?, ?, ?)
+        ''', sales())
+        conn.executemany('''
+            INSERT INTO supplier_orders (supplier_id, medicine_id, quantity, order_date,
+                                         expected_delivery, status)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', ((rng.randrange(1, SUPPLIERS + 1), rng.randrange(1, MEDICINES + 1),
+               rng.randrange(10, 500), day(rng.randrange(DAYS)), day(rng.randrange(DAYS + 30)),
+               'ordered' if rng.random() < 0.05 else 'delivered') for _ in range(ORDERS)))
+
+
+QUERIES = [
+    ("истекают за 30 дней", lambda: Pharmacy.expiring_within(30, TODAY),
+     pharmacy_db.EXPIRING_SQL, ('2026-01-01', '2026-01-31')),
+    ("ниже порога (категория)", lambda: Pharmacy.below_reorder_level('C'),
+     pharmacy_db.LOW_STOCK_SQL.format(category='AND m.category = ?'), ('ordered', 'C')),
+    ("ниже порога (все)", Pharmacy.below_reorder_level,
+     pharmacy_db.LOW_STOCK_SQL.format(category=''), ('ordered',)),
+    ("продажи за месяц", lambda: Pharmacy.sales_by_period(TODAY - timedelta(days=30), TODAY),
+     pharmacy_db.SALES_BY_PERIOD_SQL, ('2025-12-01', '2025-12-31')),
+    ("продажи лекарства за год",
+     lambda: Pharmacy.medicine_sales(7, TODAY - timedelta(days=365), TODAY),
+     pharmacy_db.MEDICINE_SALES_SQL, (7, '2025-01-01', '2026-01-01')),
+    ("ожидаемые поставки", lambda: Pharmacy.pending_deliveries(TODAY),
+     pharmacy_db.PENDING_DELIVERIES_SQL, ('ordered', '2026-01-01')),
+]
+
+
+def measure(conn, title):
+    print(title)
+    for name, query, sql, params in QUERIES:
+        repeat = 0
+        start = time.perf_counter()
+        while repeat < 3 or time.perf_counter() - start < 0.2:
+            rows = query()
+            repeat += 1
+        elapsed = (time.perf_counter() - start) / repeat * 1000
+        plan = ' | '.join(row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + sql, params))
+        print(f"  {name:26} {elapsed:9.2f} мс  строк {len(rows):5}  план: {plan}")
+
+
+if __name__ == '__main__':
+    with tempfile.TemporaryDirectory() as tmp:
+        Pharmacy.configure(os.path.join(tmp, 'pharmacy.db'))
+        Pharmacy.init_db()
+        conn = Pharmacy.get_connection()
+        print(f"заполнение: {SALES:,} продаж, {MEDICINES} лекарств, {ORDERS:,} заказов...")
+        fill(conn)
+        for index in INDEXES:
+            conn.execute(f"DROP INDEX {index}")
+        measure(conn, "без индексов:")
+        for statement in pharmacy_db.MIGRATIONS[1][1:] + pharmacy_db.MIGRATIONS[3]:
+            conn.execute(statement)
+        measure(conn, "с индексами:")
+        Pharmacy.close()
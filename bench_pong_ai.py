@@ -0,0 +1,44 @@
+import time
+
+import pong_engine
+from pong_ai import CpuPlayer, LEVELS
+
+
+TICKS = 300_000
+FRAME = 1 / 60
+
+
+def bench():
+    rules = pong_engine.Rules(win_score=0)
+    step = pong_engine.step
+
+    state = pong_engine.new_state(rules, seed=1)
+    start = time.perf_counter()
+    for _ in range(TICKS):
+        step(state)
+    physics = (time.perf_counter() - start) / TICKS
+    print(f"физика step():      {physics * 1e6:6.2f} мкс/тик")
+
+    cpu = CpuPlayer.level(rules, 'normal', seed=1)
+    state = pong_engine.new_state(rules, seed=1)
+    decide = cpu.decide
+    start = time.perf_counter()
+    for _ in range(TICKS):
+        decide(state)
+    thinking = (time.perf_counter() - start) / TICKS
+    print(f"соперник decide():  {thinking * 1e6:6.2f} мкс/тик "
+          f"({thinking / FRAME * 100:.3f}% кадра 60 Гц)")
+
+    # счет за 10 минут игры при 60 тиках/с: уровень против идеального игрока
+    perfect = dict(reaction=0, error=0, period=1)
+    for name in LEVELS:
+        state = pong_engine.new_state(rules, seed=1)
+        player1 = CpuPlayer(rules, 1, **perfect)
+        player2 = CpuPlayer.level(rules, name, 2, seed=2)
+        for _ in range(60 * 600):
+            step(state, (player1.decide(state), player2.decide(state)))
+        print(f"  {name:6} против идеального игрока: {state.score2}:{state.score1}")
+
+
+if __name__ == '__main__':
+    bench()
@@ -0,0 +1,18 @@
+import time
+
+import pong_batch
+import pong_engine
+
+
+def bench(rules, n=10000, ticks=1000):
+    sim = pong_batch.BatchSimulator(n, rules, seed=1)
+    start = time.perf_counter()
+    sim.run(ticks)
+    elapsed = time.perf_counter() - start
+    print(f"{rules.variant}: {n} матчей x {ticks} тиков, "
+          f"{n * ticks / elapsed:,.0f} матче-тиков/с")
+
+
+if __name__ == '__main__':
+    bench(pong_engine.CLASSIC_RULES)
+    bench(pong_engine.SPEEDUP_RULES)
@@ -0,0 +1,25 @@
+import time
+
+import pong_engine
+
+
+def bench(rules, ticks=1_000_000):
+    state = pong_engine.new_state(rules, seed=1)
+    start = time.perf_counter()
+    pong_engine.run(state, ticks)
+    elapsed = time.perf_counter() - start
+    print(f"{rules.variant}: run() {ticks / elapsed:,.0f} тиков/с "
+          f"(счет {state.score1}:{state.score2})")
+
+    state = pong_engine.new_state(rules, seed=1)
+    step = pong_engine.step
+    start = time.perf_counter()
+    for _ in range(ticks):
+        step(state)
+    elapsed = time.perf_counter() - start
+    print(f"{rules.variant}: step() {ticks / elapsed:,.0f} тиков/с")
+
+
+if __name__ == '__main__':
+    bench(pong_engine.CLASSIC_RULES)
+    bench(pong_engine.SPEEDUP_RULES)
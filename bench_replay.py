@@ -0,0 +1,50 @@
+import random
+import time
+
+import pong_engine
+from pong_ai import CpuPlayer
+from pong_replay import Recorder, Replay, ReplayPlayer
+
+
+MINUTES = 10
+
+
+def record(rules, ticks):
+    """Матч компьютерных соперников без ограничения по очкам"""
+    state = pong_engine.new_state(rules, seed=1)
+    recorder = Recorder(state, seed=1)
+    player1 = CpuPlayer.level(rules, 'normal', 1, seed=1)
+    player2 = CpuPlayer.level(rules, 'hard', 2, seed=2)
+    for _ in range(ticks):
+        inputs = (player1.decide(state), player2.decide(state))
+        recorder.record(inputs)
+        pong_engine.step(state, inputs)
+    return recorder.replay
+
+
+def main():
+    ticks = MINUTES * 60 * 60
+    for rules in (pong_engine.Rules(pong_engine.CLASSIC, height=600, paddle_width=15,
+                                    paddle_height=100, win_score=0),
+                  pong_engine.Rules(win_score=0)):
+        replay = record(rules, ticks)
+        data = replay.dumps()
+        print(f"{rules.variant}: {MINUTES} мин, {ticks} тиков, {len(replay.changes)} смен ввода, "
+              f"{len(data)} байт ({len(data) / MINUTES / 1024:.1f} КБ/мин)")
+
+        start = time.perf_counter()
+        player = ReplayPlayer(Replay.loads(data))
+        player.seek(ticks)
+        full = time.perf_counter() - start
+        print(f"  перемотка в конец с нуля: {full * 1000:.0f} мс")
+
+        rng = random.Random(1)
+        targets = [rng.randrange(ticks) for _ in range(200)]
+        start = time.perf_counter()
+        for tick in targets:
+            player.seek(tick)
+        print(f"  случайная перемотка по снимкам: {(time.perf_counter() - start) / len(targets) * 1000:.2f} мс")
+
+
+if __name__ == '__main__':
+    main()
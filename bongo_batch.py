@@ -0,0 +1,171 @@
+import argparse
+import multiprocessing
+import os
+import time
+
+import numpy as np
+
+import bongo_engine
+from bongo_engine import BONGO, BONGO_RULES
+
+
+RNG_BLOCK = 1 << 20      # исходов броска в одном блоке ГСЧ
+CHUNK = 1 << 18          # партий в массивах одного прохода
+SHARD = 1 << 21          # партий в одном задании для процесса
+# партия без победителя за столько ходов считается незавершенной
+MAX_TURNS = 2000
+
+
+def roll_table(rules=BONGO_RULES):
+    """Для каждого из 36 исходов броска (код (кубик1 - 1) * 6 + кубик2 - 1):
+    множитель текущего счета (0 - БОНГО) и прибавка"""
+    keep = np.ones(36, dtype=np.int32)
+    gained = np.zeros(36, dtype=np.int32)
+    for code in range(36):
+        kind, points = bongo_engine.roll_outcome(rules, code // 6 + 1, code % 6 + 1)
+        if kind == BONGO:
+            keep[code] = 0
+        gained[code] = points
+    return keep, gained
+
+
+class BongoStats:
+    """Итоги серии партий: победы по игрокам и распределение длины в ходах"""
+
+    def __init__(self, players, max_turns=MAX_TURNS):
+        self.wins = np.zeros(players, dtype=np.int64)
+        self.lengths = np.zeros(max_turns + 1, dtype=np.int64)
+        self.unfinished = 0
+
+    @property
+    def games(self):
+        return int(self.wins.sum()) + self.unfinished
+
+    def merge(self, other):
+        self.wins += other.wins
+        self.lengths += other.lengths
+        self.unfinished += other.unfinished
+        return self
+
+    def win_rates(self):
+        return self.wins / max(self.games, 1)
+
+    def mean_length(self):
+        finished = self.lengths.sum()
+        return float(self.lengths @ np.arange(len(self.lengths)) / max(finished, 1))
+
+    def length_percentile(self, q):
+        """Длина, которую не превышают q процентов завершенных партий"""
+        cumulative = np.cumsum(self.lengths)
+        return int(np.searchsorted(cumulative, cumulative[-1] * q / 100))
+
+
+class BongoBatch:
+    """Много партий Бонго сразу: счета в массиве (игрок x партия), броски
+    берутся из заранее сгенерированного блока, закончившиеся партии
+    выбрасываются из массивов"""
+
+    def __init__(self, rules=BONGO_RULES, players=2, seed=None, max_turns=MAX_TURNS,
+                 block=RNG_BLOCK):
+        if players < 2:
+            raise ValueError("Нужно хотя бы два игрока")
+        self.rules = rules
+        self.players = players
+        self.max_turns = max_turns
+        self.block = block
+        self.rng = np.random.default_rng(seed)
+        self.keep, self.gained = roll_table(rules)
+        self.pool = np.empty(0, dtype=np.uint8)
+        self.pos = 0
+
+    def _codes(self, count):
+        if self.pos + count > len(self.pool):
+            self.pool = self.rng.integers(0, 36, size=max(self.block, count), dtype=np.uint8)
+            self.pos = 0
+        codes = self.pool[self.pos:self.pos + count]
+        self.pos += count
+        return codes
+
+    def play(self, games, stats=None):
+        """Сыграть games партий, добавив итоги в stats"""
+        if stats is None:
+            stats = BongoStats(self.players, self.max_turns)
+        for start in range(0, games, CHUNK):
+            self._play_chunk(min(CHUNK, games - start), stats)
+        return stats
+
+    def _play_chunk(self, games, stats):
+        keep, gained, target = self.keep, self.gained, self.rules.target
+        scores = np.zeros((self.players, games), dtype=np.int32)
+        turn = 0
+        while scores.shape[1] and turn < self.max_turns:
+            for player in range(self.players):
+                row = scores[player]
+                codes = self._codes(row.size)
+                row *= keep[codes]
+                row += gained[codes]
+                turn += 1
+                won = row >= target
+                count = np.count_nonzero(won)
+                if count:
+                    stats.wins[player] += count
+                    stats.lengths[turn] += count
+                    scores = scores[:, ~won]
+                    if not scores.shape[1]:
+                        break
+                if turn == self.max_turns:
+                    break
+        stats.unfinished += scores.shape[1]
+
+
+def _shard(args):
+    games, rules, players, seed, max_turns = args
+    return BongoBatch(rules, players, seed, max_turns).play(games)
+
+
+def run(games, rules=BONGO_RULES, players=2, seed=0, workers=None, max_turns=MAX_TURNS):
+    """Серия партий, разбитая на задания по SHARD партий. У каждого задания
+    свое зерно из SeedSequence, поэтому итог не зависит от числа процессов"""
+    sizes = [min(SHARD, games - start) for start in range(0, games, SHARD)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    jobs = [(size, rules, players, shard_seed, max_turns)
+            for size, shard_seed in zip(sizes, seeds)]
+    stats = BongoStats(players, max_turns)
+    workers = min(workers or os.cpu_count() or 1, len(jobs))
+    if workers <= 1:
+        for job in jobs:
+            stats.merge(_shard(job))
+        return stats
+    with multiprocessing.Pool(workers) as pool:
+        for shard_stats in pool.imap_unordered(_shard, jobs):
+            stats.merge(shard_stats)
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Монте-Карло для вариантов правил Бонго')
+    parser.add_argument('--games', type=int, default=10_000_000)
+    parser.add_argument('--players', type=int, default=2)
+    parser.add_argument('--target', type=int, default=BONGO_RULES.target)
+    parser.add_argument('--wipe-face', type=int, default=BONGO_RULES.wipe_face,
+                        help='грань, дубль которой обнуляет счет (0 - без БОНГО)')
+    parser.add_argument('--multiplier', type=int, default=BONGO_RULES.double_multiplier)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, default=None, help='процессов (по умолчанию все ядра)')
+    args = parser.parse_args(argv)
+    rules = bongo_engine.Rules(args.target, args.wipe_face or None, args.multiplier)
+
+    start = time.perf_counter()
+    stats = run(args.games, rules, args.players, args.seed, args.workers)
+    elapsed = time.perf_counter() - start
+    for player, rate in enumerate(stats.win_rates(), 1):
+        print(f"Игрок {player}: {rate:.4%}")
+    print(f"Длина партии: в среднем {stats.mean_length():.2f} ходов, медиана "
+          f"{stats.length_percentile(50)}, 99% - до {stats.length_percentile(99)}")
+    if stats.unfinished:
+        print(f"Не закончено за {MAX_TURNS} ходов: {stats.unfinished}")
+    print(f"{stats.games:,} партий за {elapsed:.1f} с ({stats.games / elapsed * 60:,.0f} партий/мин)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+import random
+from collections import namedtuple
+
+
+NORMAL = "normal"     # сумма кубиков
+DOUBLE = "double"     # дубль: сумма умножается
+BONGO = "bongo"       # дубль wipe_face: счет обнуляется
+
+# Действия игрока в свой ход
+ROLL = "roll"
+RESIGN = "resign"
+
+
+class Rules:
+    """Параметры игры Бонго"""
+    __slots__ = ('target', 'wipe_face', 'double_multiplier')
+
+    def __init__(self, target=100, wipe_face=3, double_multiplier=2):
+        if target < 1:
+            raise ValueError(f"Цель должна быть положительной: {target}")
+        self.target = target
+        # грань, дубль которой обнуляет счет; None - без БОНГО
+        self.wipe_face = wipe_face
+        self.double_multiplier = double_multiplier
+
+
+BONGO_RULES = Rules()
+
+TurnResult = namedtuple('TurnResult', 'player dice kind gained score won')
+
+
+def roll_outcome(rules, die1, die2):
+    """Вид броска и сколько очков он приносит"""
+    if die1 == die2:
+        if die1 == rules.wipe_face:
+            return BONGO, 0
+        return DOUBLE, (die1 + die2) * rules.double_multiplier
+    return NORMAL, die1 + die2
+
+
+def next_score(rules, score, die1, die2):
+    """Счет игрока после броска"""
+    kind, gained = roll_outcome(rules, die1, die2)
+    return 0 if kind == BONGO else score + gained
+
+
+class BongoGame:
+    """Состояние партии: счета, чей ход, победитель. Без ввода и пауз"""
+
+    def __init__(self, rules=BONGO_RULES, names=("Игрок 1", "Игрок 2"), seed=None):
+        if len(names) < 2:
+            raise ValueError("Нужно хотя бы два игрока")
+        self.rules = rules
+        self.names = list(names)
+        self.scores = [0] * len(names)
+        self.current = 0
+        self.turns = 0
+        self.winner = None
+        self.finished = False
+        self.rng = random.Random(seed)
+
+    def roll_dice(self):
+        rng = self.rng.random
+        return int(rng() * 6) + 1, int(rng() * 6) + 1
+
+    def roll(self, dice=None):
+        """Ход текущего игрока: бросок (или заданные кубики) и передача хода"""
+        if self.finished:
+            raise ValueError("Партия окончена")
+        die1, die2 = dice if dice is not None else self.roll_dice()
+        player = self.current
+        kind, gained = roll_outcome(self.rules, die1, die2)
+        score = 0 if kind == BONGO else self.scores[player] + gained
+        self.scores[player] = score
+        self.turns += 1
+        won = score >= self.rules.target
+        if won:
+            self.winner = player
+            self.finished = True
+        else:
+            self.current = (player + 1) % len(self.scores)
+        return TurnResult(player, (die1, die2), kind, gained, score, won)
+
+    def resign(self):
+        """Текущий игрок прекращает партию, победителя нет"""
+        self.finished = True
+
+
+def always_roll(game):
+    """Стратегия по умолчанию: правила не оставляют выбора, только бросок"""
+    return ROLL
+
+
+def play(strategies, rules=BONGO_RULES, seed=None, on_turn=None):
+    """Партия без интерфейса. strategies[i](game) -> ROLL или RESIGN для игрока i.
+    Возвращает законченную партию"""
+    game = BongoGame(rules, [f"Игрок {i + 1}" for i in range(len(strategies))], seed)
+    while not game.finished:
+        action = strategies[game.current](game)
+        if action == RESIGN:
+            game.resign()
+        elif action == ROLL:
+            result = game.roll()
+            if on_turn is not None:
+                on_turn(game, result)
+        else:
+            raise ValueError(f"Неизвестное действие: {action}")
+    return game
+
+
+def simulate(games, strategies=(always_roll, always_roll), rules=BONGO_RULES, seed=None):
+    """Серия партий. Возвращает (победы по игрокам, всего ходов)"""
+    rng = random.Random(seed)
+    wins = [0] * len(strategies)
+    turns = 0
+    for _ in range(games):
+        game = play(strategies, rules, rng.getrandbits(63))
+        if game.winner is not None:
+            wins[game.winner] += 1
+        turns += game.turns
+    return wins, turns
@@ -0,0 +1,90 @@
+import argparse
+import time
+from collections import Counter, namedtuple
+
+import numpy as np
+
+import bongo_engine
+from bongo_engine import BONGO, BONGO_RULES
+
+
+# win[a, b] - вероятность победы игрока, который сейчас ходит, при его счете a
+# и счете соперника b; turns[a, b] - ожидаемое число оставшихся ходов партии
+Solution = namedtuple('Solution', 'rules win turns')
+
+
+def outcomes(rules=BONGO_RULES):
+    """Распределение 36 исходов roll_dice: [(вероятность, очки, обнуление)]"""
+    counts = Counter()
+    for die1 in range(1, 7):
+        for die2 in range(1, 7):
+            kind, gained = bongo_engine.roll_outcome(rules, die1, die2)
+            counts[gained, kind == BONGO] += 1
+    return [(count / 36, gained, wipe) for (gained, wipe), count in sorted(counts.items())]
+
+
+def _solve(rules, base, win_value, keep, sign):
+    """Решение X(a, b) = base + сумма p * (win_value, если бросок побеждает,
+    иначе keep + sign * X(b, a')) по всем исходам броска.
+
+    Без обнулений сумма счетов только растет, поэтому X выражается через
+    значения на больших диагоналях a + b. Обнуление ведет в (b, 0), и эти
+    target значений Z[b] = X(b, 0) - единственные неизвестные: каждое X(a, b)
+    хранится как линейная функция от Z, а сами Z находятся из системы
+    target x target."""
+    target = rules.target
+    moves = outcomes(rules)
+    # coef[a, b, :target] - множители при Z, coef[a, b, target] - свободный член
+    coef = np.zeros((target, target, target + 1))
+    coef[:, :, target] = base
+    for total in range(2 * target - 2, -1, -1):
+        a = np.arange(max(0, total - target + 1), min(total, target - 1) + 1)
+        b = total - a
+        cell = coef[a, b]
+        for p, gained, wipe in moves:
+            if wipe:
+                cell[:, target] += p * keep
+                cell[np.arange(len(b)), b] += p * sign
+                continue
+            nxt = a + gained
+            won = nxt >= target
+            cell[won, target] += p * win_value
+            going = ~won
+            cell[going, target] += p * keep
+            cell[going] += p * sign * coef[b[going], nxt[going]]
+        coef[a, b] = cell
+    # Z[b] = X(b, 0) = coef[b, 0] . (Z, 1)
+    system = np.eye(target) - coef[:, 0, :target]
+    z = np.linalg.solve(system, coef[:, 0, target])
+    return coef[:, :, :target] @ z + coef[:, :, target]
+
+
+def solve(rules=BONGO_RULES):
+    """Точные вероятности победы и ожидаемая длина партии двух игроков"""
+    win = _solve(rules, base=0.0, win_value=1.0, keep=1.0, sign=-1.0)
+    turns = _solve(rules, base=1.0, win_value=0.0, keep=0.0, sign=1.0)
+    return Solution(rules, win, turns)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Точный расчет шансов в Бонго')
+    parser.add_argument('--target', type=int, default=BONGO_RULES.target)
+    parser.add_argument('--wipe-face', type=int, default=BONGO_RULES.wipe_face,
+                        help='грань, дубль которой обнуляет счет (0 - без БОНГО)')
+    parser.add_argument('--multiplier', type=int, default=BONGO_RULES.double_multiplier,
+                        help='множитель дубля')
+    args = parser.parse_args(argv)
+    rules = bongo_engine.Rules(args.target, args.wipe_face or None, args.multiplier)
+
+    start = time.perf_counter()
+    solution = solve(rules)
+    elapsed = time.perf_counter() - start
+    first = solution.win[0, 0]
+    print(f"Цель {rules.target}, БОНГО: {rules.wipe_face or 'нет'}, дубль x{rules.double_multiplier}")
+    print(f"Победа первого игрока: {first:.6f}, второго: {1 - first:.6f}")
+    print(f"Ожидаемая длина партии: {solution.turns[0, 0]:.3f} ходов")
+    print(f"Расчет за {elapsed * 1000:.0f} мс")
+
+
+if __name__ == '__main__':
+    main()
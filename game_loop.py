@@ -0,0 +1,118 @@
+import time
+
+
+TICK_RATE = 60       # шагов физики в секунду
+MAX_CATCHUP = 5      # максимум шагов за один кадр (защита от "спирали смерти")
+
+
+def positions(state):
+    """Координаты, нужные для отрисовки: мяч и обе ракетки"""
+    return (state.ball_x, state.ball_y, state.paddle1_y, state.paddle2_y)
+
+
+class LoopStats:
+    """Счетчики поведения цикла"""
+    __slots__ = ('frames', 'steps', 'empty_frames', 'merged_frames',
+                 'dropped_steps', 'max_frame_time')
+
+    def __init__(self):
+        self.frames = 0          # вызовов advance
+        self.steps = 0           # выполненных шагов физики
+        self.empty_frames = 0    # кадров без шага (только интерполяция)
+        self.merged_frames = 0   # кадров, где выполнено больше одного шага
+        self.dropped_steps = 0   # шагов, отброшенных из-за MAX_CATCHUP
+        self.max_frame_time = 0.0
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class FixedStepLoop:
+    """Цикл с фиксированным шагом физики и интерполяцией отрисовки.
+
+    step(state) вызывается ровно TICK_RATE раз в секунду игрового времени
+    независимо от частоты кадров; advance() вызывается на каждом кадре.
+    """
+
+    def __init__(self, state, step, hz=TICK_RATE, max_catchup=MAX_CATCHUP,
+                 clock=time.perf_counter):
+        self.state = state
+        self.step = step
+        self.dt = 1.0 / hz
+        self.max_catchup = max_catchup
+        self.clock = clock
+        self.stats = LoopStats()
+        self.accumulator = 0.0
+        self.alpha = 0.0
+        self.previous = positions(state)
+        self.last_time = None
+        self.stopped = False
+        # события шагов (номер забившего игрока), накопленные с прошлого кадра
+        self.events = []
+
+    def start(self):
+        """Запуск или продолжение после паузы (время паузы не накапливается)"""
+        self.last_time = self.clock()
+        self.accumulator = 0.0
+        self.stopped = False
+        self.sync()
+
+    def sync(self):
+        """Сброс интерполяции после внешнего изменения состояния"""
+        self.previous = positions(self.state)
+        self.alpha = 0.0
+
+    def stop(self):
+        """Остановка: оставшиеся шаги текущего кадра не выполняются"""
+        self.stopped = True
+
+    def advance(self, now=None):
+        """Продвинуть симуляцию до текущего времени. Возвращает число шагов"""
+        if now is None:
+            now = self.clock()
+        if self.last_time is None:
+            self.last_time = now
+        frame_time = now - self.last_time
+        self.last_time = now
+
+        stats = self.stats
+        stats.frames += 1
+        if frame_time > stats.max_frame_time:
+            stats.max_frame_time = frame_time
+
+        self.accumulator += frame_time
+        steps = 0
+        while self.accumulator >= self.dt and not self.stopped:
+            if steps == self.max_catchup:
+                dropped = int(self.accumulator / self.dt)
+                stats.dropped_steps += dropped
+                self.accumulator -= dropped * self.dt
+                break
+            self.previous = positions(self.state)
+            event = self.step(self.state)
+            if event:
+                self.events.append(event)
+                # после гола мяч телепортируется в центр - не интерполируем
+                self.previous = positions(self.state)
+            self.accumulator -= self.dt
+            steps += 1
+
+        stats.steps += steps
+        if steps == 0:
+            stats.empty_frames += 1
+        elif steps > 1:
+            stats.merged_frames += 1
+        self.alpha = min(self.accumulator / self.dt, 1.0)
+        return steps
+
+    def pop_events(self):
+        """Забрать события, случившиеся с прошлого вызова"""
+        events = self.events
+        self.events = []
+        return events
+
+    def render_positions(self):
+        """Позиции, интерполированные между двумя последними шагами"""
+        alpha = self.alpha
+        current = positions(self.state)
+        return tuple(p + (c - p) * alpha for p, c in zip(self.previous, current))
@@ -0,0 +1,417 @@
+import argparse
+import re
+from bisect import bisect_left
+from datetime import date, timedelta
+
+from pong_db import ConnectionManager, Database
+
+
+PHARMACY_DB = "pharmacy.db"
+
+DEFAULT_REORDER_LEVEL = 10
+# статус заказа поставщику, который еще не доставлен
+OPEN_ORDER_STATUS = 'ordered'
+
+SEARCH_LIMIT = 20
+# Вес совпадения в столбцах name, manufacturer, category для bm25
+SEARCH_WEIGHTS = (10.0, 2.0, 1.0)
+# Опечатки ищутся в словах не короче TYPO_MIN_LENGTH: одна на слово,
+# две - в словах от TYPO2_MIN_LENGTH букв
+TYPO_MIN_LENGTH = 4
+TYPO2_MIN_LENGTH = 8
+TYPO_CANDIDATES = 5
+# При исправлении опечаток слово запроса, у которого в словаре индекса не
+# больше EXPAND_TERMS продолжений, ищется перечислением этих слов - это
+# быстрее префиксного запроса по длинному началу
+EXPAND_TERMS = 8
+
+# Миграции pharmacy.db (см. pong_db.MIGRATIONS)
+MIGRATIONS = (
+    # 1: исходные таблицы
+    ('''
+        CREATE TABLE IF NOT EXISTS medicines (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            manufacturer TEXT,
+            category TEXT,
+            price REAL NOT NULL,
+            quantity INTEGER NOT NULL,
+            prescription_required BOOLEAN DEFAULT FALSE,
+            production_date DATE,
+            expiry_date DATE,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''', '''
+        CREATE TABLE IF NOT EXISTS suppliers (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            contact_person TEXT,
+            phone TEXT,
+            email TEXT,
+            address TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''', '''
+        CREATE TABLE IF NOT EXISTS sales (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            medicine_id INTEGER,
+            quantity INTEGER NOT NULL,
+            sale_price REAL NOT NULL,
+            sale_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            customer_name TEXT,
+            prescription_number TEXT,
+            FOREIGN KEY (medicine_id) REFERENCES medicines (id)
+        )
+    ''', '''
+        CREATE TABLE IF NOT EXISTS supplier_orders (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            supplier_id INTEGER,
+            medicine_id INTEGER,
+            quantity INTEGER NOT NULL,
+            order_date DATE,
+            expected_delivery DATE,
+            status TEXT DEFAULT 'ordered',
+            FOREIGN KEY (supplier_id) REFERENCES suppliers (id),
+            FOREIGN KEY (medicine_id) REFERENCES medicines (id)
+        )
+    ''', '''
+        CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT UNIQUE NOT NULL,
+            password_hash TEXT NOT NULL,
+            role TEXT NOT NULL,
+            full_name TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    '''),
+    # 2: порог дозаказа и индексы под запросы склада
+    (f'''
+        ALTER TABLE medicines
+        ADD COLUMN reorder_level INTEGER NOT NULL DEFAULT {DEFAULT_REORDER_LEVEL}
+    ''',
+     'CREATE INDEX IF NOT EXISTS idx_medicines_expiry ON medicines(expiry_date)',
+     'CREATE INDEX IF NOT EXISTS idx_medicines_category_name ON medicines(category, name)',
+     '''CREATE INDEX IF NOT EXISTS idx_sales_medicine_date
+        ON sales(medicine_id, sale_date, quantity, sale_price)''',
+     '''CREATE INDEX IF NOT EXISTS idx_supplier_orders_status_delivery
+        ON supplier_orders(status, expected_delivery)'''),
+    # 3: полнотекстовый поиск по каталогу. Индекс хранит только слова
+    # (content=medicines), триггеры держат его в согласии с таблицей и
+    # увеличивают catalog_version; изменение остатка или цены индекс не трогает
+    ('CREATE TABLE catalog_version (version INTEGER NOT NULL)',
+     'INSERT INTO catalog_version VALUES (0)',
+     '''
+        CREATE VIRTUAL TABLE medicines_fts USING fts5(
+            name, manufacturer, category,
+            content='medicines', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+        )
+    ''', '''
+        CREATE VIRTUAL TABLE medicines_fts_vocab USING fts5vocab(medicines_fts, row)
+    ''', '''
+        CREATE TRIGGER medicines_fts_insert AFTER INSERT ON medicines BEGIN
+            INSERT INTO medicines_fts (rowid, name, manufacturer, category)
+            VALUES (new.id, new.name, new.manufacturer, new.category);
+            UPDATE catalog_version SET version = version + 1;
+        END
+    ''', '''
+        CREATE TRIGGER medicines_fts_delete AFTER DELETE ON medicines BEGIN
+            INSERT INTO medicines_fts (medicines_fts, rowid, name, manufacturer, category)
+            VALUES ('delete', old.id, old.name, old.manufacturer, old.category);
+            UPDATE catalog_version SET version = version + 1;
+        END
+    ''', '''
+        CREATE TRIGGER medicines_fts_update AFTER UPDATE OF name, manufacturer, category
+        ON medicines BEGIN
+            INSERT INTO medicines_fts (medicines_fts, rowid, name, manufacturer, category)
+            VALUES ('delete', old.id, old.name, old.manufacturer, old.category);
+            INSERT INTO medicines_fts (rowid, name, manufacturer, category)
+            VALUES (new.id, new.name, new.manufacturer, new.category);
+            UPDATE catalog_version SET version = version + 1;
+        END
+    ''',
+     f"""INSERT INTO medicines_fts (medicines_fts, rank)
+         VALUES ('rank', 'bm25({', '.join(map(str, SEARCH_WEIGHTS))})')""",
+     "INSERT INTO medicines_fts (medicines_fts) VALUES ('rebuild')"),
+    # 4: частичный индекс только по лекарствам ниже порога - отчет без
+    # категории не обходит весь каталог
+    ('''CREATE INDEX IF NOT EXISTS idx_medicines_low_stock
+        ON medicines(category, name) WHERE quantity < reorder_level''',),
+)
+
+# Даты хранятся строками 'YYYY-MM-DD' ('YYYY-MM-DD HH:MM:SS' у продаж),
+# поэтому сравнение строк совпадает с хронологическим
+EXPIRING_SQL = '''
+    SELECT id, name, category, quantity, expiry_date
+    FROM medicines
+    WHERE expiry_date BETWEEN ? AND ?
+    ORDER BY expiry_date, id
+'''
+
+# Заказанное, но не доставленное количество учитывается отдельным столбцом
+LOW_STOCK_SQL = '''
+    SELECT m.id, m.name, m.category, m.quantity, m.reorder_level,
+           COALESCE(o.on_order, 0)
+    FROM medicines m
+    LEFT JOIN (SELECT medicine_id, SUM(quantity) AS on_order
+               FROM supplier_orders
+               WHERE status = ?
+               GROUP BY medicine_id) o ON o.medicine_id = m.id
+    WHERE m.quantity < m.reorder_level {category}
+    ORDER BY m.category, m.name
+'''
+
+# Для каждого лекарства - поиск диапазона дат в idx_sales_medicine_date
+SALES_BY_PERIOD_SQL = '''
+    SELECT m.id, m.name, COUNT(*), SUM(s.quantity), SUM(s.quantity * s.sale_price)
+    FROM medicines m
+    JOIN sales s ON s.medicine_id = m.id AND s.sale_date >= ? AND s.sale_date < ?
+    GROUP BY m.id
+    ORDER BY SUM(s.quantity * s.sale_price) DESC
+'''
+
+MEDICINE_SALES_SQL = '''
+    SELECT id, quantity, sale_price, sale_date, customer_name
+    FROM sales
+    WHERE medicine_id = ? AND sale_date >= ? AND sale_date < ?
+    ORDER BY sale_date
+'''
+
+PENDING_DELIVERIES_SQL = '''
+    SELECT id, supplier_id, medicine_id, quantity, order_date, expected_delivery
+    FROM supplier_orders
+    WHERE status = ? AND expected_delivery <= ?
+    ORDER BY expected_delivery
+'''
+
+# Лучшие совпадения выбираются внутри FTS5 (rank - bm25 с SEARCH_WEIGHTS),
+# строки medicines читаются только для них
+SEARCH_SQL = '''
+    SELECT m.id, m.name, m.manufacturer, m.category, m.quantity, m.price
+    FROM (SELECT rowid, rank FROM medicines_fts
+          WHERE medicines_fts MATCH ? ORDER BY rank LIMIT ?) f
+    JOIN medicines m ON m.id = f.rowid
+    ORDER BY f.rank
+'''
+
+# fts5vocab считает карточки обходом всего индекса, поэтому словарь
+# читается целиком и кэшируется до изменения каталога
+VOCAB_SQL = 'SELECT term, doc FROM medicines_fts_vocab'
+
+# путь базы -> (catalog_version, {первая буква: (слова по порядку,
+#                                                [(слово, карточек, биграммы)])})
+_vocabularies = {}
+
+# слова так же, как их режет токенизатор unicode61
+TERM_RE = re.compile(r'[^\W_]+')
+
+
+def _day(value):
+    """Дата (date/datetime или строка) в формате хранения"""
+    if hasattr(value, 'hour'):
+        return value.strftime('%Y-%m-%d %H:%M:%S')
+    return str(value)
+
+
+def search_terms(query):
+    return TERM_RE.findall(query.lower())
+
+
+def _bigrams(word):
+    return {word[i:i + 2] for i in range(len(word) - 1)}
+
+
+def prefix_distance(word, term, limit):
+    """Расстояние Левенштейна от word до ближайшего начала term;
+    limit + 1, если оно больше limit"""
+    n = len(word)
+    term = term[:n + limit]
+    previous = list(range(len(term) + 1))
+    for i, char in enumerate(word, 1):
+        current = [i]
+        for j, other in enumerate(term, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1,
+                               previous[j - 1] + (char != other)))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return min(previous[max(0, n - limit):])
+
+
+def edit_distance(word, term):
+    previous = list(range(len(term) + 1))
+    for i, char in enumerate(word, 1):
+        current = [i]
+        for j, other in enumerate(term, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1,
+                               previous[j - 1] + (char != other)))
+        previous = current
+    return previous[-1]
+
+
+def _with_prefix(vocabulary, word):
+    words = vocabulary.get(word[0], ((),))[0]
+    end = word[:-1] + chr(ord(word[-1]) + 1)
+    return words[bisect_left(words, word):bisect_left(words, end)]
+
+
+def _match(groups):
+    """Запрос FTS5: все группы обязательны, слово внутри группы - любое из вариантов"""
+    return ' AND '.join('(' + ' OR '.join(group) + ')' for group in groups)
+
+
+class Pharmacy:
+    manager = ConnectionManager(PHARMACY_DB)
+
+    @staticmethod
+    def configure(path):
+        """Переключение на другой файл базы данных"""
+        Pharmacy.manager.close_all()
+        Pharmacy.manager = ConnectionManager(path)
+
+    @staticmethod
+    def init_db():
+        """Создание таблиц и применение миграций"""
+        Database.migrate(Pharmacy.get_connection(), MIGRATIONS)
+
+    @staticmethod
+    def get_connection():
+        return Pharmacy.manager.get()
+
+    @staticmethod
+    def close():
+        Pharmacy.manager.close_all()
+
+    @staticmethod
+    def expiring_within(days, today=None):
+        """Лекарства, срок годности которых истекает в ближайшие days дней.
+        Строки: (id, name, category, quantity, expiry_date)"""
+        today = today or date.today()
+        conn = Pharmacy.get_connection()
+        return conn.execute(EXPIRING_SQL, (_day(today), _day(today + timedelta(days=days)))).fetchall()
+
+    @staticmethod
+    def below_reorder_level(category=None):
+        """Лекарства с остатком ниже порога дозаказа.
+        Строки: (id, name, category, quantity, reorder_level, заказано)"""
+        conn = Pharmacy.get_connection()
+        if category is None:
+            return conn.execute(LOW_STOCK_SQL.format(category=''), (OPEN_ORDER_STATUS,)).fetchall()
+        return conn.execute(LOW_STOCK_SQL.format(category='AND m.category = ?'),
+                            (OPEN_ORDER_STATUS, category)).fetchall()
+
+    @staticmethod
+    def sales_by_period(start, end):
+        """Продажи за период [start, end) по лекарствам, по убыванию выручки.
+        Строки: (medicine_id, name, продаж, штук, выручка)"""
+        conn = Pharmacy.get_connection()
+        return conn.execute(SALES_BY_PERIOD_SQL, (_day(start), _day(end))).fetchall()
+
+    @staticmethod
+    def medicine_sales(medicine_id, start, end):
+        """Продажи одного лекарства за период [start, end)"""
+        conn = Pharmacy.get_connection()
+        return conn.execute(MEDICINE_SALES_SQL, (medicine_id, _day(start), _day(end))).fetchall()
+
+    @staticmethod
+    def pending_deliveries(until=None):
+        """Недоставленные заказы поставщикам с ожидаемой датой не позже until"""
+        until = until or date.today()
+        conn = Pharmacy.get_connection()
+        return conn.execute(PENDING_DELIVERIES_SQL, (OPEN_ORDER_STATUS, _day(until))).fetchall()
+
+    @staticmethod
+    def search_medicines(query, limit=SEARCH_LIMIT):
+        """Поиск по названию, производителю и категории: каждое слово запроса -
+        начало слова в карточке. Если совпадений меньше limit, добираются
+        карточки, где слова запроса найдены с опечаткой.
+        Строки: (id, name, manufacturer, category, quantity, price)"""
+        terms = search_terms(query)
+        if not terms:
+            return []
+        exact = [[f'"{term}"*'] for term in terms]
+        rows = Pharmacy._ranked(_match(exact), limit)
+        if len(rows) == limit:
+            return rows
+        vocabulary = Pharmacy._vocabulary()
+        groups = []
+        for term in terms:
+            known = _with_prefix(vocabulary, term)
+            if len(known) > EXPAND_TERMS:
+                groups.append([f'"{term}"*'])
+            else:
+                groups.append([f'"{word}"' for word in known or Pharmacy.correct_term(term)])
+        if not all(groups) or all(_with_prefix(vocabulary, term) for term in terms):
+            return rows
+        found = {row[0] for row in rows}
+        for row in Pharmacy._ranked(_match(groups), limit + len(rows)):
+            if row[0] not in found:
+                rows.append(row)
+                if len(rows) == limit:
+                    break
+        return rows
+
+    @staticmethod
+    def _ranked(match, limit):
+        conn = Pharmacy.get_connection()
+        return conn.execute(SEARCH_SQL, (match, limit)).fetchall()
+
+    @staticmethod
+    def _vocabulary():
+        conn = Pharmacy.get_connection()
+        version = conn.execute('SELECT version FROM catalog_version').fetchone()[0]
+        path = Pharmacy.manager.path
+        cached = _vocabularies.get(path)
+        if cached is None or cached[0] != version:
+            letters = {}
+            for term, docs in conn.execute(VOCAB_SQL):
+                words, entries = letters.setdefault(term[0], ([], []))
+                words.append(term)
+                entries.append((term, docs, _bigrams(term)))
+            cached = _vocabularies[path] = (version, letters)
+        return cached[1]
+
+    @staticmethod
+    def correct_term(word):
+        """Слова каталога, начало которых отличается от word не больше чем на
+        одну (две для длинных слов) правку. Кандидаты берутся из словаря
+        индекса (кэш _vocabulary) с той же первой буквой; остаются только
+        самые близкие (по началу слова, затем по слову целиком), частые - первыми"""
+        if len(word) < TYPO_MIN_LENGTH:
+            return []
+        limit = 2 if len(word) >= TYPO2_MIN_LENGTH else 1
+        # по лемме о q-граммах строки на расстоянии limit делят столько биграмм
+        shared = len(word) - 1 - 2 * limit
+        bigrams = _bigrams(word)
+        candidates = []
+        for term, docs, term_bigrams in Pharmacy._vocabulary().get(word[0], ((), ()))[1]:
+            # биграммы всего слова - надмножество биграмм его начала
+            if len(term) < len(word) - limit or len(bigrams & term_bigrams) < shared:
+                continue
+            if term.startswith(word):
+                continue
+            # limit сужается до лучшего найденного расстояния
+            distance = prefix_distance(word, term, limit)
+            if distance <= limit:
+                if distance < limit:
+                    limit, candidates = distance, []
+                candidates.append((edit_distance(word, term), -docs, term))
+        candidates.sort()
+        return [term for full, _, term in candidates[:TYPO_CANDIDATES]
+                if full == candidates[0][0]]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Обслуживание базы аптеки')
+    parser.add_argument('command', choices=['migrate'])
+    parser.add_argument('--db', default=PHARMACY_DB)
+    args = parser.parse_args(argv)
+    Pharmacy.configure(args.db)
+    try:
+        Pharmacy.init_db()
+    finally:
+        Pharmacy.close()
+
+
+if __name__ == '__main__':
+    main()
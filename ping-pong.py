@@ -1,8 +1,12 @@
 import sys
-import random
 from PyQt5.QtWidgets import (QApplication, QWidget, QVBoxLayout,QHBoxLayout, QLabel, QPushButton)
-from PyQt5.QtCore import QTimer, Qt
-from PyQt5.QtGui import QPainter, QColor, QFont
+from PyQt5.QtCore import QTimer, Qt, QEvent
+from PyQt5.QtGui import QPainter, QColor, QFont, QPen
+
+import game_loop
+import pong_engine
+import pong_input
+import pong_render
 
 
 class PongGame(QWidget):
@@ -15,6 +19,10 @@ class PongGame(QWidget):
         self.setWindowTitle('Пинг-Понг')
         self.setFixedSize(800, 600)
         self.setStyleSheet("background-color: black;")
+        self.setAttribute(Qt.WA_OpaquePaintEvent)
+        self.background = None
+        self.work = pong_render.WorkCounter()
+        self.dirty = pong_render.DirtyTracker(self.work)
         
         main_layout = QVBoxLayout()
 
@@ -74,26 +82,18 @@ class PongGame(QWidget):
         self.reset_button.clicked.connect(self.resetGame)
         
     def initGame(self):
-        self.paddle_width = 15
-        self.paddle_height = 100
-        self.ball_size = 15
-        
-        self.player1_y = 250
-        self.player2_y = 250
-        
-        self.ball_x = 400
-        self.ball_y = 300
-                
-        self.ball_speed_x = 5
-        self.ball_speed_y = 5
-              
-        self.player1_score = 0
-        self.player2_score = 0
+        self.state = pong_engine.new_state(pong_engine.CLASSIC_RULES)
+        self.loop = game_loop.FixedStepLoop(self.state, self.physicsStep)
+        self.keys = pong_input.HeldKeys({
+            Qt.Key_W: (1, -1), Qt.Key_S: (1, 1),    # игрок 1
+            Qt.Key_I: (2, -1), Qt.Key_K: (2, 1),    # игрок 2
+        })
         
         self.game_running = False
         self.game_paused = False
        
         self.timer = QTimer()
+        self.timer.setTimerType(Qt.PreciseTimer)
         self.timer.timeout.connect(self.updateGame)
         
     def startGame(self):
@@ -102,6 +102,7 @@ class PongGame(QWidget):
             self.game_paused = False
             self.start_button.setEnabled(False)
             self.pause_button.setEnabled(True)
+            self.loop.start()
             self.timer.start(16) 
             
     def pauseGame(self):
@@ -109,11 +110,14 @@ class PongGame(QWidget):
             if self.game_paused:
                 self.game_paused = False
                 self.pause_button.setText('Пауза')
+                self.loop.start()
                 self.timer.start(16)
             else:
                 self.game_paused = True
                 self.pause_button.setText('Продолжить')
                 self.timer.stop()
+            self.dirty.reset()
+            self.update()
                 
     def resetGame(self):
         self.timer.stop()
@@ -122,88 +126,72 @@ class PongGame(QWidget):
         self.start_button.setEnabled(True)
         self.pause_button.setEnabled(False)
         self.pause_button.setText('Пауза')
+        self.dirty.reset()
         self.update()
         
     def updateGame(self):
         if not self.game_running or self.game_paused:
             return
             
-        self.ball_x += self.ball_speed_x
-        self.ball_y += self.ball_speed_y
-        
-
-        if self.ball_y <= 0 or self.ball_y >= 600 - self.ball_size:
-            self.ball_speed_y = -self.ball_speed_y
-            
-
-        if (self.ball_x <= 20 + self.paddle_width and 
-            self.ball_y + self.ball_size >= self.player1_y and 
-            self.ball_y <= self.player1_y + self.paddle_height):
-            self.ball_speed_x = abs(self.ball_speed_x)
-            self.ball_speed_y += random.uniform(-1, 1)
-            
-
-        if (self.ball_x >= 800 - 20 - self.paddle_width - self.ball_size and 
-            self.ball_y + self.ball_size >= self.player2_y and 
-            self.ball_y <= self.player2_y + self.paddle_height):
-            self.ball_speed_x = -abs(self.ball_speed_x)  
-            self.ball_speed_y += random.uniform(-1, 1)
-            
-        if self.ball_x < 0:
-            self.player2_score += 1
-            self.resetBall()
-        elif self.ball_x > 800:
-            self.player1_score += 1
-            self.resetBall()
+        self.loop.advance()
             
-        self.updateScores()
-        self.update()
-        
-    def resetBall(self):
-        self.ball_x = 400
-        self.ball_y = 300
-        self.ball_speed_x = random.choice([-5, 5])
-        self.ball_speed_y = random.uniform(-3, 3)
+        if self.loop.pop_events():
+            self.updateScores()
+        self.refresh()
+        self.work.end_frame()
         
     def updateScores(self):
-        self.player1_score_label.setText(f'Игрок 1: {self.player1_score}')
-        self.player2_score_label.setText(f'Игрок 2: {self.player2_score}')
+        self.player1_score_label.setText(f'Игрок 1: {self.state.score1}')
+        self.player2_score_label.setText(f'Игрок 2: {self.state.score2}')
+        self.work.add('label', 2)
+        
+    def physicsStep(self, state):
+        # ракетки движутся в шаге физики, пока клавиши удерживаются
+        return pong_engine.step(state, self.keys.poll())
         
     def keyPressEvent(self, event):
-        if not self.game_running or self.game_paused:
+        # автоповтор ОС не нужен: движение задает удержание клавиши
+        if event.isAutoRepeat():
             return
+        if not self.keys.press(event.key()):
+            super().keyPressEvent(event)
             
-        # Управление для игрока 1 
-        if event.key() == Qt.Key_W and self.player1_y > 0:
-            self.player1_y -= 20
-        elif event.key() == Qt.Key_S and self.player1_y < 600 - self.paddle_height:
-            self.player1_y += 20
-            
-        # Управление для игрока 2 
-        if event.key() == Qt.Key_I and self.player2_y > 0:
-            self.player2_y -= 20
-        elif event.key() == Qt.Key_K and self.player2_y < 600 - self.paddle_height:
-            self.player2_y += 20
+    def keyReleaseEvent(self, event):
+        if event.isAutoRepeat():
+            return
+        if not self.keys.release(event.key()):
+            super().keyReleaseEvent(event)
             
-        self.update()
+    def changeEvent(self, event):
+        # окно потеряло фокус - отпускания клавиш до него уже не дойдут
+        if event.type() == QEvent.ActivationChange and not self.isActiveWindow():
+            self.keys.clear()
+        super().changeEvent(event)
+        
+    def refresh(self):
+        """Перерисовать только области, где мяч или ракетки сдвинулись"""
+        self.dirty.invalidate(self, self.state.rules, self.loop.render_positions())
         
     def paintEvent(self, event):
+        rules = self.state.rules
+        ball_x, ball_y, player1_y, player2_y = self.loop.render_positions()
+        if self.background is None or self.background.size() != self.size():
+            self.background = pong_render.static_layer(
+                self.size(), QColor(0, 0, 0), QPen(QColor(255, 255, 255)), rules)
         painter = QPainter(self)
+        painter.drawPixmap(event.rect(), self.background, event.rect())
         painter.setRenderHint(QPainter.Antialiasing)
         
-
-        painter.setPen(QColor(255, 255, 255))
-        painter.drawLine(400, 0, 400, 600)
-        
     
-        painter.fillRect(20, self.player1_y, self.paddle_width, self.paddle_height, QColor(0, 255, 0))
+        painter.fillRect(rules.paddle_x, int(player1_y), rules.paddle_width, rules.paddle_height, QColor(0, 255, 0))
         
 
-        painter.fillRect(800 - 20 - self.paddle_width, self.player2_y, self.paddle_width, self.paddle_height, QColor(0, 0, 255))
+        painter.fillRect(rules.width - rules.paddle_x - rules.paddle_width, int(player2_y), rules.paddle_width, rules.paddle_height, QColor(0, 0, 255))
         
 
+        painter.setPen(QColor(255, 255, 255))
         painter.setBrush(QColor(255, 255, 255))
-        painter.drawEllipse(int(self.ball_x), int(self.ball_y), self.ball_size, self.ball_size)
+        painter.drawEllipse(int(ball_x), int(ball_y), rules.ball_size, rules.ball_size)
         
    
         if self.game_paused:
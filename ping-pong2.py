@@ -1,128 +1,47 @@
 import sys
-import hashlib
-import sqlite3
 import os
-from datetime import datetime
+import random
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
                              QHBoxLayout, QPushButton, QLabel, QLineEdit, 
-                             QMessageBox, QTableWidget, QTableWidgetItem, 
-                             QTabWidget, QDialog, QHeaderView)
-from PyQt5.QtCore import Qt, QTimer, QRect
+                             QMessageBox, QTableView, 
+                             QTabWidget, QDialog, QHeaderView, QGridLayout, QComboBox,
+                             QSlider, QInputDialog)
+from PyQt5.QtCore import (Qt, QTimer, QRect, QAbstractTableModel, QModelIndex, QVariant,
+                          QObject, pyqtSignal, QEvent)
 from PyQt5.QtGui import QFont, QPalette, QColor, QBrush, QPainter, QPen
 
+import game_loop
+import pong_ai
+import pong_engine
+import pong_input
+import pong_leaderboard
+import pong_net
+import pong_render
+import pong_replay
+from pong_db import Database, ResultWriter
+from pong_auth import default_service
 
-DB_FILE = "ping_pong.db"
 
-class Database:
-    @staticmethod
-    def init_db():
-        """Инициализация базы данных"""
-        conn = sqlite3.connect(DB_FILE)
-        cursor = conn.cursor()
-        
+class FutureBridge(QObject):
+    """Доставка результата concurrent.futures.Future в поток интерфейса"""
+    done = pyqtSignal(object, object)
+
+    def __init__(self):
+        super().__init__()
+        self.done.connect(lambda future, callback: callback(future))
+
+    def watch(self, future, callback):
+        # сигнал испускается из рабочего потока, слот выполнится в потоке GUI
+        future.add_done_callback(lambda f: self.done.emit(f, callback))
 
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS users (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                username TEXT UNIQUE NOT NULL,
-                password_hash TEXT NOT NULL,
-                registration_date TEXT NOT NULL
-            )
-        ''')
-        
-   
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS game_history (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                username TEXT NOT NULL,
-                game_date TEXT NOT NULL,
-                player1_score INTEGER NOT NULL,
-                player2_score INTEGER NOT NULL,
-                winner TEXT NOT NULL,
-                FOREIGN KEY (username) REFERENCES users (username)
-            )
-        ''')
-        
-        conn.commit()
-        conn.close()
-    
-    @staticmethod
-    def get_connection():
-        """Получение соединения с базой данных"""
-        return sqlite3.connect(DB_FILE)
-    
-    @staticmethod
-    def user_exists(username):
-        """Проверка существования пользователя"""
-        conn = Database.get_connection()
-        cursor = conn.cursor()
-        cursor.execute('SELECT id FROM users WHERE username = ?', (username,))
-        result = cursor.fetchone()
-        conn.close()
-        return result is not None
-    
-    @staticmethod
-    def create_user(username, password_hash):
-        """Создание нового пользователя"""
-        conn = Database.get_connection()
-        cursor = conn.cursor()
-        try:
-            cursor.execute('''
-                INSERT INTO users (username, password_hash, registration_date)
-                VALUES (?, ?, ?)
-            ''', (username, password_hash, datetime.now().strftime('%Y-%m-%d %H:%M:%S')))
-            conn.commit()
-            conn.close()
-            return True
-        except sqlite3.IntegrityError:
-            conn.close()
-            return False
-    
-    @staticmethod
-    def verify_user(username, password_hash):
-        """Проверка пользователя"""
-        conn = Database.get_connection()
-        cursor = conn.cursor()
-        cursor.execute('''
-            SELECT id FROM users 
-            WHERE username = ? AND password_hash = ?
-        ''', (username, password_hash))
-        result = cursor.fetchone()
-        conn.close()
-        return result is not None
-    
-    @staticmethod
-    def save_game_result(username, player1_score, player2_score, winner):
-        """Сохранение результата игры"""
-        conn = Database.get_connection()
-        cursor = conn.cursor()
-        cursor.execute('''
-            INSERT INTO game_history (username, game_date, player1_score, player2_score, winner)
-            VALUES (?, ?, ?, ?, ?)
-        ''', (username, datetime.now().strftime('%Y-%m-%d %H:%M:%S'), 
-              player1_score, player2_score, winner))
-        conn.commit()
-        conn.close()
-    
-    @staticmethod
-    def get_user_games(username):
-        """Получение истории игр пользователя"""
-        conn = Database.get_connection()
-        cursor = conn.cursor()
-        cursor.execute('''
-            SELECT game_date, player1_score, player2_score, winner 
-            FROM game_history 
-            WHERE username = ? 
-            ORDER BY game_date DESC
-        ''', (username,))
-        games = cursor.fetchall()
-        conn.close()
-        return games
 
 class AuthWindow(QMainWindow):
     def __init__(self):
         super().__init__()
         self.current_user = None
+        # хэширование паролей идет в пуле потоков, окно не замирает
+        self.hasher = default_service()
+        self.bridge = FutureBridge()
         self.initUI()
         
     def initUI(self):
@@ -244,8 +163,10 @@ class AuthWindow(QMainWindow):
         self.tabs.addTab(register_tab, "Регистрация")
         layout.addWidget(self.tabs)
         
-    def hash_password(self, password):
-        return hashlib.sha256(password.encode()).hexdigest()
+    def set_busy(self, busy):
+        """Блокировка кнопок на время проверки пароля"""
+        self.login_btn.setEnabled(not busy)
+        self.register_btn.setEnabled(not busy)
     
     def login(self):
         username = self.login_username.text()
@@ -255,9 +176,13 @@ class AuthWindow(QMainWindow):
             QMessageBox.warning(self, 'Ошибка', 'Заполните все поля!')
             return
         
-        password_hash = self.hash_password(password)
-        
-        if Database.verify_user(username, password_hash):
+        self.set_busy(True)
+        future = self.hasher.verify_login(username, password)
+        self.bridge.watch(future, lambda f: self.login_done(f, username))
+    
+    def login_done(self, future, username):
+        self.set_busy(False)
+        if future.exception() is None and future.result():
             self.current_user = username
             self.open_game_window()
         else:
@@ -280,13 +205,13 @@ class AuthWindow(QMainWindow):
             QMessageBox.warning(self, 'Ошибка', 'Пароль должен содержать минимум 4 символа!')
             return
         
-        if Database.user_exists(username):
-            QMessageBox.warning(self, 'Ошибка', 'Пользователь с таким логином уже существует!')
-            return
-        
-        password_hash = self.hash_password(password)
-        
-        if Database.create_user(username, password_hash):
+        # занятость логина проверяет сама вставка: один запрос, без гонки
+        self.set_busy(True)
+        self.bridge.watch(self.hasher.register(username, password), self.register_done)
+    
+    def register_done(self, future):
+        self.set_busy(False)
+        if future.exception() is None and future.result():
             QMessageBox.information(self, 'Успех', 'Регистрация прошла успешно!')
             
           
@@ -296,6 +221,8 @@ class AuthWindow(QMainWindow):
             
          
             self.tabs.setCurrentIndex(0)
+        elif future.exception() is None:
+            QMessageBox.warning(self, 'Ошибка', 'Пользователь с таким логином уже существует!')
         else:
             QMessageBox.warning(self, 'Ошибка', 'Ошибка при регистрации пользователя!')
     
@@ -305,9 +232,18 @@ class AuthWindow(QMainWindow):
         self.hide()
 
 class GameWindow(QMainWindow):
+    OPPONENTS = [
+        ('Соперник: человек', None),
+        ('Компьютер: легкий', 'easy'),
+        ('Компьютер: средний', 'normal'),
+        ('Компьютер: сложный', 'hard'),
+    ]
+    
     def __init__(self, username):
         super().__init__()
         self.username = username
+        # результаты пишутся в базу фоновым потоком, окно игры не ждет диска
+        self.results = ResultWriter()
         self.initUI()
         self.initGame()
         
@@ -367,33 +303,53 @@ class GameWindow(QMainWindow):
         self.pause_btn.setEnabled(False)
         self.history_btn = QPushButton('История игр')
         self.history_btn.clicked.connect(self.show_history)
+        self.leaderboard_btn = QPushButton('Рейтинг')
+        self.leaderboard_btn.clicked.connect(self.show_leaderboard)
+        self.network_btn = QPushButton('Сетевая игра')
+        self.network_btn.clicked.connect(self.toggle_network)
         self.logout_btn = QPushButton('Выйти')
         self.logout_btn.clicked.connect(self.logout)
+        # без фокуса: иначе список перехватывает клавиши управления ракетками
+        self.opponent_box = QComboBox()
+        self.opponent_box.setFocusPolicy(Qt.NoFocus)
+        for title, level in self.OPPONENTS:
+            self.opponent_box.addItem(title, level)
+        self.opponent_box.setCurrentIndex(2)
+        self.opponent_box.currentIndexChanged.connect(self.set_opponent)
         
+        control_layout.addWidget(self.opponent_box)
         control_layout.addWidget(self.start_btn)
         control_layout.addWidget(self.pause_btn)
         control_layout.addWidget(self.history_btn)
+        control_layout.addWidget(self.leaderboard_btn)
+        control_layout.addWidget(self.network_btn)
         control_layout.addWidget(self.logout_btn)
         layout.addLayout(control_layout)
         
     def initGame(self):
-        self.game_widget.ball_x = 400
-        self.game_widget.ball_y = 250
-        self.game_widget.ball_dx = 5
-        self.game_widget.ball_dy = 5
-        self.game_widget.ball_size = 15
-        
-        self.game_widget.paddle1_y = 210
-        self.game_widget.paddle2_y = 210
-        self.game_widget.paddle_width = 10
-        self.game_widget.paddle_height = 80
-        
-        self.score1 = 0
-        self.score2 = 0
+        self.state = pong_engine.new_state(pong_engine.SPEEDUP_RULES)
+        self.loop = game_loop.FixedStepLoop(self.state, self.physics_step)
+        self.game_widget.state = self.state
+        self.game_widget.loop = self.loop
+        self.work = pong_render.WorkCounter()
+        self.game_widget.dirty.work = self.work
+        
+        self.set_opponent()
+        # удерживаемые клавиши опрашиваются в шаге физики, поэтому матч
+        # полностью описывается зерном и вводом по тикам
+        self.keys = pong_input.HeldKeys({
+            Qt.Key_W: (1, -1), Qt.Key_S: (1, 1),
+            Qt.Key_O: (2, -1), Qt.Key_L: (2, 1),
+        })
+        self.new_match()
+        
         self.game_active = False
         self.game_paused = False
+        # клиент сетевой игры; None - игра на одном компьютере
+        self.net = None
         
         self.timer = QTimer()
+        self.timer.setTimerType(Qt.PreciseTimer)
         self.timer.timeout.connect(self.update_game)
     
     def start_game(self):
@@ -401,10 +357,12 @@ class GameWindow(QMainWindow):
         self.game_paused = False
         self.start_btn.setEnabled(False)
         self.pause_btn.setEnabled(True)
+        self.loop.start()
         self.timer.start(16) 
         
     def pause_game(self):
         if self.game_paused:
+            self.loop.start()
             self.timer.start(16)
             self.pause_btn.setText('Пауза')
             self.game_paused = False
@@ -417,137 +375,308 @@ class GameWindow(QMainWindow):
         if not self.game_active:
             return
             
-        game = self.game_widget
+        self.loop.advance()
         
-
-        game.ball_x += game.ball_dx
-        game.ball_y += game.ball_dy
-        
-      
-        if game.ball_y <= 0 or game.ball_y >= 500 - game.ball_size:
-            game.ball_dy *= -1
-            
-      
-        if (game.ball_x <= 20 + game.paddle_width and 
-            game.ball_x >= 20 and
-            game.paddle1_y <= game.ball_y <= game.paddle1_y + game.paddle_height):
-            game.ball_dx = abs(game.ball_dx)
-            game.ball_dy += 1 if game.ball_dy > 0 else -1
-            
-         
-        if (game.ball_x >= 800 - 20 - game.paddle_width - game.ball_size and 
-            game.ball_x <= 800 - 20 and
-            game.paddle2_y <= game.ball_y <= game.paddle2_y + game.paddle_height):
-            game.ball_dx = -abs(game.ball_dx)
-            game.ball_dy += 1 if game.ball_dy > 0 else -1
-            
-    
-        if game.ball_x < 0:
-            self.score2 += 1
-            self.reset_ball()
-        elif game.ball_x > 800:
-            self.score1 += 1
-            self.reset_ball()
-            
        
-        self.player1_score.setText(f'Игрок 1: {self.score1}')
-        self.player2_score.setText(f'Игрок 2: {self.score2}')
+        if self.loop.pop_events():
+            self.update_scores()
         
       
-        if self.score1 >= 10 or self.score2 >= 10:
+        if self.net:
+            self.check_network_result()
+        elif pong_engine.winner(self.state):
             self.end_game()
             
-        self.game_widget.update()
+        self.game_widget.refresh()
+        self.work.end_frame()
+    
+    def update_scores(self):
+        """Обновление табло - только когда счет изменился"""
+        if self.net:
+            # в сетевой игре счет - по снимку сервера, а не по прогнозу
+            score1, score2 = self.net.prediction.server_scores()
+        else:
+            score1, score2 = self.state.score1, self.state.score2
+        self.player1_score.setText(f'Игрок 1: {score1}')
+        self.player2_score.setText(f'Игрок 2: {score2}')
+        self.work.add('label', 2)
+    
+    def set_opponent(self):
+        """Второй ракеткой управляет компьютер выбранного уровня или человек (O/L)"""
+        level = self.opponent_box.currentData()
+        self.cpu = pong_ai.CpuPlayer.level(self.state.rules, level) if level else None
+    
+    def new_match(self):
+        """Начало записи очередного матча"""
+        self.recorder = pong_replay.Recorder(self.state, random.getrandbits(63))
     
-    def reset_ball(self):
-        game = self.game_widget
-        game.ball_x = 400
-        game.ball_y = 250
-        game.ball_dx *= -1
-        game.ball_dy = 10 if game.ball_dy > 0 else -10
+    def physics_step(self, state):
+        move1, move2 = self.keys.poll()
+        if self.cpu:
+            move2 = self.cpu.decide(state)
+        inputs = (move1, move2)
+        self.recorder.record(inputs)
+        scored = pong_engine.step(state, inputs)
+        if pong_engine.winner(state):
+            self.loop.stop()
+        return scored
     
     def end_game(self):
         self.game_active = False
         self.timer.stop()
+        self.loop.stop()
         self.start_btn.setEnabled(True)
         self.pause_btn.setEnabled(False)
         
-      
-        winner = "Игрок 1" if self.score1 > self.score2 else "Игрок 2"
-        Database.save_game_result(self.username, self.score1, self.score2, winner)
+        score1, score2 = self.state.score1, self.state.score2
+        winner = "Игрок 1" if pong_engine.winner(self.state) == 1 else "Игрок 2"
+        replay = self.recorder.replay.dumps()
+        if not self.results.submit(self.username, score1, score2, winner, replay=replay):
+            # очередь переполнена - не теряем результат
+            Database.save_game_result(self.username, score1, score2, winner, replay)
         
-        QMessageBox.information(self, 'Игра окончена', f'Победил: {winner}\nСчет: {self.score1}:{self.score2}')
+        QMessageBox.information(self, 'Игра окончена', f'Победил: {winner}\nСчет: {score1}:{score2}')
         
        
-        self.score1 = 0
-        self.score2 = 0
-        self.player1_score.setText('Игрок 1: 0')
-        self.player2_score.setText('Игрок 2: 0')
-        self.reset_ball()
+        pong_engine.reset_match(self.state)
+        self.new_match()
+        self.loop.sync()
+        self.loop.pop_events()
+        self.update_scores()
+    
+    def toggle_network(self):
+        if self.net:
+            self.stop_network()
+        else:
+            self.start_network()
+    
+    def start_network(self):
+        """Подключение к серверу pong_net: своя ракетка - W/S, второй играет
+        другой клиент, результаты в game_history записывает сервер"""
+        address, ok = QInputDialog.getText(self, 'Сетевая игра', 'Адрес сервера:',
+                                           text=f'localhost:{pong_net.DEFAULT_PORT}')
+        if not ok:
+            return
+        host, _, port = address.strip().rpartition(':')
+        try:
+            self.net = pong_net.NetClient(host or 'localhost', int(port), self.username).start()
+        except (ValueError, OSError) as e:
+            QMessageBox.warning(self, 'Ошибка', f'Не удалось подключиться: {e}')
+            return
+        
+        self.timer.stop()
+        # локальная партия ждет отключения от сервера
+        self.local = (self.state, self.loop)
+        self.state = self.net.state
+        self.loop = game_loop.FixedStepLoop(self.state, self.network_step)
+        self.game_widget.state = self.state
+        self.game_widget.loop = self.loop
+        self.cpu = None
+        self.network_result = 0
+        self.network_scores = (0, 0)
+        self.update_scores()
+        self.opponent_box.setEnabled(False)
+        self.network_btn.setText('Отключиться')
+        self.start_game()
+        self.pause_btn.setEnabled(False)
+    
+    def stop_network(self):
+        """Отключение от сервера (место освобождается сразу) и возврат
+        к прерванной партии на одном компьютере"""
+        self.timer.stop()
+        self.net.stop()
+        self.net = None
+        self.state, self.loop = self.local
+        self.game_widget.state = self.state
+        self.game_widget.loop = self.loop
+        self.set_opponent()
+        self.game_active = False
+        self.game_paused = False
+        self.start_btn.setEnabled(True)
+        self.pause_btn.setEnabled(False)
+        self.pause_btn.setText('Пауза')
+        self.opponent_box.setEnabled(True)
+        self.network_btn.setText('Сетевая игра')
+        self.update_scores()
+        self.game_widget.update()
+    
+    def network_step(self, state):
+        move, _ = self.keys.poll()
+        return self.net.tick(move)
+    
+    def check_network_result(self):
+        prediction = self.net.prediction
+        scores = prediction.server_scores()
+        if scores != self.network_scores:
+            self.network_scores = scores
+            self.update_scores()
+        # сервер держит итоговый счет несколько секунд, сообщение - один раз
+        winner = prediction.server_winner()
+        if winner and not self.network_result:
+            score1, score2 = scores
+            QMessageBox.information(self, 'Игра окончена',
+                                    f'Победил: Игрок {winner} (вы - Игрок {prediction.player})\n'
+                                    f'Счет: {score1}:{score2}')
+            self.loop.start()
+        self.network_result = winner
     
     def keyPressEvent(self, event):
-        if not self.game_active or self.game_paused:
+        # автоповтор ОС не нужен: движение задает удержание клавиши;
+        # клавиши второго игрока при компьютерном сопернике не действуют
+        if event.isAutoRepeat():
             return
-            
-        game = self.game_widget
-        if event.key() == Qt.Key_W and game.paddle1_y > 0:
-            game.paddle1_y -= 20
-        elif event.key() == Qt.Key_S and game.paddle1_y < 500 - game.paddle_height:
-            game.paddle1_y += 20
-        elif event.key() == Qt.Key_O and game.paddle2_y > 0:
-            game.paddle2_y -= 20
-        elif event.key() == Qt.Key_L and game.paddle2_y < 500 - game.paddle_height:
-            game.paddle2_y += 20
+        if not self.keys.press(event.key()):
+            super().keyPressEvent(event)
+    
+    def keyReleaseEvent(self, event):
+        if event.isAutoRepeat():
+            return
+        if not self.keys.release(event.key()):
+            super().keyReleaseEvent(event)
+    
+    def changeEvent(self, event):
+        # окно потеряло фокус - отпускания клавиш до него уже не дойдут
+        if event.type() == QEvent.ActivationChange and not self.isActiveWindow():
+            self.keys.clear()
+        super().changeEvent(event)
     
     def show_history(self):
+        self.results.flush()
         self.history_window = HistoryWindow(self.username)
         self.history_window.show()
     
+    def show_leaderboard(self):
+        self.results.flush()
+        self.leaderboard_window = LeaderboardWindow(self.username)
+        self.leaderboard_window.show()
+    
     def logout(self):
         self.auth_window = AuthWindow()
         self.auth_window.show()
         self.close()
+    
+    def closeEvent(self, event):
+        self.timer.stop()
+        if self.net:
+            self.net.stop()
+        failed = self.results.close()
+        if failed:
+            QMessageBox.warning(self, 'Ошибка', f'Не удалось сохранить результаты игр: {len(failed)}')
+        super().closeEvent(event)
 
 class GameWidget(QWidget):
     def __init__(self, parent):
         super().__init__(parent)
         self.setStyleSheet("background: black;")
-        
- 
-        self.ball_x = 400
-        self.ball_y = 250
-        self.ball_dx = 5
-        self.ball_dy = 5
-        self.ball_size = 15
-        
-        self.paddle1_y = 210
-        self.paddle2_y = 210
-        self.paddle_width = 10
-        self.paddle_height = 80
+        # фон рисуется из кэша целиком, очищать виджет перед отрисовкой не нужно
+        self.setAttribute(Qt.WA_OpaquePaintEvent)
+        self.state = pong_engine.new_state(pong_engine.SPEEDUP_RULES)
+        self.loop = None
+        self.background = None
+        self.dirty = pong_render.DirtyTracker()
+    
+    def render_positions(self):
+        if self.loop is not None:
+            return self.loop.render_positions()
+        return game_loop.positions(self.state)
+    
+    def refresh(self):
+        """Перерисовать только области, где мяч или ракетки сдвинулись"""
+        self.dirty.invalidate(self, self.state.rules, self.render_positions())
     
     def paintEvent(self, event):
+        rules = self.state.rules
+        ball_x, ball_y, paddle1_y, paddle2_y = self.render_positions()
+        if self.background is None or self.background.size() != self.size():
+            self.background = pong_render.static_layer(
+                self.size(), QColor(Qt.black), QPen(Qt.white, 2, Qt.DashLine), rules)
         painter = QPainter(self)
+        painter.drawPixmap(event.rect(), self.background, event.rect())
         painter.setRenderHint(QPainter.Antialiasing)
         
 
         painter.setBrush(QBrush(Qt.white))
-        painter.drawEllipse(self.ball_x, self.ball_y, self.ball_size, self.ball_size)
+        painter.drawEllipse(int(ball_x), int(ball_y), rules.ball_size, rules.ball_size)
         
 
-        painter.drawRect(20, self.paddle1_y, self.paddle_width, self.paddle_height)
-        painter.drawRect(800 - 20 - self.paddle_width, self.paddle2_y, self.paddle_width, self.paddle_height)
-        
-     
-        pen = QPen(Qt.white, 2, Qt.DashLine)
-        painter.setPen(pen)
-        painter.drawLine(400, 0, 400, 500)
+        painter.drawRect(rules.paddle_x, int(paddle1_y), rules.paddle_width, rules.paddle_height)
+        painter.drawRect(rules.width - rules.paddle_x - rules.paddle_width, int(paddle2_y), rules.paddle_width, rules.paddle_height)
+
+class HistoryModel(QAbstractTableModel):
+    """История игр, подгружаемая страницами по мере прокрутки"""
+    HEADERS = ['Дата и время', 'Игрок 1', 'Игрок 2', 'Счет', 'Победитель']
+    
+    def __init__(self, username, page_size=100):
+        super().__init__()
+        self.username = username
+        self.page_size = page_size
+        self.rows = []
+        self.exhausted = False
+    
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+    
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+    
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return QVariant()
+    
+    def data(self, index, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole or not index.isValid():
+            return QVariant()
+        game_id, game_date, player1_score, player2_score, winner = self.rows[index.row()]
+        column = index.column()
+        if column == 0:
+            return game_date
+        if column == 1:
+            return self.username
+        if column == 2:
+            return 'Компьютер'
+        if column == 3:
+            return f"{player1_score}:{player2_score}"
+        return winner
+    
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and not self.exhausted
+    
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or self.exhausted:
+            return
+        after = None
+        if self.rows:
+            last = self.rows[-1]
+            after = (last[1], last[0])
+        page = Database.get_user_games_page(self.username, after, self.page_size)
+        if len(page) < self.page_size:
+            self.exhausted = True
+        if not page:
+            return
+        first = len(self.rows)
+        self.beginInsertRows(QModelIndex(), first, first + len(page) - 1)
+        self.rows.extend(page)
+        self.endInsertRows()
 
 class HistoryWindow(QDialog):
+    STATS = [
+        ('games', 'Игр сыграно'),
+        ('wins', 'Побед'),
+        ('losses', 'Поражений'),
+        ('win_rate', 'Процент побед'),
+        ('points', 'Очки (забито:пропущено)'),
+        ('current_streak', 'Текущая серия'),
+        ('best_streak', 'Лучшая серия побед'),
+        ('last_played', 'Последняя игра'),
+    ]
+    
     def __init__(self, username):
         super().__init__()
         self.username = username
         self.initUI()
         self.load_history()
+        self.load_stats()
         
     def initUI(self):
         self.setWindowTitle('История игр')
@@ -563,7 +692,7 @@ class HistoryWindow(QDialog):
                 font-weight: bold;
                 padding: 10px;
             }
-            QTableWidget {
+            QTableView {
                 background: white;
                 border: 2px solid #34495e;
                 border-radius: 8px;
@@ -575,6 +704,20 @@ class HistoryWindow(QDialog):
                 padding: 8px;
                 font-weight: bold;
             }
+            QTabWidget::pane {
+                border: 2px solid #34495e;
+                border-radius: 8px;
+            }
+            QTabBar::tab {
+                background: #34495e;
+                color: white;
+                padding: 10px;
+                margin: 2px;
+                border-radius: 4px;
+            }
+            QTabBar::tab:selected {
+                background: #e74c3c;
+            }
             QPushButton {
                 padding: 10px 20px;
                 background: qlineargradient(x1:0, y1:0, x2:1, y2:0,
@@ -599,32 +742,284 @@ class HistoryWindow(QDialog):
         layout.addWidget(title)
         
    
-        self.table = QTableWidget()
-        self.table.setColumnCount(5)
-        self.table.setHorizontalHeaderLabels(['Дата и время', 'Игрок 1', 'Игрок 2', 'Счет', 'Победитель'])
+        self.tabs = QTabWidget()
+        self.model = HistoryModel(self.username)
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        self.table.setSelectionBehavior(QTableView.SelectRows)
+        self.table.doubleClicked.connect(self.show_replay)
         header = self.table.horizontalHeader()
         header.setSectionResizeMode(QHeaderView.Stretch)
-        layout.addWidget(self.table)
+        self.tabs.addTab(self.table, "История")
+        
+        # статистика читается одной строкой user_stats, без прохода по истории
+        stats_tab = QWidget()
+        stats_layout = QGridLayout(stats_tab)
+        self.stats_labels = {}
+        for row, (key, caption) in enumerate(self.STATS):
+            stats_layout.addWidget(QLabel(caption), row, 0)
+            value = QLabel('-')
+            value.setAlignment(Qt.AlignRight | Qt.AlignVCenter)
+            stats_layout.addWidget(value, row, 1)
+            self.stats_labels[key] = value
+        stats_layout.setRowStretch(len(self.STATS), 1)
+        self.tabs.addTab(stats_tab, "Статистика")
+        layout.addWidget(self.tabs)
         
         
+        buttons_layout = QHBoxLayout()
+        replay_btn = QPushButton('Смотреть повтор')
+        replay_btn.clicked.connect(lambda: self.show_replay(self.table.currentIndex()))
+        buttons_layout.addWidget(replay_btn)
         close_btn = QPushButton('Закрыть')
         close_btn.clicked.connect(self.close)
-        layout.addWidget(close_btn)
+        buttons_layout.addWidget(close_btn)
+        layout.addLayout(buttons_layout)
         
         self.setLayout(layout)
     
+    def show_replay(self, index):
+        if not index.isValid():
+            QMessageBox.information(self, 'Повтор', 'Выберите игру в таблице')
+            return
+        game_id = self.model.rows[index.row()][0]
+        data = Database.get_replay(game_id)
+        if data is None:
+            QMessageBox.information(self, 'Повтор', 'Для этой игры нет записи')
+            return
+        try:
+            replay = pong_replay.Replay.loads(data)
+        except pong_replay.ReplayError as error:
+            QMessageBox.warning(self, 'Повтор', f'Запись повреждена: {error}')
+            return
+        self.replay_window = ReplayWindow(replay)
+        self.replay_window.show()
+    
     def load_history(self):
-        games = Database.get_user_games(self.username)
+        # первая страница; остальные модель подгрузит при прокрутке
+        if self.model.canFetchMore():
+            self.model.fetchMore()
+    
+    def load_stats(self):
+        stats = Database.get_user_stats(self.username)
+        if stats is None:
+            return
+        games = stats['games']
+        streak = stats['current_streak']
+        values = {
+            'games': games,
+            'wins': stats['wins'],
+            'losses': stats['losses'],
+            'win_rate': f"{stats['wins'] * 100 / games:.1f}%",
+            'points': f"{stats['points_for']}:{stats['points_against']}",
+            'current_streak': f"{abs(streak)} {'побед' if streak > 0 else 'поражений'}",
+            'best_streak': stats['best_streak'],
+            'last_played': stats['last_played'],
+        }
+        for key, value in values.items():
+            self.stats_labels[key].setText(str(value))
+
+class ReplayWindow(QDialog):
+    """Просмотр записи матча с перемоткой ползунком"""
+    
+    def __init__(self, replay):
+        super().__init__()
+        self.player = pong_replay.ReplayPlayer(replay)
+        self.loop = game_loop.FixedStepLoop(self.player.state, self.player.step)
+        self.initUI()
+        self.timer = QTimer()
+        self.timer.setTimerType(Qt.PreciseTimer)
+        self.timer.timeout.connect(self.update_replay)
+        self.show_position()
+    
+    def initUI(self):
+        self.setWindowTitle('Повтор матча')
+        rules = self.player.replay.rules
+        self.setStyleSheet("""
+            QDialog { background: #2c3e50; }
+            QLabel { color: white; font-size: 16px; font-weight: bold; }
+        """)
+        layout = QVBoxLayout()
+        self.score_label = QLabel()
+        self.score_label.setAlignment(Qt.AlignCenter)
+        layout.addWidget(self.score_label)
+        
+        self.game_widget = GameWidget(self)
+        self.game_widget.setFixedSize(rules.width, rules.height)
+        self.game_widget.state = self.player.state
+        self.game_widget.loop = self.loop
+        layout.addWidget(self.game_widget)
+        
+        controls = QHBoxLayout()
+        self.play_btn = QPushButton('Старт')
+        self.play_btn.clicked.connect(self.toggle_play)
+        controls.addWidget(self.play_btn)
+        self.slider = QSlider(Qt.Horizontal)
+        self.slider.setRange(0, self.player.replay.ticks)
+        self.slider.valueChanged.connect(self.seek)
+        controls.addWidget(self.slider)
+        self.time_label = QLabel()
+        controls.addWidget(self.time_label)
+        layout.addLayout(controls)
+        self.setLayout(layout)
+    
+    def toggle_play(self):
+        if self.timer.isActive():
+            self.timer.stop()
+            self.play_btn.setText('Старт')
+        else:
+            if self.player.finished():
+                self.seek(0)
+            self.loop.start()
+            self.timer.start(16)
+            self.play_btn.setText('Пауза')
+    
+    def seek(self, tick):
+        """Перемотка: физика досчитывается без отрисовки, затем кадр рисуется заново"""
+        if tick == self.player.position:
+            return
+        self.player.seek(tick)
+        self.loop.sync()
+        self.game_widget.dirty.reset()
+        self.show_position()
+    
+    def update_replay(self):
+        self.loop.advance()
+        self.loop.pop_events()
+        if self.player.finished():
+            self.timer.stop()
+            self.play_btn.setText('Старт')
+        self.show_position()
+    
+    def show_position(self):
+        state = self.player.state
+        self.score_label.setText(f'{state.score1} : {state.score2}')
+        seconds = self.player.position // game_loop.TICK_RATE
+        self.time_label.setText(f'{seconds // 60}:{seconds % 60:02d}')
+        self.slider.blockSignals(True)
+        self.slider.setValue(self.player.position)
+        self.slider.blockSignals(False)
+        self.game_widget.refresh()
+    
+    def closeEvent(self, event):
+        self.timer.stop()
+        event.accept()
+
+class LeaderboardModel(QAbstractTableModel):
+    """Готовая таблица лидеров из pong_leaderboard.top"""
+    
+    def __init__(self, rows, value_header, percent=False):
+        super().__init__()
+        self.rows = rows
+        self.headers = ['Место', 'Игрок', value_header, 'Игр']
+        self.percent = percent
+    
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+    
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.headers)
+    
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.headers[section]
+        return QVariant()
+    
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role != Qt.DisplayRole:
+            return QVariant()
+        value = self.rows[index.row()][index.column()]
+        if index.column() == 2 and self.percent:
+            return f"{value * 100:.1f}%"
+        return str(value)
+
+class LeaderboardWindow(QDialog):
+    def __init__(self, username):
+        super().__init__()
+        self.username = username
+        self.initUI()
+        
+    def initUI(self):
+        self.setWindowTitle('Рейтинг игроков')
+        self.setFixedSize(600, 600)
+        self.setStyleSheet("""
+            QDialog {
+                background: qlineargradient(x1:0, y1:0, x2:1, y2:1,
+                    stop:0 #2c3e50, stop:1 #34495e);
+            }
+            QLabel {
+                color: white;
+                font-size: 16px;
+                font-weight: bold;
+                padding: 6px;
+            }
+            QTableView {
+                background: white;
+                border: 2px solid #34495e;
+                border-radius: 8px;
+                font-size: 12px;
+            }
+            QHeaderView::section {
+                background: #e74c3c;
+                color: white;
+                padding: 8px;
+                font-weight: bold;
+            }
+            QTabBar::tab {
+                background: #34495e;
+                color: white;
+                padding: 10px;
+                margin: 2px;
+                border-radius: 4px;
+            }
+            QTabBar::tab:selected {
+                background: #e74c3c;
+            }
+            QPushButton {
+                padding: 10px 20px;
+                background: qlineargradient(x1:0, y1:0, x2:1, y2:0,
+                    stop:0 #e74c3c, stop:1 #c0392b);
+                color: white;
+                border: none;
+                border-radius: 6px;
+                font-size: 14px;
+                font-weight: bold;
+            }
+        """)
+        
+        layout = QVBoxLayout()
+        self.tabs = QTabWidget()
+        self.models = {}
+        for board, (title, _, _) in pong_leaderboard.BOARDS.items():
+            # первые 100 строк читаются из индекса user_stats, без прохода по истории
+            rows = pong_leaderboard.top(board)
+            model = LeaderboardModel(rows, 'Результат', percent=board == 'win_ratio')
+            table = QTableView()
+            table.setModel(model)
+            table.verticalHeader().hide()
+            table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+            self.models[board] = model
+            self.tabs.addTab(table, title)
+        self.tabs.currentChanged.connect(self.update_rank)
+        layout.addWidget(self.tabs)
         
-        self.table.setRowCount(len(games))
+        self.rank_label = QLabel()
+        self.rank_label.setAlignment(Qt.AlignCenter)
+        layout.addWidget(self.rank_label)
+        self.update_rank()
         
-        for row, game in enumerate(games):
-            game_date, player1_score, player2_score, winner = game
-            self.table.setItem(row, 0, QTableWidgetItem(game_date))
-            self.table.setItem(row, 1, QTableWidgetItem(self.username))
-            self.table.setItem(row, 2, QTableWidgetItem('Компьютер'))
-            self.table.setItem(row, 3, QTableWidgetItem(f"{player1_score}:{player2_score}"))
-            self.table.setItem(row, 4, QTableWidgetItem(winner))
+        close_btn = QPushButton('Закрыть')
+        close_btn.clicked.connect(self.close)
+        layout.addWidget(close_btn)
+        self.setLayout(layout)
+    
+    def update_rank(self):
+        board = list(pong_leaderboard.BOARDS)[self.tabs.currentIndex()]
+        place = pong_leaderboard.rank(self.username, board)
+        if place is None:
+            self.rank_label.setText(f'{self.username}: нет в рейтинге')
+        else:
+            self.rank_label.setText(f'{self.username}: место {place}')
 
 def main():
     app = QApplication(sys.argv)
@@ -634,7 +1029,10 @@ def main():
     auth_window = AuthWindow()
     auth_window.show()
     
-    sys.exit(app.exec_())
+    code = app.exec_()
+    default_service().shutdown()
+    Database.close()
+    sys.exit(code)
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
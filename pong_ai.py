@@ -0,0 +1,89 @@
+import random
+from collections import deque
+
+
+# Уровни сложности: задержка реакции (тики), разброс прогноза (пиксели),
+# ракетка сдвигается не чаще раза в period тиков
+LEVELS = {
+    'easy': {'reaction': 18, 'error': 60, 'period': 3},
+    'normal': {'reaction': 10, 'error': 30, 'period': 2},
+    'hard': {'reaction': 4, 'error': 10, 'period': 1},
+}
+
+
+def predict_y(rules, x, y, dx, dy, plane_x):
+    """y мяча в момент пересечения вертикали plane_x с учетом отражений
+    от стен, или None, если мяч движется от нее. Время O(1): траектория
+    разворачивается в прямую, а положение сворачивается обратно по модулю
+    двойной высоты поля"""
+    if dx == 0:
+        return None
+    t = (plane_x - x) / dx
+    if t < 0:
+        return None
+    bottom = rules.height - rules.ball_size
+    period = 2 * bottom
+    y = (y + dy * t) % period
+    return period - y if y > bottom else y
+
+
+class CpuPlayer:
+    """Компьютерный соперник: ведет ракетку к прогнозируемой точке встречи.
+
+    Решение принимается по состоянию reaction тиков назад; на каждый подход
+    мяча прогноз смещается на случайную ошибку в пределах error пикселей.
+    """
+
+    def __init__(self, rules, player=2, reaction=10, error=30, period=2, seed=None):
+        self.rules = rules
+        self.player = player
+        self.error = error
+        self.period = period
+        self.rng = random.Random(seed)
+        size = rules.ball_size
+        if player == 1:
+            self.plane_x = rules.paddle_x + rules.paddle_width
+        else:
+            self.plane_x = rules.width - rules.paddle_x - rules.paddle_width - size
+        self.history = deque(maxlen=reaction + 1)
+        self.approaching = False
+        self.offset = 0.0
+        self.ticks = 0
+
+    @classmethod
+    def level(cls, rules, name, player=2, seed=None):
+        """Соперник с параметрами уровня сложности из LEVELS"""
+        return cls(rules, player, seed=seed, **LEVELS[name])
+
+    def reset(self):
+        self.history.clear()
+        self.approaching = False
+
+    def target(self):
+        """Целевое положение верха мяча по запомненному состоянию"""
+        rules = self.rules
+        x, y, dx, dy = self.history[0]
+        predicted = predict_y(rules, x, y, dx, dy, self.plane_x)
+        if predicted is None:
+            # мяч уходит - возвращаемся к центру
+            self.approaching = False
+            return (rules.height - rules.ball_size) / 2
+        if not self.approaching:
+            self.approaching = True
+            self.offset = self.rng.uniform(-self.error, self.error)
+        return predicted + self.offset
+
+    def decide(self, state):
+        """Ход ракетки на этот тик: -1 вверх, 1 вниз, 0 на месте"""
+        self.history.append((state.ball_x, state.ball_y, state.ball_dx, state.ball_dy))
+        self.ticks += 1
+        target = self.target()
+        if self.ticks % self.period:
+            return 0
+        rules = self.rules
+        paddle = state.paddle1_y if self.player == 1 else state.paddle2_y
+        diff = (target + rules.ball_size / 2) - (paddle + rules.paddle_height / 2)
+        # мертвая зона в полшага, чтобы ракетка не дрожала у цели
+        if abs(diff) <= rules.paddle_speed / 2:
+            return 0
+        return 1 if diff > 0 else -1
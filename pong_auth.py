@@ -0,0 +1,235 @@
+import hashlib
+import hmac
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from pong_db import Database
+
+
+# Стоимость scrypt по умолчанию; подбирается calibrate() под нужную задержку
+SCRYPT_N = 2 ** 14
+SCRYPT_R = 8
+SCRYPT_P = 1
+SALT_SIZE = 16
+
+# Кэш успешных входов
+CACHE_SIZE = 64
+CACHE_TTL = 300   # секунд
+
+
+class KdfParams:
+    """Параметры scrypt"""
+    __slots__ = ('n', 'r', 'p')
+
+    def __init__(self, n=SCRYPT_N, r=SCRYPT_R, p=SCRYPT_P):
+        self.n = n
+        self.r = r
+        self.p = p
+
+    def maxmem(self):
+        # scrypt требует 128 * r * n байт памяти; запас на служебные буферы
+        return 128 * self.r * self.n * 2 + 1024 * 1024
+
+
+def hash_password(password, params=None, salt=None):
+    """Хэш пароля в формате scrypt$n$r$p$соль$хэш"""
+    params = params or KdfParams()
+    salt = salt or os.urandom(SALT_SIZE)
+    digest = hashlib.scrypt(password.encode(), salt=salt, n=params.n, r=params.r,
+                            p=params.p, maxmem=params.maxmem())
+    return f"scrypt${params.n}${params.r}${params.p}${salt.hex()}${digest.hex()}"
+
+
+def legacy_hash(password):
+    """Старый формат: один несоленый sha256"""
+    return hashlib.sha256(password.encode()).hexdigest()
+
+
+def verify_password(password, stored, params=None):
+    """Проверка пароля. Возвращает (верен ли, нужно ли перехэшировать)"""
+    params = params or KdfParams()
+    if not stored.startswith('scrypt$'):
+        ok = hmac.compare_digest(legacy_hash(password), stored)
+        return ok, ok
+    _, n, r, p, salt, digest = stored.split('$')
+    stored_params = KdfParams(int(n), int(r), int(p))
+    candidate = hashlib.scrypt(password.encode(), salt=bytes.fromhex(salt),
+                               n=stored_params.n, r=stored_params.r, p=stored_params.p,
+                               maxmem=stored_params.maxmem())
+    ok = hmac.compare_digest(candidate.hex(), digest)
+    outdated = (stored_params.n, stored_params.r, stored_params.p) != (params.n, params.r, params.p)
+    return ok, ok and outdated
+
+
+def calibrate(target=0.1, r=SCRYPT_R, p=SCRYPT_P, max_n=2 ** 20):
+    """Наибольшее n (степень двойки), при котором хэш считается не дольше target секунд"""
+    n = 2 ** 10
+    best = n
+    while n <= max_n:
+        params = KdfParams(n, r, p)
+        start = time.perf_counter()
+        hash_password('calibration', params)
+        elapsed = time.perf_counter() - start
+        if elapsed > target:
+            break
+        best = n
+        n *= 2
+    return KdfParams(best, r, p)
+
+
+class CredentialCache:
+    """LRU-кэш успешно проверенных паролей с ограниченным временем жизни.
+
+    Пароли не хранятся: запоминается HMAC пары (логин, пароль) на случайном
+    ключе процесса, проверка по нему занимает микросекунды вместо scrypt
+    и запроса к базе.
+    """
+
+    def __init__(self, maxsize=CACHE_SIZE, ttl=CACHE_TTL, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self._key = os.urandom(32)
+        self._entries = OrderedDict()   # username -> (digest, срок действия)
+        self._generations = {}          # username -> число сбросов
+        self._lock = threading.Lock()
+
+    def _digest(self, username, password):
+        message = username.encode() + b'\0' + password.encode()
+        return hmac.new(self._key, message, hashlib.sha256).digest()
+
+    def check(self, username, password):
+        """True - пароль недавно проверялся и совпадает"""
+        digest = self._digest(username, password)
+        with self._lock:
+            entry = self._entries.get(username)
+            if entry is not None and entry[1] <= self.clock():
+                del self._entries[username]
+                entry = None
+            if entry is None or not hmac.compare_digest(entry[0], digest):
+                self.misses += 1
+                return False
+            self._entries.move_to_end(username)
+            self.hits += 1
+            return True
+
+    def generation(self, username):
+        """Метка, которую нужно передать в put(): запись, проверенная до
+        invalidate(), в кэш уже не попадет"""
+        with self._lock:
+            return self._generations.get(username, 0)
+
+    def put(self, username, password, generation=None):
+        """Запомнить успешный вход"""
+        digest = self._digest(username, password)
+        with self._lock:
+            if generation is not None and generation != self._generations.get(username, 0):
+                return
+            self._entries[username] = (digest, self.clock() + self.ttl)
+            self._entries.move_to_end(username)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, username):
+        """Сброс записи (смена пароля, удаление пользователя)"""
+        with self._lock:
+            self._entries.pop(username, None)
+            self._generations[username] = self._generations.get(username, 0) + 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'size': len(self._entries)}
+
+
+class HashingService:
+    """Хэширование и проверка паролей в пуле потоков, вне потока интерфейса.
+
+    Методы возвращают concurrent.futures.Future; hashlib.scrypt отпускает GIL,
+    поэтому расчет не блокирует поток GUI.
+    """
+
+    def __init__(self, params=None, workers=2, cache=None):
+        self.params = params or KdfParams()
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='password-hash')
+        self.cache = cache if cache is not None else CredentialCache()
+
+    def hash(self, password):
+        return self.pool.submit(hash_password, password, self.params)
+
+    def verify_login(self, username, password):
+        """Future с результатом входа; старые хэши sha256 обновляются на месте.
+        Попадание в кэш возвращает готовый Future без обращения к пулу"""
+        if self.cache.check(username, password):
+            future = Future()
+            future.set_result(True)
+            return future
+        return self.pool.submit(self._verify_login, username, password)
+
+    def register(self, username, password):
+        """Future с результатом создания пользователя"""
+        return self.pool.submit(self._register, username, password)
+
+    def create_users(self, accounts):
+        """Future с результатом Database.create_users для пар (логин, пароль).
+        Пароли хэшируются всеми потоками пула, вставка - одной транзакцией"""
+        accounts = list(accounts)
+        hashes = [self.hash(password) if password else None for _, password in accounts]
+        return self.pool.submit(self._create_users, accounts, hashes)
+
+    def change_password(self, username, password):
+        """Future с результатом смены пароля"""
+        self.cache.invalidate(username)
+        return self.pool.submit(self._change_password, username, password)
+
+    def delete_user(self, username):
+        """Удаление пользователя со сбросом кэша"""
+        self.cache.invalidate(username)
+        return Database.delete_user(username)
+
+    def shutdown(self):
+        self.pool.shutdown(wait=True)
+
+    def _verify_login(self, username, password):
+        generation = self.cache.generation(username)
+        stored = Database.get_password_hash(username)
+        if stored is None:
+            return False
+        ok, needs_rehash = verify_password(password, stored, self.params)
+        if needs_rehash:
+            Database.update_password_hash(username, stored, hash_password(password, self.params))
+        if ok:
+            self.cache.put(username, password, generation)
+        return ok
+
+    def _change_password(self, username, password):
+        changed = Database.set_password_hash(username, hash_password(password, self.params))
+        # проверки, начатые до записи нового хэша, не должны попасть в кэш
+        self.cache.invalidate(username)
+        return changed
+
+    def _register(self, username, password):
+        return Database.create_user(username, hash_password(password, self.params))
+
+    def _create_users(self, accounts, hashes):
+        rows = [(username, future.result() if future else None)
+                for (username, _), future in zip(accounts, hashes)]
+        return Database.create_users(rows)
+
+
+_service = None
+
+
+def default_service():
+    """Общий сервис хэширования приложения"""
+    global _service
+    if _service is None:
+        _service = HashingService()
+    return _service
@@ -0,0 +1,229 @@
+import numpy as np
+
+import pong_engine
+
+
+class BatchSimulator:
+    """N матчей в массивах NumPy (structure-of-arrays), шаг - один векторный вызов"""
+
+    def __init__(self, n, rules=pong_engine.SPEEDUP_RULES, seed=None):
+        self.n = n
+        self.rules = rules
+        self.rng = np.random.default_rng(seed)
+
+        self.ball_x = np.full(n, rules.width // 2, dtype=np.float64)
+        self.ball_y = np.full(n, rules.height // 2, dtype=np.float64)
+        self.ball_dx = np.full(n, rules.ball_speed, dtype=np.float64)
+        self.ball_dy = np.full(n, rules.ball_speed, dtype=np.float64)
+        self.paddle1_y = np.full(n, (rules.height - rules.paddle_height) // 2, dtype=np.float64)
+        self.paddle2_y = self.paddle1_y.copy()
+        self.score1 = np.zeros(n, dtype=np.int64)
+        self.score2 = np.zeros(n, dtype=np.int64)
+        self.ticks = 0
+
+        # Рабочие буферы, чтобы не выделять память на каждом тике
+        self._hit = np.empty(n, dtype=bool)
+        self._tmp = np.empty(n, dtype=bool)
+        self._scored = np.zeros(n, dtype=np.int8)
+
+    def _move_paddles(self, paddle, moves):
+        rules = self.rules
+        paddle += moves * rules.paddle_speed
+        np.clip(paddle, 0, rules.height - rules.paddle_height, out=paddle)
+
+    def _paddle_hits(self, x_lo, x_hi, paddle, touch):
+        """Маска матчей, где мяч касается ракетки"""
+        hit, tmp = self._hit, self._tmp
+        ph = self.rules.paddle_height
+        if x_lo is None:
+            np.less_equal(self.ball_x, x_hi, out=hit)
+        elif x_hi is None:
+            np.greater_equal(self.ball_x, x_lo, out=hit)
+        else:
+            np.greater_equal(self.ball_x, x_lo, out=hit)
+            hit &= np.less_equal(self.ball_x, x_hi, out=tmp)
+        hit &= np.greater_equal(self.ball_y + touch, paddle, out=tmp)
+        hit &= np.less_equal(self.ball_y, paddle + ph, out=tmp)
+        return hit
+
+    def step(self, moves1=None, moves2=None):
+        """Один тик во всех матчах. Возвращает массив забивших (0, 1 или 2)"""
+        rules = self.rules
+        if moves1 is not None:
+            self._move_paddles(self.paddle1_y, moves1)
+        if moves2 is not None:
+            self._move_paddles(self.paddle2_y, moves2)
+        self.ticks += 1
+
+        x = self.ball_x
+        if rules.continuous:
+            self._sweep()
+        else:
+            self._step_discrete()
+
+        scored = self._scored
+        scored.fill(0)
+        goal2 = x < 0
+        goal1 = x > rules.width
+        scored[goal1] = 1
+        scored[goal2] = 2
+        self.score1 += goal1
+        self.score2 += goal2
+        goals = goal1 | goal2
+        if goals.any():
+            self.reset_balls(goals)
+        return scored
+
+    def _step_discrete(self):
+        """Шаг с проверкой перекрытия после перемещения (как pong_engine)"""
+        rules = self.rules
+        x, y, dx, dy = self.ball_x, self.ball_y, self.ball_dx, self.ball_dy
+        size = rules.ball_size
+        left = rules.paddle_x + rules.paddle_width
+        right = rules.width - rules.paddle_x - rules.paddle_width - size
+
+        x += dx
+        y += dy
+
+        wall = (y <= 0) | (y >= rules.height - size)
+        np.negative(dy, out=dy, where=wall)
+
+        if rules.variant == pong_engine.CLASSIC:
+            hit = self._paddle_hits(None, left, self.paddle1_y, size)
+            np.abs(dx, out=dx, where=hit)
+            count = int(np.count_nonzero(hit))
+            if count:
+                dy[hit] += self.rng.uniform(-1, 1, count)
+
+            hit = self._paddle_hits(right, None, self.paddle2_y, size)
+            np.abs(dx, out=dx, where=hit)
+            np.negative(dx, out=dx, where=hit)
+            count = int(np.count_nonzero(hit))
+            if count:
+                dy[hit] += self.rng.uniform(-1, 1, count)
+        else:
+            hit = self._paddle_hits(rules.paddle_x, left, self.paddle1_y, 0)
+            np.abs(dx, out=dx, where=hit)
+            dy += hit * np.where(dy > 0, 1.0, -1.0)
+
+            hit = self._paddle_hits(right, rules.width - rules.paddle_x, self.paddle2_y, 0)
+            np.abs(dx, out=dx, where=hit)
+            np.negative(dx, out=dx, where=hit)
+            dy += hit * np.where(dy > 0, 1.0, -1.0)
+
+    def _spin(self, dy, hit):
+        """Изменение вертикальной скорости в матчах с ударом о ракетку"""
+        if self.rules.variant == pong_engine.CLASSIC:
+            dy[hit] += self.rng.uniform(-1, 1, int(np.count_nonzero(hit)))
+        else:
+            dy[hit] += np.where(dy[hit] > 0, 1.0, -1.0)
+
+    def _sweep(self):
+        """Непрерывный расчет столкновений (как pong_engine._step_swept)"""
+        rules = self.rules
+        x, y, dx, dy = self.ball_x, self.ball_y, self.ball_dx, self.ball_dy
+        size = rules.ball_size
+        bottom = rules.height - size
+        face1 = rules.paddle_x + rules.paddle_width
+        face2 = rules.width - rules.paddle_x - rules.paddle_width - size
+        ph = rules.paddle_height
+        p1, p2 = self.paddle1_y, self.paddle2_y
+        touch = size if rules.variant == pong_engine.CLASSIC else 0
+
+        remaining = np.ones(self.n)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            for _ in range(pong_engine.MAX_BOUNCES):
+                t = remaining.copy()
+                event = np.zeros(self.n, dtype=np.int8)
+                end_x = x + dx * remaining
+                end_y = y + dy * remaining
+
+                up = (dy < 0) & (end_y < 0)
+                down = (dy > 0) & (end_y > bottom)
+                wall = up | down
+                t_wall = np.maximum(np.where(up, -y, bottom - y) / dy, 0.0)
+                t[wall] = t_wall[wall]
+                event[wall] = 1
+
+                hit = (dx < 0) & (x >= face1) & (end_x < face1)
+                t_hit = (face1 - x) / dx
+                hit_y = y + dy * t_hit
+                hit &= (t_hit < t) & (hit_y + touch >= p1) & (hit_y <= p1 + ph)
+                t[hit] = t_hit[hit]
+                event[hit] = 2
+
+                hit = (dx > 0) & (x <= face2) & (end_x > face2)
+                t_hit = (face2 - x) / dx
+                hit_y = y + dy * t_hit
+                hit &= (t_hit < t) & (hit_y + touch >= p2) & (hit_y <= p2 + ph)
+                t[hit] = t_hit[hit]
+                event[hit] = 3
+
+                x += dx * t
+                y += dy * t
+                remaining -= t
+
+                if not event.any():
+                    break
+                wall = event == 1
+                np.negative(dy, out=dy, where=wall)
+                hit = event == 2
+                np.abs(dx, out=dx, where=hit)
+                self._spin(dy, hit)
+                hit = event == 3
+                np.abs(dx, out=dx, where=hit)
+                np.negative(dx, out=dx, where=hit)
+                self._spin(dy, hit)
+
+            # остаток тика после MAX_BOUNCES отражений
+            left = remaining > 0
+            if left.any():
+                x[left] += dx[left] * remaining[left]
+                y[left] = np.clip(y[left] + dy[left] * remaining[left], 0, bottom)
+
+    def reset_balls(self, mask):
+        """Возврат мяча в центр в отмеченных матчах"""
+        rules = self.rules
+        count = int(np.count_nonzero(mask))
+        self.ball_x[mask] = rules.width // 2
+        self.ball_y[mask] = rules.height // 2
+        if rules.variant == pong_engine.CLASSIC:
+            speed = rules.ball_speed
+            self.ball_dx[mask] = np.where(self.rng.random(count) < 0.5, -speed, speed)
+            self.ball_dy[mask] = self.rng.uniform(-3, 3, count)
+        else:
+            self.ball_dx[mask] *= -1
+            self.ball_dy[mask] = np.where(self.ball_dy[mask] > 0, 10, -10)
+
+    def finished(self):
+        """Маска завершенных матчей (счет достиг win_score)"""
+        win_score = self.rules.win_score
+        if not win_score:
+            return np.zeros(self.n, dtype=bool)
+        return (self.score1 >= win_score) | (self.score2 >= win_score)
+
+    def reset_matches(self, mask):
+        """Новая партия в отмеченных матчах"""
+        self.score1[mask] = 0
+        self.score2[mask] = 0
+        self.reset_balls(mask)
+
+    def run(self, ticks):
+        """Прогон заданного числа тиков без входов"""
+        for _ in range(ticks):
+            self.step()
+
+    def game(self, i):
+        """Снимок i-го матча в виде pong_engine.GameState"""
+        state = pong_engine.new_state(self.rules)
+        state.ball_x = float(self.ball_x[i])
+        state.ball_y = float(self.ball_y[i])
+        state.ball_dx = float(self.ball_dx[i])
+        state.ball_dy = float(self.ball_dy[i])
+        state.paddle1_y = float(self.paddle1_y[i])
+        state.paddle2_y = float(self.paddle2_y[i])
+        state.score1 = int(self.score1[i])
+        state.score2 = int(self.score2[i])
+        state.tick = self.ticks
+        return state
+
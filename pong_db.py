@@ -0,0 +1,536 @@
+import queue
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+
+DB_FILE = "ping_pong.db"
+
+# Настройки соединения: WAL позволяет читать во время записи из другого потока,
+# synchronous=NORMAL в режиме WAL не теряет целостность при сбое приложения
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA cache_size=-8000",
+    "PRAGMA temp_store=MEMORY",
+)
+STATEMENT_CACHE = 128
+
+# Миграции схемы: i-й элемент переводит базу с версии i на версию i + 1;
+# шаг - строка SQL или функция от соединения (для заполнения данных)
+MIGRATIONS = (
+    # 1: исходные таблицы
+    ('''
+        CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT UNIQUE NOT NULL,
+            password_hash TEXT NOT NULL,
+            registration_date TEXT NOT NULL
+        )
+    ''', '''
+        CREATE TABLE IF NOT EXISTS game_history (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT NOT NULL,
+            game_date TEXT NOT NULL,
+            player1_score INTEGER NOT NULL,
+            player2_score INTEGER NOT NULL,
+            winner TEXT NOT NULL,
+            FOREIGN KEY (username) REFERENCES users (username)
+        )
+    '''),
+    # 2: история пользователя читается диапазоном индекса без сортировки
+    ('''
+        CREATE INDEX IF NOT EXISTS idx_game_history_user_date
+        ON game_history (username, game_date DESC)
+    ''',),
+    # 3: id в индексе - постраничное чтение по ключу (game_date, id) без сортировки
+    ('''
+        CREATE INDEX IF NOT EXISTS idx_game_history_user_date_id
+        ON game_history (username, game_date DESC, id DESC)
+    ''', '''
+        DROP INDEX IF EXISTS idx_game_history_user_date
+    '''),
+    # 4: агрегаты по игрокам, обновляются при каждой записи результата
+    ('''
+        CREATE TABLE IF NOT EXISTS user_stats (
+            username TEXT PRIMARY KEY,
+            games INTEGER NOT NULL,
+            wins INTEGER NOT NULL,
+            losses INTEGER NOT NULL,
+            points_for INTEGER NOT NULL,
+            points_against INTEGER NOT NULL,
+            current_streak INTEGER NOT NULL,
+            best_streak INTEGER NOT NULL,
+            last_played TEXT NOT NULL
+        ) WITHOUT ROWID
+    ''', lambda conn: Database.rebuild_user_stats(conn)),
+    # 5: таблицы лидеров - первые K строк читаются из индекса без сортировки
+    ('''
+        CREATE INDEX IF NOT EXISTS idx_user_stats_wins
+        ON user_stats (wins DESC, username)
+    ''', '''
+        CREATE INDEX IF NOT EXISTS idx_user_stats_win_ratio
+        ON user_stats (CAST(wins AS REAL) / games DESC, games DESC, username)
+    ''', '''
+        CREATE INDEX IF NOT EXISTS idx_user_stats_best_streak
+        ON user_stats (best_streak DESC, username)
+    '''),
+    # 6: записи матчей (pong_replay) отдельно от истории, чтобы не раздувать ее строки
+    ('''
+        CREATE TABLE IF NOT EXISTS replays (
+            game_id INTEGER PRIMARY KEY REFERENCES game_history (id),
+            data BLOB NOT NULL
+        )
+    ''',),
+)
+
+INSERT_GAME_SQL = '''
+    INSERT INTO game_history (username, game_date, player1_score, player2_score, winner)
+    VALUES (?, ?, ?, ?, ?)
+'''
+
+# Победа пользователя: он всегда играет за первого игрока
+WIN = 'Игрок 1'
+
+# Учет одной игры в user_stats. current_streak > 0 - серия побед,
+# < 0 - серия поражений; в SET столбцы еще имеют старые значения.
+# Параметры: username, победа (0/1), player1_score, player2_score, game_date
+USER_STATS_SQL = '''
+    INSERT INTO user_stats (username, games, wins, losses, points_for, points_against,
+                            current_streak, best_streak, last_played)
+    VALUES (?1, 1, ?2, 1 - ?2, ?3, ?4, CASE WHEN ?2 THEN 1 ELSE -1 END, ?2, ?5)
+    ON CONFLICT (username) DO UPDATE SET
+        games = games + 1,
+        wins = wins + ?2,
+        losses = losses + 1 - ?2,
+        points_for = points_for + ?3,
+        points_against = points_against + ?4,
+        current_streak = CASE
+            WHEN ?2 THEN MAX(current_streak, 0) + 1
+            ELSE MIN(current_streak, 0) - 1 END,
+        best_streak = CASE
+            WHEN ?2 THEN MAX(best_streak, MAX(current_streak, 0) + 1)
+            ELSE best_streak END,
+        last_played = MAX(last_played, ?5)
+'''
+
+# Вставка, не затирающая существующего пользователя: занятость логина
+# проверяется самой вставкой по UNIQUE (username), без отдельного SELECT
+CREATE_USER_SQL = '''
+    INSERT INTO users (username, password_hash, registration_date)
+    VALUES (?, ?, ?)
+    ON CONFLICT (username) DO NOTHING
+'''
+
+HISTORY_PAGE_SIZE = 100
+
+USER_GAMES_SQL = '''
+    SELECT game_date, player1_score, player2_score, winner
+    FROM game_history
+    WHERE username = ?
+    ORDER BY game_date DESC
+'''
+
+USER_GAMES_PAGE_SQL = '''
+    SELECT id, game_date, player1_score, player2_score, winner
+    FROM game_history
+    WHERE username = ? AND (game_date, id) < (?, ?)
+    ORDER BY game_date DESC, id DESC
+    LIMIT ?
+'''
+
+
+class ConnectionManager:
+    """Постоянные соединения с базой: одно на поток, открывается один раз"""
+
+    def __init__(self, path=DB_FILE):
+        self.path = path
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections = []
+
+    def get(self):
+        """Соединение текущего потока"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10,
+                                   cached_statements=STATEMENT_CACHE)
+            for pragma in PRAGMAS:
+                conn.execute(pragma)
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def release(self):
+        """Закрытие соединения текущего потока (при завершении потока)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            self._local.conn = None
+            with self._lock:
+                self._connections.remove(conn)
+            conn.close()
+
+    def close_all(self):
+        """Закрытие всех соединений (при выходе из приложения)"""
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.ProgrammingError:
+                # соединение чужого потока - закроется вместе с потоком
+                pass
+        self._local = threading.local()
+
+
+class Database:
+    manager = ConnectionManager(DB_FILE)
+
+    @staticmethod
+    def configure(path):
+        """Переключение на другой файл базы данных"""
+        Database.manager.close_all()
+        Database.manager = ConnectionManager(path)
+
+    @staticmethod
+    def init_db():
+        """Инициализация базы данных и применение миграций"""
+        Database.migrate(Database.get_connection())
+
+    @staticmethod
+    def migrate(conn, migrations=MIGRATIONS):
+        """Применение недостающих миграций; версия схемы хранится в user_version"""
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        for number, statements in enumerate(migrations[version:], version + 1):
+            conn.execute("BEGIN")
+            try:
+                for statement in statements:
+                    if callable(statement):
+                        statement(conn)
+                    else:
+                        conn.execute(statement)
+                conn.execute(f"PRAGMA user_version = {number}")
+            except sqlite3.Error:
+                conn.rollback()
+                raise
+            conn.commit()
+
+    @staticmethod
+    def get_connection():
+        """Получение соединения с базой данных"""
+        return Database.manager.get()
+
+    @staticmethod
+    def close():
+        """Закрытие соединений"""
+        Database.manager.close_all()
+
+    @staticmethod
+    def user_exists(username):
+        """Проверка существования пользователя"""
+        conn = Database.get_connection()
+        result = conn.execute('SELECT id FROM users WHERE username = ?', (username,)).fetchone()
+        return result is not None
+
+    @staticmethod
+    def create_user(username, password_hash):
+        """Создание нового пользователя одним запросом.
+        False - логин уже занят (проверка и вставка атомарны)"""
+        conn = Database.get_connection()
+        try:
+            with conn:
+                cursor = conn.execute(CREATE_USER_SQL, (
+                    username, password_hash, datetime.now().strftime('%Y-%m-%d %H:%M:%S')))
+        except sqlite3.IntegrityError:
+            return False
+        return cursor.rowcount == 1
+
+    @staticmethod
+    def create_users(accounts):
+        """Создание пачки пользователей одной транзакцией.
+        accounts: (username, password_hash). Возвращает (число созданных, ошибки),
+        ошибки - список (номер строки, username, причина)"""
+        conn = Database.get_connection()
+        date = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        created = 0
+        errors = []
+        with conn:
+            for index, (username, password_hash) in enumerate(accounts):
+                if not username or not password_hash:
+                    errors.append((index, username, 'пустой логин или пароль'))
+                    continue
+                try:
+                    cursor = conn.execute(CREATE_USER_SQL, (username, password_hash, date))
+                except sqlite3.IntegrityError as error:
+                    errors.append((index, username, str(error)))
+                    continue
+                if cursor.rowcount == 1:
+                    created += 1
+                else:
+                    errors.append((index, username, 'логин уже занят'))
+        return created, errors
+
+    @staticmethod
+    def get_password_hash(username):
+        """Сохраненный хэш пароля или None, если пользователя нет"""
+        conn = Database.get_connection()
+        result = conn.execute('SELECT password_hash FROM users WHERE username = ?',
+                              (username,)).fetchone()
+        return result[0] if result else None
+
+    @staticmethod
+    def update_password_hash(username, old_hash, new_hash):
+        """Замена хэша, только если он не изменился с момента чтения"""
+        conn = Database.get_connection()
+        with conn:
+            cursor = conn.execute('''
+                UPDATE users SET password_hash = ?
+                WHERE username = ? AND password_hash = ?
+            ''', (new_hash, username, old_hash))
+        return cursor.rowcount == 1
+
+    @staticmethod
+    def set_password_hash(username, password_hash):
+        """Смена пароля. False - пользователя нет"""
+        conn = Database.get_connection()
+        with conn:
+            cursor = conn.execute('UPDATE users SET password_hash = ? WHERE username = ?',
+                                  (password_hash, username))
+        return cursor.rowcount == 1
+
+    @staticmethod
+    def delete_user(username):
+        """Удаление пользователя. False - пользователя нет"""
+        conn = Database.get_connection()
+        with conn:
+            cursor = conn.execute('DELETE FROM users WHERE username = ?', (username,))
+        return cursor.rowcount == 1
+
+    @staticmethod
+    def save_game_result(username, player1_score, player2_score, winner, replay=None):
+        """Сохранение результата игры (и записи матча, если она есть)"""
+        Database.save_game_results([(username, datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                                     player1_score, player2_score, winner, replay)])
+
+    @staticmethod
+    def save_game_results(rows):
+        """Сохранение пачки результатов одной транзакцией вместе с user_stats.
+        rows: (username, game_date, player1_score, player2_score, winner[, replay])"""
+        rows = list(rows)
+        conn = Database.get_connection()
+        with conn:
+            if any(len(row) > 5 and row[5] is not None for row in rows):
+                # записи матчей ссылаются на id строки истории - вставка по одной
+                for row in rows:
+                    cursor = conn.execute(INSERT_GAME_SQL, row[:5])
+                    if len(row) > 5 and row[5] is not None:
+                        conn.execute('INSERT INTO replays (game_id, data) VALUES (?, ?)',
+                                     (cursor.lastrowid, row[5]))
+            else:
+                conn.executemany(INSERT_GAME_SQL, (row[:5] for row in rows))
+            conn.executemany(USER_STATS_SQL, Database._stats_params(rows))
+
+    @staticmethod
+    def _stats_params(rows):
+        for username, game_date, player1_score, player2_score, winner, *_ in rows:
+            yield username, int(winner == WIN), player1_score, player2_score, game_date
+
+    @staticmethod
+    def rebuild_user_stats(conn=None):
+        """Пересчет user_stats по всей game_history (заполнение, проверка).
+        Без conn выполняется в своей транзакции. Возвращает число игроков"""
+        if conn is None:
+            conn = Database.get_connection()
+            with conn:
+                return Database.rebuild_user_stats(conn)
+        conn.execute('DELETE FROM user_stats')
+        rows = conn.execute('''
+            SELECT username, game_date, player1_score, player2_score, winner
+            FROM game_history
+            ORDER BY username, game_date, id
+        ''').fetchall()
+        conn.executemany(USER_STATS_SQL, Database._stats_params(rows))
+        return conn.execute('SELECT COUNT(*) FROM user_stats').fetchone()[0]
+
+    @staticmethod
+    def get_user_stats(username):
+        """Статистика игрока (словарь по столбцам user_stats) или None"""
+        conn = Database.get_connection()
+        cursor = conn.execute('SELECT * FROM user_stats WHERE username = ?', (username,))
+        row = cursor.fetchone()
+        if row is None:
+            return None
+        return dict(zip((column[0] for column in cursor.description), row))
+
+    @staticmethod
+    def get_replay(game_id):
+        """Запись матча (bytes) или None"""
+        conn = Database.get_connection()
+        result = conn.execute('SELECT data FROM replays WHERE game_id = ?', (game_id,)).fetchone()
+        return result[0] if result else None
+
+    @staticmethod
+    def get_user_games(username):
+        """Получение истории игр пользователя"""
+        conn = Database.get_connection()
+        return conn.execute(USER_GAMES_SQL, (username,)).fetchall()
+
+    @staticmethod
+    def get_user_games_page(username, after=None, limit=HISTORY_PAGE_SIZE):
+        """Страница истории, начиная после ключа after = (game_date, id).
+        Строки: (id, game_date, player1_score, player2_score, winner)"""
+        if after is None:
+            # больше любой даты в формате 'YYYY-MM-DD HH:MM:SS'
+            after = ('\uffff', 0)
+        conn = Database.get_connection()
+        return conn.execute(USER_GAMES_PAGE_SQL, (username, after[0], after[1], limit)).fetchall()
+
+
+_STOP = object()
+
+
+# ошибки из-за содержимого строки: повтор их не исправит
+_ROW_ERRORS = (sqlite3.IntegrityError, sqlite3.InterfaceError, sqlite3.DataError)
+
+
+class ResultWriter:
+    """Фоновая запись результатов игр пачками.
+
+    submit() только кладет строку в очередь и никогда не ждет диска;
+    поток-писатель сбрасывает пачку, когда набралось batch_size строк,
+    прошло flush_interval секунд с первой строки пачки, или при закрытии.
+    Строки, которые база отвергла, собираются в failed; close() их возвращает.
+    """
+
+    def __init__(self, batch_size=100, flush_interval=0.5, max_pending=10000):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue = queue.Queue(max_pending)
+        self.written = 0
+        self.batches = 0
+        self.rejected = 0       # отказы из-за переполненной очереди
+        self.errors = 0
+        self.last_error = None
+        self.failed = []        # незаписанные строки (username, game_date, ...)
+        self._thread = threading.Thread(target=self._run, name='result-writer', daemon=True)
+        self._thread.start()
+
+    def submit(self, username, player1_score, player2_score, winner, game_date=None,
+               replay=None):
+        """Поставить результат в очередь. False - очередь переполнена"""
+        if game_date is None:
+            game_date = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        try:
+            self.queue.put_nowait((username, game_date, player1_score, player2_score, winner,
+                                   replay))
+        except queue.Full:
+            self.rejected += 1
+            return False
+        return True
+
+    def pending(self):
+        """Сколько результатов ждут записи (для контроля обратного давления)"""
+        return self.queue.qsize()
+
+    def flush(self, timeout=None):
+        """Дождаться записи всего, что уже поставлено в очередь"""
+        done = threading.Event()
+        self.queue.put(done)
+        return done.wait(timeout)
+
+    def close(self):
+        """Записать остаток и остановить поток. Возвращает строки, которые
+        записать не удалось: отвергнутые базой и оставшиеся после ошибки"""
+        if self._thread.is_alive():
+            self.queue.put(_STOP)
+            self._thread.join()
+        return self.failed
+
+    def stats(self):
+        return {'written': self.written, 'batches': self.batches,
+                'pending': self.pending(), 'rejected': self.rejected,
+                'errors': self.errors, 'failed': len(self.failed)}
+
+    def _run(self):
+        batch = []
+        deadline = None
+        while True:
+            timeout = None if not batch else max(deadline - time.monotonic(), 0)
+            try:
+                item = self.queue.get(timeout=timeout)
+            except queue.Empty:
+                batch = self._write(batch)
+                if batch:
+                    deadline = time.monotonic() + self.flush_interval
+                continue
+            if item is _STOP:
+                self.failed.extend(self._write(batch))
+                break
+            if isinstance(item, threading.Event):
+                batch = self._write(batch)
+                item.set()
+                continue
+            batch.append(item)
+            if len(batch) == 1:
+                deadline = time.monotonic() + self.flush_interval
+            if len(batch) >= self.batch_size:
+                batch = self._write(batch)
+        Database.manager.release()
+
+    def _write(self, batch):
+        """Запись пачки. Если база отвергла данные, пачка пишется по строке
+        и плохие строки уходят в failed; при прочих ошибках (база занята)
+        пачка остается для следующей попытки"""
+        if not batch:
+            return batch
+        try:
+            Database.save_game_results(batch)
+        except _ROW_ERRORS as error:
+            self._error(error)
+            return self._write_rows(batch)
+        except sqlite3.Error as error:
+            self._error(error)
+            return batch
+        self.written += len(batch)
+        self.batches += 1
+        return []
+
+    def _write_rows(self, batch):
+        for index, row in enumerate(batch):
+            try:
+                Database.save_game_results([row])
+            except _ROW_ERRORS as error:
+                self._error(error)
+                self.failed.append(row)
+                continue
+            except sqlite3.Error as error:
+                self._error(error)
+                return batch[index:]
+            self.written += 1
+            self.batches += 1
+        return []
+
+    def _error(self, error):
+        self.errors += 1
+        self.last_error = error
+
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description='Обслуживание базы ping-pong')
+    parser.add_argument('command', choices=['migrate', 'rebuild-stats'])
+    parser.add_argument('--db', default=DB_FILE, help='файл базы данных')
+    args = parser.parse_args(argv)
+    Database.configure(args.db)
+    Database.init_db()
+    if args.command == 'rebuild-stats':
+        start = time.perf_counter()
+        users = Database.rebuild_user_stats()
+        print(f"user_stats: {users} игроков за {time.perf_counter() - start:.2f} с")
+    Database.close()
+
+
+if __name__ == '__main__':
+    main()
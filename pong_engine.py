@@ -0,0 +1,320 @@
+import random
+
+
+CLASSIC = "classic"   # правила ping-pong.py: случайное отклонение от ракетки
+SPEEDUP = "speedup"   # правила ping-pong2.py: ускорение на 1 при каждом отбитии
+
+NO_INPUT = (0, 0)
+
+# Максимум отражений за один тик при непрерывном расчете столкновений
+MAX_BOUNCES = 16
+
+
+class Rules:
+    """Параметры поля и вариант правил"""
+    __slots__ = ('variant', 'width', 'height', 'paddle_x', 'paddle_width',
+                 'paddle_height', 'ball_size', 'ball_speed', 'paddle_speed',
+                 'win_score', 'continuous', 'tick')
+
+    def __init__(self, variant=SPEEDUP, width=800, height=500, paddle_x=20,
+                 paddle_width=10, paddle_height=80, ball_size=15, ball_speed=5,
+                 paddle_speed=10, win_score=10, continuous=True):
+        if variant not in (CLASSIC, SPEEDUP):
+            raise ValueError(f"Неизвестный вариант правил: {variant}")
+        self.variant = variant
+        self.width = width
+        self.height = height
+        self.paddle_x = paddle_x
+        self.paddle_width = paddle_width
+        self.paddle_height = paddle_height
+        self.ball_size = ball_size
+        self.ball_speed = ball_speed
+        # скорость ракетки при удержании клавиши, пикселей за тик
+        self.paddle_speed = paddle_speed
+        # 0 - игра без ограничения по очкам
+        self.win_score = win_score
+        # True - точное время удара внутри тика (мяч не проскакивает ракетку),
+        # False - проверка перекрытия после шага, как в исходных окнах
+        self.continuous = continuous
+        # функция тика выбирается один раз, а не на каждом шаге
+        self.tick = _tick_function(variant, continuous)
+
+
+def _tick_function(variant, continuous):
+    if continuous:
+        return _step_swept
+    if variant == CLASSIC:
+        return _step_classic
+    return _step_speedup
+
+
+def _step_speedup(state):
+    rules = state.rules
+    width = rules.width
+    size = rules.ball_size
+    left = rules.paddle_x + rules.paddle_width
+    right = width - rules.paddle_x - rules.paddle_width - size
+    ph = rules.paddle_height
+
+    x = state.ball_x + state.ball_dx
+    y = state.ball_y + state.ball_dy
+    dy = state.ball_dy
+
+    if y <= 0 or y >= rules.height - size:
+        dy = -dy
+
+    if rules.paddle_x <= x <= left:
+        p = state.paddle1_y
+        if p <= y <= p + ph:
+            state.ball_dx = abs(state.ball_dx)
+            dy += 1 if dy > 0 else -1
+
+    if right <= x <= width - rules.paddle_x:
+        p = state.paddle2_y
+        if p <= y <= p + ph:
+            state.ball_dx = -abs(state.ball_dx)
+            dy += 1 if dy > 0 else -1
+
+    state.ball_x = x
+    state.ball_y = y
+    state.ball_dy = dy
+
+    if x < 0:
+        state.score2 += 1
+        reset_ball(state)
+        return 2
+    if x > width:
+        state.score1 += 1
+        reset_ball(state)
+        return 1
+    return 0
+
+
+def _paddle_spin(state, dy):
+    """Изменение вертикальной скорости при ударе о ракетку"""
+    if state.rules.variant == CLASSIC:
+        return dy + state.rng.uniform(-1, 1)
+    return dy + (1 if dy > 0 else -1)
+
+
+def _step_swept(state):
+    rules = state.rules
+    width = rules.width
+    size = rules.ball_size
+    bottom = rules.height - size
+    face1 = rules.paddle_x + rules.paddle_width
+    face2 = width - rules.paddle_x - rules.paddle_width - size
+    ph = rules.paddle_height
+    p1 = state.paddle1_y
+    p2 = state.paddle2_y
+    # вертикальное условие удара как в исходных правилах: в CLASSIC
+    # достаточно перекрытия мяча и ракетки, в SPEEDUP верх мяча должен
+    # оказаться в пределах ракетки
+    touch = size if rules.variant == CLASSIC else 0
+
+    x, y = state.ball_x, state.ball_y
+    dx, dy = state.ball_dx, state.ball_dy
+
+    # быстрый путь: за тик мяч не пересекает ни стен, ни плоскостей ракеток
+    nx = x + dx
+    ny = y + dy
+    if 0 <= ny <= bottom and face1 <= nx <= face2:
+        state.ball_x = nx
+        state.ball_y = ny
+        return 0
+
+    remaining = 1.0
+    for _ in range(MAX_BOUNCES):
+        # ищем самое раннее событие на оставшемся отрезке тика
+        t = remaining
+        event = 0
+        if dy < 0 and y + dy * remaining < 0:
+            t = max(-y / dy, 0.0)
+            event = 1
+        elif dy > 0 and y + dy * remaining > bottom:
+            t = max((bottom - y) / dy, 0.0)
+            event = 1
+
+        if dx < 0 and x >= face1 and x + dx * remaining < face1:
+            hit = (face1 - x) / dx
+            hit_y = y + dy * hit
+            if hit < t and hit_y + touch >= p1 and hit_y <= p1 + ph:
+                t = hit
+                event = 2
+        elif dx > 0 and x <= face2 and x + dx * remaining > face2:
+            hit = (face2 - x) / dx
+            hit_y = y + dy * hit
+            if hit < t and hit_y + touch >= p2 and hit_y <= p2 + ph:
+                t = hit
+                event = 3
+
+        x += dx * t
+        y += dy * t
+        remaining -= t
+
+        if event == 0:
+            break
+        if event == 1:
+            dy = -dy
+        elif event == 2:
+            dx = abs(dx)
+            dy = _paddle_spin(state, dy)
+        else:
+            dx = -abs(dx)
+            dy = _paddle_spin(state, dy)
+
+    if remaining > 0:
+        # отражения исчерпаны - дожимаем остаток тика, не выпуская мяч за стены
+        x += dx * remaining
+        y = min(max(y + dy * remaining, 0), bottom)
+
+    state.ball_x = x
+    state.ball_y = y
+    state.ball_dx = dx
+    state.ball_dy = dy
+
+    if x < 0:
+        state.score2 += 1
+        reset_ball(state)
+        return 2
+    if x > width:
+        state.score1 += 1
+        reset_ball(state)
+        return 1
+    return 0
+
+
+def _step_classic(state):
+    rules = state.rules
+    width = rules.width
+    size = rules.ball_size
+    ph = rules.paddle_height
+
+    x = state.ball_x + state.ball_dx
+    y = state.ball_y + state.ball_dy
+    dy = state.ball_dy
+
+    if y <= 0 or y >= rules.height - size:
+        dy = -dy
+
+    if x <= rules.paddle_x + rules.paddle_width:
+        p = state.paddle1_y
+        if y + size >= p and y <= p + ph:
+            state.ball_dx = abs(state.ball_dx)
+            dy += state.rng.uniform(-1, 1)
+
+    if x >= width - rules.paddle_x - rules.paddle_width - size:
+        p = state.paddle2_y
+        if y + size >= p and y <= p + ph:
+            state.ball_dx = -abs(state.ball_dx)
+            dy += state.rng.uniform(-1, 1)
+
+    state.ball_x = x
+    state.ball_y = y
+    state.ball_dy = dy
+
+    if x < 0:
+        state.score2 += 1
+        reset_ball(state)
+        return 2
+    if x > width:
+        state.score1 += 1
+        reset_ball(state)
+        return 1
+    return 0
+
+
+CLASSIC_RULES = Rules(CLASSIC, height=600, paddle_width=15, paddle_height=100,
+                      win_score=0)
+SPEEDUP_RULES = Rules(SPEEDUP)
+
+
+class GameState:
+    """Состояние одного матча: мяч, ракетки, счет"""
+    __slots__ = ('rules', 'rng', 'ball_x', 'ball_y', 'ball_dx', 'ball_dy',
+                 'paddle1_y', 'paddle2_y', 'score1', 'score2', 'tick')
+
+    def __init__(self, rules=SPEEDUP_RULES, seed=None):
+        self.rules = rules
+        self.rng = random.Random(seed)
+        self.ball_x = rules.width // 2
+        self.ball_y = rules.height // 2
+        self.ball_dx = rules.ball_speed
+        self.ball_dy = rules.ball_speed
+        self.paddle1_y = (rules.height - rules.paddle_height) // 2
+        self.paddle2_y = self.paddle1_y
+        self.score1 = 0
+        self.score2 = 0
+        self.tick = 0
+
+
+def new_state(rules=SPEEDUP_RULES, seed=None):
+    """Новый матч с начальными позициями"""
+    return GameState(rules, seed)
+
+
+def move_paddle(state, player, direction):
+    """Движение ракетки игрока (1 или 2) за один тик вверх (-1) или вниз (+1)"""
+    rules = state.rules
+    y = state.paddle1_y if player == 1 else state.paddle2_y
+    y = min(max(y + direction * rules.paddle_speed, 0), rules.height - rules.paddle_height)
+    if player == 1:
+        state.paddle1_y = y
+    else:
+        state.paddle2_y = y
+
+
+def reset_ball(state):
+    """Возврат мяча в центр после гола"""
+    rules = state.rules
+    state.ball_x = rules.width // 2
+    state.ball_y = rules.height // 2
+    if rules.variant == CLASSIC:
+        speed = rules.ball_speed
+        state.ball_dx = state.rng.choice([-speed, speed])
+        state.ball_dy = state.rng.uniform(-3, 3)
+    else:
+        state.ball_dx *= -1
+        state.ball_dy = 10 if state.ball_dy > 0 else -10
+
+
+def reset_match(state):
+    """Обнуление счета и мяча для новой партии"""
+    state.score1 = 0
+    state.score2 = 0
+    reset_ball(state)
+
+
+def winner(state):
+    """Номер победителя (1 или 2) или 0, если матч продолжается"""
+    win_score = state.rules.win_score
+    if not win_score:
+        return 0
+    if state.score1 >= win_score or state.score2 >= win_score:
+        return 1 if state.score1 > state.score2 else 2
+    return 0
+
+
+def step(state, inputs=NO_INPUT):
+    """Один тик физики. Возвращает номер забившего игрока или 0"""
+    move1, move2 = inputs
+    if move1 or move2:
+        if move1:
+            move_paddle(state, 1, move1)
+        if move2:
+            move_paddle(state, 2, move2)
+    state.tick += 1
+    return state.rules.tick(state)
+
+
+def run(state, ticks, inputs=NO_INPUT):
+    """Прогон заданного числа тиков без отрисовки. Возвращает число голов"""
+    if inputs != NO_INPUT:
+        return sum(1 for _ in range(ticks) if step(state, inputs))
+    tick = state.rules.tick
+    scored = 0
+    for _ in range(ticks):
+        if tick(state):
+            scored += 1
+    state.tick += ticks
+    return scored
@@ -0,0 +1,41 @@
+class HeldKeys:
+    """Удерживаемые клавиши управления и ввод игроков для шага физики.
+
+    bindings: клавиша -> (игрок, направление). Окно сообщает о нажатиях и
+    отпусканиях, а шаг физики раз в тик забирает ввод через poll().
+    """
+
+    def __init__(self, bindings):
+        self.bindings = dict(bindings)
+        self.held = set()
+        # нажатые с прошлого тика: короткое нажатие между тиками не теряется
+        self.tapped = set()
+
+    def press(self, key):
+        """Нажатие. False - клавиша не управляет ракетками"""
+        if key not in self.bindings:
+            return False
+        self.held.add(key)
+        self.tapped.add(key)
+        return True
+
+    def release(self, key):
+        if key not in self.bindings:
+            return False
+        self.held.discard(key)
+        return True
+
+    def clear(self):
+        """Отпустить все (потеря фокуса: отпускание могло не дойти до окна)"""
+        self.held.clear()
+        self.tapped.clear()
+
+    def poll(self):
+        """Ввод на текущий тик: (move1, move2), встречные клавиши гасят друг друга"""
+        moves = [0, 0]
+        bindings = self.bindings
+        for key in self.held | self.tapped:
+            player, direction = bindings[key]
+            moves[player - 1] += direction
+        self.tapped.clear()
+        return max(-1, min(1, moves[0])), max(-1, min(1, moves[1]))
@@ -0,0 +1,68 @@
+from pong_db import Database
+
+
+LEADERBOARD_SIZE = 100
+
+# Минимум игр для рейтинга по проценту побед, чтобы одна случайная победа
+# не выводила новичка на первое место
+MIN_GAMES_FOR_RATIO = 10
+
+# Таблицы лидеров: название, значение и порядок. Порядок совпадает с индексами
+# user_stats из миграции 5, поэтому запрос первых K строк - чтение начала индекса
+BOARDS = {
+    'wins': ('Больше всего побед', 'wins', 'wins DESC, username'),
+    'win_ratio': ('Лучший процент побед', 'CAST(wins AS REAL) / games',
+                  'CAST(wins AS REAL) / games DESC, games DESC, username'),
+    'best_streak': ('Самая длинная серия побед', 'best_streak', 'best_streak DESC, username'),
+}
+
+
+def _board(board):
+    try:
+        return BOARDS[board]
+    except KeyError:
+        raise ValueError(f"Неизвестная таблица лидеров: {board}") from None
+
+
+def _filter(board, min_games):
+    """Условие отбора игроков таблицы и его параметры"""
+    if board == 'win_ratio':
+        return 'games >= ?', (min_games,)
+    return '1', ()
+
+
+def top(board='wins', limit=LEADERBOARD_SIZE, min_games=MIN_GAMES_FOR_RATIO):
+    """Первые limit игроков таблицы: (место, username, значение, игр).
+    Места считаются как в rank(): равные значения делят место"""
+    _, value, order = _board(board)
+    condition, params = _filter(board, min_games)
+    conn = Database.get_connection()
+    rows = conn.execute(f'''
+        SELECT username, {value}, games
+        FROM user_stats
+        WHERE {condition}
+        ORDER BY {order}
+        LIMIT ?
+    ''', params + (limit,)).fetchall()
+    places = []
+    for index, (username, score, games) in enumerate(rows, 1):
+        place = places[-1][0] if places and places[-1][2] == score else index
+        places.append((place, username, score, games))
+    return places
+
+
+def rank(username, board='wins', min_games=MIN_GAMES_FOR_RATIO):
+    """Место игрока в таблице (1 - лучший) или None, если его нет в таблице"""
+    _, value, _ = _board(board)
+    conn = Database.get_connection()
+    row = conn.execute(f'SELECT {value}, games FROM user_stats WHERE username = ?',
+                       (username,)).fetchone()
+    if row is None or (board == 'win_ratio' and row[1] < min_games):
+        return None
+    # игроки с равным значением делят место
+    condition, params = _filter(board, min_games)
+    better = conn.execute(f'''
+        SELECT COUNT(*) FROM user_stats
+        WHERE {condition} AND {value} > ?
+    ''', params + (row[0],)).fetchone()[0]
+    return better + 1
@@ -0,0 +1,558 @@
+import asyncio
+import queue
+import random
+import struct
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import game_loop
+import pong_engine
+from pong_db import Database
+
+
+DEFAULT_PORT = 5555
+
+# Типы сообщений
+HELLO, WELCOME, INPUT, SNAPSHOT, BYE = 1, 2, 3, 4, 5
+
+NO_TICK = 0xFFFFFFFF
+INPUT_REDUNDANCY = 8     # последних неподтвержденных вводов в каждом пакете (на случай потерь)
+INPUT_BUFFER = 2         # сверх стольких ожидающих вводов сервер догоняет клиента
+MAX_INPUT_AHEAD = 256
+SNAPSHOT_INTERVAL = 2    # снимок состояния раз в столько тиков
+SNAPSHOT_HISTORY = 64    # тиков, для которых хранятся базы дельта-сжатия
+RESULT_PAUSE = 120       # тиков показа итогового счета перед новым матчем
+HELLO_INTERVAL = 0.25
+KEEPALIVE_INTERVAL = 1.0  # HELLO принятого клиента: место за ним, пока матч ждет соперника
+PLAYER_TIMEOUT = 5.0      # секунд без пакетов, после которых место игрока освобождается
+
+# Поля снимка; в пакет попадают только изменившиеся относительно базы
+FIELDS = ('ball_x', 'ball_y', 'ball_dx', 'ball_dy', 'paddle1_y', 'paddle2_y',
+          'score1', 'score2')
+FIELD_STRUCTS = tuple(struct.Struct('<' + code) for code in 'ddddddHH')
+
+HELLO_HEADER = struct.Struct('<BB')          # тип, длина имени
+WELCOME_FORMAT = struct.Struct('<BBH')       # тип, номер игрока (0 - мест нет), win_score
+BYE_FORMAT = struct.Struct('<B')
+INPUT_HEADER = struct.Struct('<BIIB')        # тип, последний полученный снимок, первый номер, число
+SNAPSHOT_HEADER = struct.Struct('<BIIIB')    # тип, тик, тик базы, подтвержденный ввод, маска полей
+
+
+class ProtocolError(ValueError):
+    """Поврежденный или неизвестный пакет"""
+
+
+def capture(state):
+    return tuple(getattr(state, name) for name in FIELDS)
+
+
+def apply(state, values):
+    for name, value in zip(FIELDS, values):
+        setattr(state, name, value)
+
+
+def encode_hello(username):
+    name = username.encode()[:255]
+    return HELLO_HEADER.pack(HELLO, len(name)) + name
+
+
+def encode_welcome(player, win_score):
+    return WELCOME_FORMAT.pack(WELCOME, player, win_score)
+
+
+def encode_bye():
+    return BYE_FORMAT.pack(BYE)
+
+
+def encode_input(ack_tick, first_seq, moves):
+    return INPUT_HEADER.pack(INPUT, ack_tick, first_seq, len(moves)) + \
+        bytes(move + 1 for move in moves)
+
+
+def decode_input(data):
+    """(подтвержденный снимок, первый номер, ходы)"""
+    _, ack_tick, first_seq, count = INPUT_HEADER.unpack_from(data)
+    moves = data[INPUT_HEADER.size:INPUT_HEADER.size + count]
+    if len(moves) != count or any(code > 2 for code in moves):
+        raise ProtocolError("Поврежденный пакет ввода")
+    return ack_tick, first_seq, [code - 1 for code in moves]
+
+
+def encode_snapshot(tick, values, ack_seq, base_tick=NO_TICK, base=None):
+    """Снимок с полями, отличающимися от base (все поля, если базы нет)"""
+    mask = 0
+    parts = []
+    for i, (field, value) in enumerate(zip(FIELD_STRUCTS, values)):
+        if base is None or base[i] != value:
+            mask |= 1 << i
+            parts.append(field.pack(value))
+    if base is None:
+        base_tick = NO_TICK
+    return SNAPSHOT_HEADER.pack(SNAPSHOT, tick, base_tick, ack_seq, mask) + b''.join(parts)
+
+
+def decode_snapshot(data, baselines):
+    """(тик, значения полей, подтвержденный ввод) или None, если базы нет у клиента"""
+    _, tick, base_tick, ack_seq, mask = SNAPSHOT_HEADER.unpack_from(data)
+    if base_tick == NO_TICK:
+        base = None
+    else:
+        base = baselines.get(base_tick)
+        if base is None:
+            return None
+    values = []
+    pos = SNAPSHOT_HEADER.size
+    for i, field in enumerate(FIELD_STRUCTS):
+        if mask & (1 << i):
+            values.append(field.unpack_from(data, pos)[0])
+            pos += field.size
+        elif base is not None:
+            values.append(base[i])
+        else:
+            raise ProtocolError("Полный снимок без поля")
+    return tick, tuple(values), ack_seq
+
+
+def result_rows(usernames, score1, score2):
+    """Строки для game_history с точки зрения каждого игрока (он - 'Игрок 1')"""
+    rows = []
+    for player, username in usernames.items():
+        own, other = (score1, score2) if player == 1 else (score2, score1)
+        rows.append((username, own, other, 'Игрок 1' if own > other else 'Игрок 2'))
+    return rows
+
+
+class PlayerSlot:
+    """Вводы одного игрока на сервере"""
+
+    def __init__(self, username):
+        self.username = username
+        self.last_seq = 0          # последний примененный ввод
+        self.moves = {}            # номер -> ход, пришедшие вперед
+        self.ack_tick = NO_TICK    # последний снимок, полученный клиентом
+        self.started = False
+
+    def receive(self, first_seq, moves):
+        if not self.started:
+            # нумерация - клиента: вернувшись после тишины, он продолжает свою
+            self.started = True
+            self.last_seq = first_seq - 1
+        for seq, move in enumerate(moves, first_seq):
+            if self.last_seq < seq <= self.last_seq + MAX_INPUT_AHEAD:
+                self.moves[seq] = move
+
+    def take(self):
+        """Ходы на этот тик. Нет ввода - ракетка стоит; накопилось - догоняем"""
+        taken = []
+        while self.last_seq + 1 in self.moves and (not taken or len(self.moves) > INPUT_BUFFER):
+            self.last_seq += 1
+            taken.append(self.moves.pop(self.last_seq))
+        return taken
+
+
+class ServerMatch:
+    """Авторитетный матч: правила GameWindow.update_game, ввод от клиентов"""
+
+    def __init__(self, rules=pong_engine.SPEEDUP_RULES, on_result=None):
+        self.state = pong_engine.new_state(rules)
+        self.players = {}
+        self.on_result = on_result
+        self.ticks = 0
+        self.pause = 0
+        self.history = {}
+
+    def join(self, username):
+        """Номер игрока (1 или 2) или 0, если места заняты"""
+        for player in (1, 2):
+            if player not in self.players:
+                self.players[player] = PlayerSlot(username)
+                return player
+        return 0
+
+    def leave(self, player):
+        """Освободить место игрока. Матч начинается заново: новый соперник
+        не должен продолжать чужой счет"""
+        if self.players.pop(player, None) is not None:
+            pong_engine.reset_match(self.state)
+            self.pause = 0
+
+    def receive_input(self, player, ack_tick, first_seq, moves):
+        slot = self.players[player]
+        slot.receive(first_seq, moves)
+        if ack_tick != NO_TICK and (slot.ack_tick == NO_TICK or ack_tick > slot.ack_tick):
+            slot.ack_tick = ack_tick
+
+    def ready(self):
+        return len(self.players) == 2
+
+    def tick(self):
+        """Шаг сервера. Возвращает забившего (0 - нет гола)"""
+        if not self.ready():
+            return 0
+        state = self.state
+        self.ticks += 1
+        scored = 0
+        if self.pause:
+            self.pause -= 1
+            if not self.pause:
+                pong_engine.reset_match(state)
+        else:
+            moves = [self.players[1].take(), self.players[2].take()]
+            # лишние ходы догоняющего клиента применяются до шага
+            for player, taken in enumerate(moves, 1):
+                for move in taken[:-1]:
+                    pong_engine.move_paddle(state, player, move)
+            inputs = tuple(taken[-1] if taken else 0 for taken in moves)
+            scored = pong_engine.step(state, inputs)
+            if pong_engine.winner(state):
+                self.pause = RESULT_PAUSE
+                if self.on_result is not None:
+                    usernames = {player: slot.username for player, slot in self.players.items()}
+                    self.on_result(result_rows(usernames, state.score1, state.score2))
+        self.history[self.ticks] = capture(state)
+        self.history.pop(self.ticks - SNAPSHOT_HISTORY, None)
+        return scored
+
+    def snapshot_for(self, player):
+        """Снимок для игрока, сжатый относительно последнего полученного им"""
+        slot = self.players[player]
+        base = self.history.get(slot.ack_tick)
+        return encode_snapshot(self.ticks, self.history[self.ticks], slot.last_seq,
+                               slot.ack_tick, base)
+
+
+class ClientPrediction:
+    """Предсказание на клиенте: свой ввод применяется сразу, снимок сервера
+    заменяет состояние, после чего неподтвержденные вводы применяются заново"""
+
+    def __init__(self, rules=pong_engine.SPEEDUP_RULES):
+        self.state = pong_engine.new_state(rules)
+        self.player = 0
+        self.seq = 0
+        self.pending = deque()
+        self.baselines = {}
+        self.last_tick = NO_TICK
+        self.server = None          # значения последнего снимка сервера
+        self.snapshots = 0
+        self.snapshot_bytes = 0
+
+    def welcome(self, player, win_score):
+        """Место на сервере. Повторное (сервер освободил прежнее место) -
+        синхронизация начинается заново"""
+        self.player = player
+        self.seq = 0
+        self.pending.clear()
+        self.baselines.clear()
+        self.last_tick = NO_TICK
+        self.server = None
+        rules = self.state.rules
+        if win_score != rules.win_score:
+            self.state.rules = pong_engine.Rules(
+                rules.variant, rules.width, rules.height, rules.paddle_x, rules.paddle_width,
+                rules.paddle_height, rules.ball_size, rules.ball_speed, rules.paddle_speed,
+                win_score=win_score, continuous=rules.continuous)
+
+    def _inputs(self, move):
+        return (move, 0) if self.player == 1 else (0, move)
+
+    def local_tick(self, move):
+        """Свой ход на этот тик. Возвращает (забивший по прогнозу, пакет ввода)"""
+        self.seq += 1
+        self.pending.append((self.seq, move))
+        scored = pong_engine.step(self.state, self._inputs(move))
+        recent = list(self.pending)[-INPUT_REDUNDANCY:]
+        packet = encode_input(self.last_tick, recent[0][0], [m for _, m in recent])
+        return scored, packet
+
+    def receive_snapshot(self, data):
+        """Сверка со снимком сервера. False - снимок устарел или база неизвестна"""
+        decoded = decode_snapshot(data, self.baselines)
+        if decoded is None:
+            return False
+        tick, values, ack_seq = decoded
+        if self.last_tick != NO_TICK and tick <= self.last_tick:
+            return False
+        self.last_tick = tick
+        self.baselines[tick] = values
+        self.baselines.pop(tick - SNAPSHOT_HISTORY, None)
+        self.server = values
+        self.snapshots += 1
+        self.snapshot_bytes += len(data)
+
+        pending = self.pending
+        while pending and pending[0][0] <= ack_seq:
+            pending.popleft()
+        state = self.state
+        apply(state, values)
+        for _, move in pending:
+            pong_engine.step(state, self._inputs(move))
+        return True
+
+    def server_scores(self):
+        if self.server is None:
+            return 0, 0
+        return self.server[6], self.server[7]
+
+    def server_winner(self):
+        """Победитель по последнему снимку сервера (0 - матч идет)"""
+        score1, score2 = self.server_scores()
+        win_score = self.state.rules.win_score
+        if win_score and max(score1, score2) >= win_score:
+            return 1 if score1 > score2 else 2
+        return 0
+
+
+class SimulatedLink:
+    """Отправка UDP с искусственной задержкой, разбросом и потерями"""
+
+    def __init__(self, latency=0.0, jitter=0.0, loss=0.0, seed=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.loss = loss
+        self.rng = random.Random(seed)
+        self.sent = 0
+        self.dropped = 0
+        self.bytes = 0
+
+    def send(self, loop, transport, data, addr=None):
+        if self.loss and self.rng.random() < self.loss:
+            self.dropped += 1
+            return
+        self.sent += 1
+        self.bytes += len(data)
+        delay = self.latency + self.rng.uniform(0, self.jitter)
+        if delay > 0:
+            loop.call_later(delay, transport.sendto, data, addr)
+        else:
+            transport.sendto(data, addr)
+
+
+class _Datagrams(asyncio.DatagramProtocol):
+    def __init__(self, handler):
+        self.handler = handler
+
+    def datagram_received(self, data, addr):
+        self.handler(data, addr)
+
+
+class _LoopThread:
+    """Цикл asyncio в отдельном потоке (как ResultWriter - фоновый поток)"""
+
+    def _start_thread(self, name):
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        if self._error is not None:
+            raise self._error
+
+    def _run(self):
+        self._error = None
+        self.loop = asyncio.new_event_loop()
+        try:
+            self.loop.run_until_complete(self._main())
+        except OSError as error:
+            self._error = error
+            self._ready.set()
+        finally:
+            self.loop.close()
+
+    def stop(self):
+        if self._thread.is_alive():
+            self.loop.call_soon_threadsafe(self._stopping.set)
+            self._thread.join()
+
+
+class NetServer(_LoopThread):
+    """Авторитетный сервер на UDP: тики по game_loop.FixedStepLoop, итоги матчей -
+    в game_history через Database.save_game_result. Место игрока освобождается
+    по BYE или после timeout секунд тишины"""
+
+    def __init__(self, host='0.0.0.0', port=DEFAULT_PORT, rules=pong_engine.SPEEDUP_RULES,
+                 link=None, timeout=PLAYER_TIMEOUT):
+        self.host = host
+        self.port = port
+        self.link = link or SimulatedLink()
+        self.timeout = timeout
+        self.match = ServerMatch(rules, on_result=self._save)
+        self.addresses = {}
+        self.heard = {}            # адрес -> time.monotonic() последнего пакета
+        self.results = ThreadPoolExecutor(max_workers=1, thread_name_prefix='net-results')
+        self.errors = 0
+        self.address = None
+
+    def start(self):
+        self._start_thread('pong-server')
+        return self
+
+    def stop(self):
+        super().stop()
+        self.results.submit(Database.manager.release)
+        self.results.shutdown(wait=True)
+
+    def _save(self, rows):
+        # запись в базу вне потока сервера, тики не ждут диска
+        for row in rows:
+            self.results.submit(Database.save_game_result, *row)
+
+    async def _main(self):
+        self._stopping = asyncio.Event()
+        self.transport, _ = await self.loop.create_datagram_endpoint(
+            lambda: _Datagrams(self._received), local_addr=(self.host, self.port))
+        self.address = self.transport.get_extra_info('sockname')
+        self._ready.set()
+        ticker = game_loop.FixedStepLoop(self.match.state, self._tick)
+        ticker.start()
+        while not self._stopping.is_set():
+            ticker.advance()
+            try:
+                await asyncio.wait_for(self._stopping.wait(), ticker.dt / 4)
+            except asyncio.TimeoutError:
+                pass
+        self.transport.close()
+
+    def _send(self, data, addr):
+        self.link.send(self.loop, self.transport, data, addr)
+
+    def _received(self, data, addr):
+        try:
+            kind = data[0]
+            if kind == HELLO:
+                _, length = HELLO_HEADER.unpack_from(data)
+                username = data[HELLO_HEADER.size:HELLO_HEADER.size + length].decode()
+                player = self.addresses.get(addr)
+                if player is None:
+                    player = self.match.join(username)
+                    if player:
+                        self.addresses[addr] = player
+                if player:
+                    self.heard[addr] = time.monotonic()
+                self._send(encode_welcome(player, self.match.state.rules.win_score), addr)
+            elif kind == INPUT and addr in self.addresses:
+                self.match.receive_input(self.addresses[addr], *decode_input(data))
+                self.heard[addr] = time.monotonic()
+            elif kind == BYE:
+                self._leave(addr)
+            else:
+                raise ProtocolError(f"Неизвестный пакет {kind}")
+        except (IndexError, struct.error, UnicodeDecodeError, ProtocolError):
+            self.errors += 1
+
+    def _leave(self, addr):
+        player = self.addresses.pop(addr, None)
+        self.heard.pop(addr, None)
+        if player:
+            self.match.leave(player)
+
+    def _tick(self, state):
+        now = time.monotonic()
+        for addr in [addr for addr, heard in self.heard.items() if now - heard > self.timeout]:
+            self._leave(addr)
+        match = self.match
+        scored = match.tick()
+        if match.ready() and (match.ticks % SNAPSHOT_INTERVAL == 0 or scored or match.pause):
+            for addr, player in self.addresses.items():
+                self._send(match.snapshot_for(player), addr)
+        return scored
+
+
+class NetClient(_LoopThread):
+    """Клиент сетевой игры. Сеть - в своем потоке; предсказание и сверка
+    выполняются в tick() из потока интерфейса"""
+
+    def __init__(self, host, port, username, link=None):
+        self.server_address = (host, port)
+        self.username = username
+        self.link = link or SimulatedLink()
+        self.prediction = ClientPrediction()
+        self.inbox = queue.SimpleQueue()
+        self.errors = 0
+
+    @property
+    def state(self):
+        return self.prediction.state
+
+    def start(self):
+        self._start_thread('pong-client')
+        return self
+
+    def stop(self):
+        """Отключение: BYE сразу освобождает место на сервере (если пакет
+        потерян - сервер освободит его по тишине)"""
+        if self._thread.is_alive():
+            self.loop.call_soon_threadsafe(self.transport.sendto, encode_bye())
+        super().stop()
+
+    async def _main(self):
+        self._stopping = asyncio.Event()
+        self.transport, _ = await self.loop.create_datagram_endpoint(
+            lambda: _Datagrams(lambda data, addr: self.inbox.put(data)),
+            remote_addr=self.server_address)
+        self._ready.set()
+        hello = encode_hello(self.username)
+        sent = 0
+        while not self._stopping.is_set():
+            now = time.monotonic()
+            if not self.prediction.player or now - sent >= KEEPALIVE_INTERVAL:
+                self.link.send(self.loop, self.transport, hello)
+                sent = now
+            try:
+                await asyncio.wait_for(self._stopping.wait(), HELLO_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+        self.transport.close()
+
+    def tick(self, move):
+        """Тик клиента: разбор пришедших пакетов, свой ход и отправка ввода"""
+        prediction = self.prediction
+        while True:
+            try:
+                data = self.inbox.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                if data[0] == SNAPSHOT:
+                    prediction.receive_snapshot(data)
+                elif data[0] == WELCOME:
+                    _, player, win_score = WELCOME_FORMAT.unpack_from(data)
+                    if player and player != prediction.player:
+                        prediction.welcome(player, win_score)
+            except (IndexError, struct.error, ProtocolError):
+                self.errors += 1
+        if not prediction.player or prediction.server is None:
+            return 0
+        scored, packet = prediction.local_tick(move)
+        self.loop.call_soon_threadsafe(self.link.send, self.loop, self.transport, packet)
+        return scored
+
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description='Сервер сетевой игры в пинг-понг')
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--win-score', type=int, default=pong_engine.SPEEDUP_RULES.win_score)
+    parser.add_argument('--db', default=None, help='файл базы (по умолчанию ping_pong.db)')
+    parser.add_argument('--latency', type=float, default=0.0, help='задержка отправки, с')
+    parser.add_argument('--jitter', type=float, default=0.0)
+    parser.add_argument('--loss', type=float, default=0.0, help='доля теряемых пакетов')
+    args = parser.parse_args(argv)
+    if args.db:
+        Database.configure(args.db)
+    Database.init_db()
+    server = NetServer(args.host, args.port, pong_engine.Rules(win_score=args.win_score),
+                       SimulatedLink(args.latency, args.jitter, args.loss)).start()
+    print(f"Сервер слушает {server.address[0]}:{server.address[1]}")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    server.stop()
+    Database.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+from PyQt5.QtCore import QRect
+from PyQt5.QtGui import QPainter, QPixmap
+
+
+MARGIN = 2   # запас вокруг объектов на сглаживание и обводку
+
+
+def object_rects(rules, positions):
+    """Прямоугольники мяча и обеих ракеток для заданных позиций"""
+    ball_x, ball_y, paddle1_y, paddle2_y = positions
+    size = rules.ball_size
+    paddle2_x = rules.width - rules.paddle_x - rules.paddle_width
+    rects = (
+        QRect(int(ball_x), int(ball_y), size, size),
+        QRect(rules.paddle_x, int(paddle1_y), rules.paddle_width, rules.paddle_height),
+        QRect(paddle2_x, int(paddle2_y), rules.paddle_width, rules.paddle_height),
+    )
+    return tuple(rect.adjusted(-MARGIN, -MARGIN, MARGIN, MARGIN) for rect in rects)
+
+
+class WorkCounter:
+    """Счетчик работы с виджетами Qt по кадрам (перерисовки, setText и т.п.)"""
+
+    def __init__(self):
+        self.frames = 0
+        self.totals = {}
+
+    def add(self, kind, count=1):
+        self.totals[kind] = self.totals.get(kind, 0) + count
+
+    def end_frame(self):
+        self.frames += 1
+
+    def per_frame(self):
+        """Средняя работа каждого вида на один кадр"""
+        frames = max(self.frames, 1)
+        return {kind: total / frames for kind, total in self.totals.items()}
+
+
+class DirtyTracker:
+    """Запоминает, где объекты были нарисованы, и перерисовывает только изменения"""
+
+    def __init__(self, work=None):
+        self.previous = None
+        self.work = work
+
+    def invalidate(self, widget, rules, positions):
+        """Запросить перерисовку старых и новых областей сдвинувшихся объектов"""
+        current = object_rects(rules, positions)
+        requests = 0
+        if self.previous is None:
+            widget.update()
+            requests = 1
+        else:
+            for old, new in zip(self.previous, current):
+                if old != new:
+                    widget.update(old)
+                    widget.update(new)
+                    requests += 2
+        self.previous = current
+        if self.work is not None:
+            self.work.add('repaint', requests)
+
+    def reset(self):
+        """Следующий кадр будет перерисован целиком"""
+        self.previous = None
+
+
+def static_layer(size, background, pen, rules):
+    """Заранее отрисованный фон с центральной линией"""
+    pixmap = QPixmap(size)
+    pixmap.fill(background)
+    painter = QPainter(pixmap)
+    painter.setPen(pen)
+    painter.drawLine(rules.width // 2, 0, rules.width // 2, rules.height)
+    painter.end()
+    return pixmap
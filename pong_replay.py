@@ -0,0 +1,217 @@
+import bisect
+import struct
+
+import pong_engine
+
+
+# Формат записи:
+#   заголовок  MAGIC, версия, вариант правил, зерно ГСЧ, начальное состояние
+#              (мяч x, y, dx, dy, ракетки), счет - struct HEADER
+#   тела       число тиков и число изменений ввода - varint
+#              изменения: (тиков с прошлого изменения - varint, код ввода - байт)
+# Код ввода - (move1 + 1) * 3 + (move2 + 1). Записывается только смена ввода,
+# поэтому минута игры с редкими нажатиями занимает десятки байт.
+MAGIC = b'PPRP'
+# 2: ракетки движутся со скоростью paddle_speed, пока клавиша удерживается
+VERSION = 2
+HEADER = struct.Struct('<4sBBq6dHH')
+
+VARIANTS = {pong_engine.CLASSIC: 0, pong_engine.SPEEDUP: 1}
+RULES = {0: pong_engine.CLASSIC_RULES, 1: pong_engine.SPEEDUP_RULES}
+
+NO_INPUT_CODE = 4
+
+# Как часто плеер запоминает снимок состояния для быстрой перемотки назад
+KEYFRAME_INTERVAL = 600
+
+
+class ReplayError(ValueError):
+    """Поврежденная или неподдерживаемая запись"""
+
+
+def encode_input(inputs):
+    move1, move2 = inputs
+    return (move1 + 1) * 3 + (move2 + 1)
+
+
+def decode_input(code):
+    move1, move2 = divmod(code, 3)
+    return move1 - 1, move2 - 1
+
+
+def _write_varint(out, value):
+    while value >= 0x80:
+        out.append(value & 0x7F | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(data, pos):
+    value = 0
+    shift = 0
+    while True:
+        if pos >= len(data):
+            raise ReplayError("Запись обрывается")
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+def snapshot(state):
+    """Состояние матча, достаточное для продолжения симуляции"""
+    return (state.ball_x, state.ball_y, state.ball_dx, state.ball_dy,
+            state.paddle1_y, state.paddle2_y, state.score1, state.score2,
+            state.tick, state.rng.getstate())
+
+
+def restore(state, saved):
+    """Возврат состояния к снимку на месте (ссылки на state остаются верными)"""
+    (state.ball_x, state.ball_y, state.ball_dx, state.ball_dy,
+     state.paddle1_y, state.paddle2_y, state.score1, state.score2,
+     state.tick, rng_state) = saved
+    state.rng.setstate(rng_state)
+
+
+class Replay:
+    """Запись матча: правила, зерно, начальное состояние и изменения ввода"""
+
+    def __init__(self, rules, seed, start, ticks=0, changes=None):
+        self.rules = rules
+        self.seed = seed
+        # (ball_x, ball_y, ball_dx, ball_dy, paddle1_y, paddle2_y, score1, score2)
+        self.start = start
+        self.ticks = ticks
+        # (тик, код ввода) в порядке возрастания тика
+        self.changes = changes if changes is not None else []
+        self._change_ticks = None
+
+    def initial_state(self):
+        """Состояние перед первым тиком записи"""
+        state = pong_engine.new_state(self.rules, self.seed)
+        (state.ball_x, state.ball_y, state.ball_dx, state.ball_dy,
+         state.paddle1_y, state.paddle2_y, state.score1, state.score2) = self.start
+        return state
+
+    def input_at(self, tick):
+        """Ввод на заданном тике"""
+        if self._change_ticks is None:
+            self._change_ticks = [t for t, _ in self.changes]
+        i = bisect.bisect_right(self._change_ticks, tick) - 1
+        return decode_input(self.changes[i][1]) if i >= 0 else pong_engine.NO_INPUT
+
+    def dumps(self):
+        """Двоичное представление записи"""
+        variant = VARIANTS[self.rules.variant]
+        ball_x, ball_y, ball_dx, ball_dy, paddle1_y, paddle2_y, score1, score2 = self.start
+        out = bytearray(HEADER.pack(MAGIC, VERSION, variant, self.seed,
+                                    ball_x, ball_y, ball_dx, ball_dy, paddle1_y, paddle2_y,
+                                    score1, score2))
+        _write_varint(out, self.ticks)
+        _write_varint(out, len(self.changes))
+        previous = 0
+        for tick, code in self.changes:
+            _write_varint(out, tick - previous)
+            out.append(code)
+            previous = tick
+        return bytes(out)
+
+    @classmethod
+    def loads(cls, data):
+        if len(data) < HEADER.size:
+            raise ReplayError("Запись обрывается")
+        (magic, version, variant, seed, ball_x, ball_y, ball_dx, ball_dy,
+         paddle1_y, paddle2_y, score1, score2) = HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ReplayError("Это не запись матча")
+        if version != VERSION or variant not in RULES:
+            raise ReplayError(f"Неподдерживаемая запись: версия {version}, правила {variant}")
+        pos = HEADER.size
+        ticks, pos = _read_varint(data, pos)
+        count, pos = _read_varint(data, pos)
+        changes = []
+        tick = 0
+        for _ in range(count):
+            delta, pos = _read_varint(data, pos)
+            if pos >= len(data):
+                raise ReplayError("Запись обрывается")
+            tick += delta
+            changes.append((tick, data[pos]))
+            pos += 1
+        start = (ball_x, ball_y, ball_dx, ball_dy, paddle1_y, paddle2_y, score1, score2)
+        return cls(RULES[variant], seed, start, ticks, changes)
+
+
+class Recorder:
+    """Запись ввода матча по тикам"""
+
+    def __init__(self, state, seed):
+        # ГСЧ матча пересеивается, чтобы запись не зависела от прошлых матчей
+        state.rng.seed(seed)
+        start = (state.ball_x, state.ball_y, state.ball_dx, state.ball_dy,
+                 state.paddle1_y, state.paddle2_y, state.score1, state.score2)
+        self.replay = Replay(state.rules, seed, start)
+        self.last = NO_INPUT_CODE
+
+    def record(self, inputs):
+        """Ввод очередного тика (вызывается перед pong_engine.step)"""
+        code = encode_input(inputs)
+        replay = self.replay
+        if code != self.last:
+            replay.changes.append((replay.ticks, code))
+            self.last = code
+        replay.ticks += 1
+
+
+class ReplayPlayer:
+    """Воспроизведение записи с перемоткой в любую точку.
+
+    Перемотка пересчитывает физику без отрисовки от ближайшего снимка;
+    снимки запоминаются каждые keyframe_interval тиков по мере прохода.
+    """
+
+    def __init__(self, replay, keyframe_interval=KEYFRAME_INTERVAL):
+        self.replay = replay
+        self.keyframe_interval = keyframe_interval
+        self.state = replay.initial_state()
+        self.position = 0       # тиков записи уже воспроизведено
+        self.change = 0         # индекс следующего изменения ввода
+        self.inputs = pong_engine.NO_INPUT
+        self.keyframes = {0: self._keyframe()}
+
+    def _keyframe(self):
+        return snapshot(self.state), self.change, self.inputs
+
+    def finished(self):
+        return self.position >= self.replay.ticks
+
+    def step(self, state=None):
+        """Один тик записи (совместим с game_loop.FixedStepLoop). Возвращает забившего"""
+        if self.position >= self.replay.ticks:
+            return 0
+        changes = self.replay.changes
+        if self.change < len(changes) and changes[self.change][0] == self.position:
+            self.inputs = decode_input(changes[self.change][1])
+            self.change += 1
+        scored = pong_engine.step(self.state, self.inputs)
+        self.position += 1
+        if self.position % self.keyframe_interval == 0:
+            self.keyframes.setdefault(self.position, self._keyframe())
+        return scored
+
+    def seek(self, tick):
+        """Перейти к тику tick (0 - начало записи)"""
+        tick = max(0, min(tick, self.replay.ticks))
+        # ближайший известный снимок не позже tick; если текущая позиция
+        # между ним и tick, выгоднее досчитать вперед от нее
+        base = tick - tick % self.keyframe_interval
+        while base not in self.keyframes:
+            base -= self.keyframe_interval
+        if not base <= self.position <= tick:
+            saved, self.change, self.inputs = self.keyframes[base]
+            restore(self.state, saved)
+            self.position = base
+        while self.position < tick:
+            self.step()
@@ -0,0 +1,171 @@
+import argparse
+import itertools
+import multiprocessing
+import os
+import sys
+import time
+
+import pong_engine
+from pong_ai import CpuPlayer, LEVELS
+from pong_db import Database, ResultWriter
+
+
+TOURNAMENT_DB = "tournament.db"
+
+# Ограничение длины матча: равные сильные соперники могут не пропускать никогда
+MAX_TICKS = 60 * 60 * 10
+DRAW = 'Ничья'
+
+
+def schedule(levels, games):
+    """Матчи кругового турнира: каждая упорядоченная пара уровней играет games раз"""
+    pairs = [(a, b) for a, b in itertools.product(levels, repeat=2) if a != b]
+    return [(index, a, b) for index, (a, b) in
+            enumerate(pair for pair in pairs for _ in range(games))]
+
+
+def match_seed(seed, index):
+    """Зерно матча: зависит только от зерна турнира и номера матча"""
+    return seed * 1_000_003 + index
+
+
+def play_match(job, seed=0, win_score=10, max_ticks=MAX_TICKS):
+    """Один матч до win_score (как в GameWindow.end_game).
+    Возвращает (номер, уровень 1, уровень 2, счет 1, счет 2, тики, прерван):
+    прерванный на max_ticks матч - ничья при любом счете"""
+    index, level1, level2 = job
+    rules = pong_engine.Rules(win_score=win_score)
+    base = match_seed(seed, index)
+    state = pong_engine.new_state(rules, seed=base)
+    player1 = CpuPlayer.level(rules, level1, 1, seed=base * 2)
+    player2 = CpuPlayer.level(rules, level2, 2, seed=base * 2 + 1)
+    step = pong_engine.step
+    winner = pong_engine.winner
+    decide1 = player1.decide
+    decide2 = player2.decide
+    ticks = 0
+    while ticks < max_ticks and not winner(state):
+        step(state, (decide1(state), decide2(state)))
+        ticks += 1
+    return index, level1, level2, state.score1, state.score2, ticks, not winner(state)
+
+
+def _play(args):
+    job, seed, win_score, max_ticks = args
+    return play_match(job, seed, win_score, max_ticks)
+
+
+def result_row(result):
+    """Строка для game_history: игрок - первый бот, 'Компьютер' - второй"""
+    _, level1, level2, score1, score2, _, capped = result
+    if capped:
+        winner = DRAW
+    else:
+        winner = 'Игрок 1' if score1 > score2 else 'Игрок 2'
+    return f"cpu:{level1}", score1, score2, winner
+
+
+class Progress:
+    """Отчет о ходе турнира не чаще раза в interval секунд"""
+
+    def __init__(self, total, interval=1.0, out=sys.stderr):
+        self.total = total
+        self.interval = interval
+        self.out = out
+        self.done = 0
+        self.ticks = 0
+        self.start = time.perf_counter()
+        self.last = self.start
+
+    def add(self, ticks):
+        self.done += 1
+        self.ticks += ticks
+        now = time.perf_counter()
+        if now - self.last >= self.interval or self.done == self.total:
+            self.last = now
+            self.report(now)
+
+    def report(self, now=None):
+        elapsed = max((now or time.perf_counter()) - self.start, 1e-9)
+        print(f"\r{self.done}/{self.total} матчей  {self.done / elapsed:,.0f} матчей/с  "
+              f"{self.ticks / elapsed:,.0f} тиков/с", end='', file=self.out, flush=True)
+
+
+def run(levels, games, seed=0, workers=None, win_score=10, max_ticks=MAX_TICKS,
+        writer=None, progress=None, chunksize=8):
+    """Прогон турнира по всем ядрам. Возвращает таблицу
+    {(уровень 1, уровень 2): [побед 1, побед 2, ничьих]}.
+    У каждого матча свое зерно, поэтому итог не зависит от числа процессов"""
+    jobs = [(job, seed, win_score, max_ticks) for job in schedule(levels, games)]
+    table = {(a, b): [0, 0, 0] for _, a, b in schedule(levels, 1)}
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        results = map(_play, jobs)
+        pool = None
+    else:
+        pool = multiprocessing.Pool(workers)
+        # порядок прихода не важен: результат матча задан его зерном
+        results = pool.imap_unordered(_play, jobs, chunksize)
+    try:
+        for result in results:
+            _, level1, level2, score1, score2, ticks, capped = result
+            cell = table[level1, level2]
+            cell[2 if capped else 0 if score1 > score2 else 1] += 1
+            if writer is not None:
+                row = result_row(result)
+                while not writer.submit(*row):
+                    # очередь писателя полна - ждем, пока он ее разгребет
+                    writer.flush()
+            if progress is not None:
+                progress.add(ticks)
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+    return table
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Турнир компьютерных соперников')
+    parser.add_argument('--levels', default=','.join(LEVELS),
+                        help='уровни через запятую (по умолчанию все)')
+    parser.add_argument('--games', type=int, default=20, help='матчей на упорядоченную пару')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, default=None, help='процессов (по умолчанию все ядра)')
+    parser.add_argument('--win-score', type=int, default=10)
+    parser.add_argument('--max-ticks', type=int, default=MAX_TICKS)
+    parser.add_argument('--db', default=TOURNAMENT_DB,
+                        help='база для результатов (game_history); пусто - не сохранять')
+    args = parser.parse_args(argv)
+
+    levels = args.levels.split(',')
+    unknown = [level for level in levels if level not in LEVELS]
+    if unknown:
+        parser.error(f"неизвестные уровни: {', '.join(unknown)}")
+
+    writer = None
+    failed = []
+    if args.db:
+        Database.configure(args.db)
+        Database.init_db()
+        writer = ResultWriter()
+    progress = Progress(len(schedule(levels, args.games)))
+    try:
+        table = run(levels, args.games, args.seed, args.workers, args.win_score,
+                    args.max_ticks, writer, progress)
+    finally:
+        if writer is not None:
+            failed = writer.close()
+            Database.close()
+    print(file=sys.stderr)
+
+    for (level1, level2), (wins1, wins2, draws) in table.items():
+        print(f"{level1:>8} - {level2:<8} {wins1:6} : {wins2:<6} ничьих {draws}")
+    if writer is not None:
+        print(f"записано в {args.db}: {writer.written} матчей, {writer.batches} пачек")
+        if failed:
+            print(f"не записано: {len(failed)} матчей ({writer.last_error})", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
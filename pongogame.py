@@ -1,8 +1,12 @@
+import argparse
 import random
 import time
 
+from bongo_engine import BONGO, DOUBLE, RESIGN, ROLL, BongoGame, Rules, simulate
+
 def display_welcome():
-    """Выводит приветственное сообщение и правила игры."""
+    """Выводит приветственное сообщение и правила игры.
+    False, если ввод закрыт (Ctrl+D)."""
     print("--- ДОБРО ПОЖАЛОВАТЬ В ИГРУ БОНГО! ---")
     print("Цель: Первым набрать 100 очков.")
     print("\nПравила:")
@@ -11,7 +15,12 @@ def display_welcome():
     print("3. Дубль (кроме 3-3): Сумма удваивается и добавляется к вашему счету.")
     print("4. БОНГО! (Два кубика по 3): Ваш счет обнуляется!")
     print("--------------------------------------")
-    input("Нажмите Enter, чтобы начать игру...")
+    try:
+        input("Нажмите Enter, чтобы начать игру...")
+    except EOFError:
+        print()
+        return False
+    return True
 
 def roll_dice():
     """Симулирует бросок двух кубиков и возвращает их значения."""
@@ -19,59 +28,90 @@ def roll_dice():
     die2 = random.randint(1, 6)
     return die1, die2
 
-def play_bongo():
-    """Основная функция, управляющая ходом игры."""
-    player_scores = {"Игрок 1": 0, "Игрок 2": 0}
-    player_names = list(player_scores.keys())
-    current_player_index = 0
-    target_score = 100
+def console_player(game):
+    """Ход человека: бросок по Enter, Ctrl+D прерывает партию."""
+    try:
+        input(f"{game.names[game.current]}, нажмите Enter, чтобы бросить кубики...")
+    except EOFError:
+        return RESIGN
+    return ROLL
 
-    while True:
-        current_player_name = player_names[current_player_index]
+def play_bongo(strategies=None, delay=1.0):
+    """Консольная партия: правила в bongo_engine, здесь только вывод и паузы."""
+    game = BongoGame()
+    if strategies is None:
+        strategies = [console_player] * len(game.names)
+
+    while not game.finished:
+        current_player_name = game.names[game.current]
 
         print(f"\n--- Ход {current_player_name} ---")
-        print(f"Текущие очки: Игрок 1: {player_scores['Игрок 1']}, Игрок 2: {player_scores['Игрок 2']}")
+        scores = ", ".join(f"{name}: {score}" for name, score in zip(game.names, game.scores))
+        print(f"Текущие очки: {scores}")
 
-        input(f"{current_player_name}, нажмите Enter, чтобы бросить кубики...")
+        if strategies[game.current](game) == RESIGN:
+            game.resign()
+            print("\nИгра прервана.")
+            break
 
-        die1, die2 = roll_dice()
+        result = game.roll(roll_dice())
+        die1, die2 = result.dice
         print(f"Вы бросили: [{die1}] и [{die2}]")
-        time.sleep(1) # Небольшая задержка для лучшего восприятия
+        time.sleep(delay) # Небольшая задержка для лучшего восприятия
 
-        if die1 == 3 and die2 == 3:
+        if result.kind == BONGO:
             print("\n!!! БОНГО !!!")
             print(f"Упс! {current_player_name}, ваши очки сгорают!")
-            player_scores[current_player_name] = 0
-            time.sleep(1.5)
-        elif die1 == die2:
-            score_gained = (die1 + die2) * 2
-            player_scores[current_player_name] += score_gained
-            print(f"Дубль! Вы получаете {score_gained} очков (удвоенная сумма).")
+            time.sleep(delay * 1.5)
+        elif result.kind == DOUBLE:
+            print(f"Дубль! Вы получаете {result.gained} очков (удвоенная сумма).")
         else:
-            score_gained = die1 + die2
-            player_scores[current_player_name] += score_gained
-            print(f"Вы получаете {score_gained} очков.")
+            print(f"Вы получаете {result.gained} очков.")
 
-        print(f"Новые очки {current_player_name}: {player_scores[current_player_name]}")
+        print(f"Новые очки {current_player_name}: {result.score}")
 
         # Проверка на победу
-        if player_scores[current_player_name] >= target_score:
+        if result.won:
             print(f"\nⒷⒷⒷⒷⒷⒷⒷⒷⒷⒷⒷⒷⒷⒷⒷⒷⒷⒷⒷ")
-            print(f"ПОБЕДА! {current_player_name} набрал {player_scores[current_player_name]} очков и выигрывает игру!")
+            print(f"ПОБЕДА! {current_player_name} набрал {result.score} очков и выигрывает игру!")
             print(f"ⒷⒷⒷⒷⒷⒷⒷⒷⒷⒷⒷⒷⒷⒷⒷⒷⒷⒷⒷ")
-            break # Завершаем игру
+    return game
 
-        # Передача хода другому игроку
-        current_player_index = (current_player_index + 1) % len(player_names)
+def run_simulation(games, seed=None, target=100):
+    """Партии ботов без ввода и пауз: доля побед и средняя длина."""
+    rules = Rules(target=target)
+    start = time.perf_counter()
+    wins, turns = simulate(games, rules=rules, seed=seed)
+    elapsed = time.perf_counter() - start
+    for index, count in enumerate(wins):
+        print(f"Игрок {index + 1}: {count} побед ({count / games:.2%})")
+    print(f"Ходов за партию: {turns / games:.1f}")
+    print(f"{games} партий за {elapsed:.2f} с ({games / elapsed:,.0f} партий/с)")
 
-def main():
+def main(argv=None):
     """Основная функция для запуска игры."""
-    display_welcome()
+    parser = argparse.ArgumentParser(description="Игра Бонго")
+    parser.add_argument("--simulate", type=int, metavar="N",
+                        help="сыграть N партий ботов без ввода и вывести статистику")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--target", type=int, default=100)
+    args = parser.parse_args(argv)
+    if args.simulate:
+        run_simulation(args.simulate, args.seed, args.target)
+        return
+
+    if not display_welcome():
+        print("Спасибо за игру в Бонго! До свидания!")
+        return
     play_bongo()
-    
-    # Предложить сыграть еще раз
+
+    # Предложить сыграть еще раз; Ctrl+D - то же, что "нет"
     while True:
-        play_again = input("\nХотите сыграть еще раз? (да/нет): ").lower().strip()
+        try:
+            play_again = input("\nХотите сыграть еще раз? (да/нет): ").lower().strip()
+        except EOFError:
+            print()
+            play_again = 'нет'
         if play_again == 'да':
             print("\n--- НАЧИНАЕМ НОВУЮ ИГРУ ---")
             play_bongo()
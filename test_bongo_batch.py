@@ -0,0 +1,48 @@
+import unittest
+from unittest import mock
+
+import numpy as np
+
+import bongo_batch
+import bongo_engine
+import bongo_solver
+from bongo_engine import Rules
+
+
+class TestBongoBatch(unittest.TestCase):
+    def test_roll_table_matches_engine(self):
+        rules = Rules(wipe_face=5, double_multiplier=3)
+        keep, gained = bongo_batch.roll_table(rules)
+        for code in range(36):
+            die1, die2 = code // 6 + 1, code % 6 + 1
+            self.assertEqual(keep[code] * 40 + gained[code],
+                             bongo_engine.next_score(rules, 40, die1, die2))
+
+    def test_matches_solver(self):
+        games = 200_000
+        stats = bongo_batch.BongoBatch(seed=1).play(games)
+        solution = bongo_solver.solve()
+        self.assertEqual(stats.games, games)
+        self.assertAlmostEqual(stats.win_rates()[0], solution.win[0, 0], delta=0.005)
+        self.assertAlmostEqual(stats.mean_length(), solution.turns[0, 0], delta=0.2)
+
+    def test_players(self):
+        stats = bongo_batch.BongoBatch(players=3, seed=2).play(30_000)
+        self.assertEqual(stats.wins.sum(), 30_000)
+        self.assertTrue(np.all(np.diff(stats.wins) < 0))
+
+    def test_unfinished(self):
+        # за 5 ходов до 100 не дойти: максимум 3 броска по 24 очка
+        stats = bongo_batch.BongoBatch(max_turns=5, seed=3).play(1000)
+        self.assertEqual((stats.unfinished, stats.wins.sum()), (1000, 0))
+
+    def test_shards_independent_of_workers(self):
+        with mock.patch.object(bongo_batch, 'SHARD', 20_000):
+            serial = bongo_batch.run(60_000, seed=4, workers=1)
+            parallel = bongo_batch.run(60_000, seed=4, workers=2)
+        self.assertEqual(serial.wins.tolist(), parallel.wins.tolist())
+        self.assertEqual(serial.lengths.tolist(), parallel.lengths.tolist())
+
+
+if __name__ == '__main__':
+    unittest.main()
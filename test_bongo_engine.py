@@ -0,0 +1,62 @@
+import unittest
+
+import bongo_engine
+from bongo_engine import BONGO, DOUBLE, NORMAL, RESIGN, ROLL, BongoGame, Rules
+
+
+class TestRules(unittest.TestCase):
+    def test_outcomes(self):
+        rules = bongo_engine.BONGO_RULES
+        self.assertEqual(bongo_engine.roll_outcome(rules, 2, 5), (NORMAL, 7))
+        self.assertEqual(bongo_engine.roll_outcome(rules, 4, 4), (DOUBLE, 16))
+        self.assertEqual(bongo_engine.roll_outcome(rules, 3, 3), (BONGO, 0))
+        self.assertEqual(bongo_engine.next_score(rules, 50, 3, 3), 0)
+        self.assertEqual(bongo_engine.next_score(Rules(wipe_face=None), 50, 3, 3), 62)
+
+
+class TestGame(unittest.TestCase):
+    def test_turns_alternate(self):
+        game = BongoGame()
+        self.assertEqual(game.roll((1, 2)), (0, (1, 2), NORMAL, 3, 3, False))
+        self.assertEqual(game.current, 1)
+        game.roll((6, 6))
+        self.assertEqual(game.scores, [3, 24])
+        game.roll((3, 3))
+        self.assertEqual(game.scores, [0, 24])
+        self.assertEqual(game.turns, 3)
+
+    def test_win_stops_game(self):
+        game = BongoGame(Rules(target=10))
+        result = game.roll((5, 5))
+        self.assertTrue(result.won)
+        self.assertEqual(game.winner, 0)
+        with self.assertRaises(ValueError):
+            game.roll()
+
+    def test_play_is_deterministic(self):
+        strategies = [bongo_engine.always_roll] * 3
+        first = bongo_engine.play(strategies, seed=5)
+        second = bongo_engine.play(strategies, seed=5)
+        self.assertEqual((first.scores, first.turns), (second.scores, second.turns))
+        self.assertGreaterEqual(first.scores[first.winner], 100)
+
+    def test_resign(self):
+        game = bongo_engine.play([bongo_engine.always_roll, lambda game: RESIGN], seed=1)
+        self.assertTrue(game.finished)
+        self.assertIsNone(game.winner)
+        self.assertEqual(game.turns, 1)
+
+    def test_simulate(self):
+        wins, turns = bongo_engine.simulate(2000, seed=1)
+        self.assertEqual(sum(wins), 2000)
+        # первый игрок ходит раньше и выигрывает чаще
+        self.assertGreater(wins[0], wins[1])
+        self.assertGreater(turns / 2000, 10)
+
+    def test_unknown_action(self):
+        with self.assertRaises(ValueError):
+            bongo_engine.play([lambda game: 'skip', lambda game: ROLL])
+
+
+if __name__ == '__main__':
+    unittest.main()
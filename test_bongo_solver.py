@@ -0,0 +1,57 @@
+import unittest
+
+import bongo_engine
+import bongo_solver
+from bongo_engine import Rules
+
+
+def iterate(rules, sweeps=2000):
+    """Вероятности победы простым итерированием по правилам движка"""
+    target = rules.target
+    win = [[0.5] * target for _ in range(target)]
+    dice = [(d1, d2) for d1 in range(1, 7) for d2 in range(1, 7)]
+    for _ in range(sweeps):
+        for a in range(target):
+            for b in range(target):
+                total = 0.0
+                for d1, d2 in dice:
+                    score = bongo_engine.next_score(rules, a, d1, d2)
+                    total += 1.0 if score >= target else 1.0 - win[b][score]
+                win[a][b] = total / 36
+    return win
+
+
+class TestSolver(unittest.TestCase):
+    def test_outcomes(self):
+        moves = bongo_solver.outcomes()
+        self.assertAlmostEqual(sum(p for p, _, _ in moves), 1.0)
+        self.assertEqual([p * 36 for p, _, wipe in moves if wipe], [1.0])
+
+    def test_target_one(self):
+        # выигрывает любой бросок, кроме БОНГО: V = 35/36 + 1/36 * (1 - V)
+        solution = bongo_solver.solve(Rules(target=1))
+        self.assertAlmostEqual(solution.win[0, 0], 36 / 37)
+        self.assertAlmostEqual(solution.turns[0, 0], 36 / 35)
+
+    def test_matches_iteration(self):
+        rules = Rules(target=15)
+        expected = iterate(rules, sweeps=200)
+        solution = bongo_solver.solve(rules)
+        for a in range(15):
+            for b in range(15):
+                self.assertAlmostEqual(solution.win[a, b], expected[a][b], places=9)
+
+    def test_matches_simulation(self):
+        solution = bongo_solver.solve()
+        games = 20000
+        wins, turns = bongo_engine.simulate(games, seed=3)
+        self.assertAlmostEqual(wins[0] / games, solution.win[0, 0], delta=0.015)
+        self.assertAlmostEqual(turns / games, solution.turns[0, 0], delta=0.5)
+
+    def test_without_bongo(self):
+        solution = bongo_solver.solve(Rules(wipe_face=None))
+        self.assertGreater(solution.win[0, 0], bongo_solver.solve().win[0, 0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+import unittest
+
+import game_loop
+import pong_engine
+
+
+class TestFixedStepLoop(unittest.TestCase):
+    def make_loop(self, **kwargs):
+        self.now = 0.0
+        state = pong_engine.new_state(pong_engine.SPEEDUP_RULES)
+        loop = game_loop.FixedStepLoop(state, pong_engine.step, hz=100,
+                                       clock=lambda: self.now, **kwargs)
+        loop.start()
+        return loop
+
+    def test_steps_follow_time_not_frames(self):
+        loop = self.make_loop()
+        for _ in range(100):
+            self.now += 0.0025
+            loop.advance()
+        self.assertEqual(loop.stats.steps, 25)
+        self.assertEqual(loop.stats.empty_frames, 75)
+
+    def test_catchup_is_capped(self):
+        loop = self.make_loop(max_catchup=5)
+        self.now += 1.0
+        self.assertEqual(loop.advance(), 5)
+        self.assertEqual(loop.stats.dropped_steps, 95)
+        self.assertEqual(loop.stats.merged_frames, 1)
+
+    def test_interpolation(self):
+        loop = self.make_loop()
+        self.now += 0.015
+        loop.advance()
+        ball_x = loop.render_positions()[0]
+        self.assertAlmostEqual(ball_x, 402.5)
+
+    def test_score_events(self):
+        loop = self.make_loop()
+        loop.state.ball_x = 2
+        loop.state.ball_y = 10
+        loop.state.ball_dx = -5
+        self.now += 0.015
+        loop.advance()
+        self.assertEqual(loop.pop_events(), [2])
+        self.now += 0.01
+        loop.advance()
+        self.assertEqual(loop.pop_events(), [])
+
+    def test_stop(self):
+        loop = self.make_loop()
+        loop.stop()
+        self.now += 0.5
+        self.assertEqual(loop.advance(), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
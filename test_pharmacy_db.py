@@ -0,0 +1,202 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+from datetime import date
+
+import pharmacy_db
+from pharmacy_db import Pharmacy
+
+
+TODAY = date(2026, 1, 10)
+
+
+class TestPharmacy(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        Pharmacy.configure(os.path.join(self.tmp.name, 'pharmacy.db'))
+        Pharmacy.init_db()
+        conn = Pharmacy.get_connection()
+        with conn:
+            conn.executemany('''
+                INSERT INTO medicines (id, name, category, price, quantity, expiry_date, reorder_level)
+                VALUES (?, ?, ?, 100, ?, ?, ?)
+            ''', [(1, 'Аспирин', 'A', 5, '2026-01-15', 10),
+                  (2, 'Бромгексин', 'B', 50, '2026-03-01', 10),
+                  (3, 'Валидол', 'A', 2, '2025-12-31', 5),
+                  (4, 'Глицин', 'A', 30, '2026-02-09', 40)])
+            conn.executemany('''
+                INSERT INTO sales (medicine_id, quantity, sale_price, sale_date)
+                VALUES (?, ?, ?, ?)
+            ''', [(1, 2, 10.0, '2025-12-31 23:59:59'), (1, 1, 10.0, '2026-01-01 00:00:00'),
+                  (1, 3, 12.0, '2026-01-09 12:00:00'), (2, 1, 100.0, '2026-01-05 10:00:00')])
+            conn.executemany('''
+                INSERT INTO supplier_orders (supplier_id, medicine_id, quantity, expected_delivery, status)
+                VALUES (1, ?, ?, ?, ?)
+            ''', [(1, 20, '2026-01-12', 'ordered'), (1, 5, '2026-01-01', 'delivered'),
+                  (4, 10, '2026-01-09', 'ordered')])
+
+    def tearDown(self):
+        Pharmacy.close()
+        self.tmp.cleanup()
+
+    def plan(self, sql, params):
+        conn = Pharmacy.get_connection()
+        return ' '.join(row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + sql, params))
+
+    def test_expiring_within(self):
+        rows = Pharmacy.expiring_within(30, TODAY)
+        self.assertEqual([row[0] for row in rows], [1, 4])
+        plan = self.plan(pharmacy_db.EXPIRING_SQL, ('2026-01-10', '2026-02-09'))
+        self.assertIn('idx_medicines_expiry', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+
+    def test_below_reorder_level(self):
+        self.assertEqual(Pharmacy.below_reorder_level(),
+                         [(1, 'Аспирин', 'A', 5, 10, 20), (3, 'Валидол', 'A', 2, 5, 0),
+                          (4, 'Глицин', 'A', 30, 40, 10)])
+        self.assertEqual([row[0] for row in Pharmacy.below_reorder_level('B')], [])
+        plan = self.plan(pharmacy_db.LOW_STOCK_SQL.format(category='AND m.category = ?'),
+                         ('ordered', 'A'))
+        self.assertIn('SEARCH m USING INDEX idx_medicines_low_stock (category=?)', plan)
+        self.assertIn('idx_supplier_orders_status_delivery', plan)
+        # без категории обходится только частичный индекс, не весь каталог
+        plan = self.plan(pharmacy_db.LOW_STOCK_SQL.format(category=''), ('ordered',))
+        self.assertIn('SCAN m USING INDEX idx_medicines_low_stock', plan)
+        self.assertNotIn('TEMP B-TREE FOR ORDER BY', plan)
+        # индекс следует за изменением остатка
+        conn = Pharmacy.get_connection()
+        with conn:
+            conn.execute("UPDATE medicines SET quantity = 100 WHERE id = 3")
+            conn.execute("UPDATE medicines SET quantity = 1 WHERE id = 2")
+        self.assertEqual([row[0] for row in Pharmacy.below_reorder_level()], [1, 4, 2])
+
+    def test_sales_by_period(self):
+        rows = Pharmacy.sales_by_period(date(2026, 1, 1), TODAY)
+        self.assertEqual(rows, [(2, 'Бромгексин', 1, 1, 100.0), (1, 'Аспирин', 2, 4, 46.0)])
+        self.assertEqual(len(Pharmacy.medicine_sales(1, '2025-12-01', '2026-01-01')), 1)
+        plan = self.plan(pharmacy_db.SALES_BY_PERIOD_SQL, ('2026-01-01', '2026-02-01'))
+        self.assertIn('COVERING INDEX idx_sales_medicine_date', plan)
+
+    def test_pending_deliveries(self):
+        self.assertEqual([row[0] for row in Pharmacy.pending_deliveries(TODAY)], [3])
+        plan = self.plan(pharmacy_db.PENDING_DELIVERIES_SQL, ('ordered', '2026-01-10'))
+        self.assertIn('idx_supplier_orders_status_delivery', plan)
+
+    def test_migrates_shipped_database(self):
+        # исходный pharmacy.db: таблицы без индексов и без reorder_level
+        path = os.path.join(self.tmp.name, 'shipped.db')
+        conn = sqlite3.connect(path)
+        conn.executescript('''
+            CREATE TABLE medicines (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL,
+                manufacturer TEXT, category TEXT, price REAL NOT NULL, quantity INTEGER NOT NULL,
+                prescription_required BOOLEAN DEFAULT FALSE, production_date DATE,
+                expiry_date DATE, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP);
+            INSERT INTO medicines (name, price, quantity) VALUES ('Аспирин', 10, 3);
+        ''')
+        conn.close()
+        Pharmacy.configure(path)
+        Pharmacy.init_db()
+        self.assertEqual(Pharmacy.below_reorder_level()[0][3:5], (3, pharmacy_db.DEFAULT_REORDER_LEVEL))
+        conn = Pharmacy.get_connection()
+        self.assertEqual(conn.execute("PRAGMA user_version").fetchone()[0], len(pharmacy_db.MIGRATIONS))
+        indexes = {row[0] for row in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index' AND name LIKE 'idx_%'")}
+        self.assertEqual(len(indexes), 5)
+        self.assertEqual([row[0] for row in Pharmacy.search_medicines('аспирин')], [1])
+
+
+class TestMedicineSearch(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        Pharmacy.configure(os.path.join(self.tmp.name, 'pharmacy.db'))
+        Pharmacy.init_db()
+        conn = Pharmacy.get_connection()
+        with conn:
+            conn.executemany('''
+                INSERT INTO medicines (id, name, manufacturer, category, price, quantity)
+                VALUES (?, ?, ?, ?, 100, 10)
+            ''', [(1, 'Аспирин таблетки 500 мг', 'Фармстандарт', 'Обезболивающие'),
+                  (2, 'Аспаркам таблетки', 'Фармак', 'Сердечные'),
+                  (3, 'Бромгексин сироп', 'Берлин-Хеми', 'Отхаркивающие'),
+                  (4, 'Ибупрофен капсулы 200 мг', 'Аспирин-фарм', 'Обезболивающие'),
+                  (5, 'Валидол', 'Фармстандарт', 'Сердечные')])
+
+    def tearDown(self):
+        Pharmacy.close()
+        self.tmp.cleanup()
+
+    def ids(self, query):
+        return [row[0] for row in Pharmacy.search_medicines(query)]
+
+    def test_prefix_words(self):
+        self.assertEqual(sorted(self.ids('асп')), [1, 2, 4])
+        self.assertEqual(self.ids('асп табл 500'), [1])
+        self.assertEqual(sorted(self.ids('ФАРМСТ')), [1, 5])
+        self.assertEqual(self.ids('  '), [])
+
+    def test_name_ranked_above_manufacturer(self):
+        self.assertEqual(self.ids('аспирин'), [1, 4])
+
+    def test_late_name_match_ranked_first(self):
+        conn = Pharmacy.get_connection()
+        with conn:
+            conn.executemany("INSERT INTO medicines (name, category, price, quantity) "
+                             "VALUES (?, 'Аспирин', 10, 1)",
+                             ((f"Товар{i}",) for i in range(1500)))
+            late = conn.execute("INSERT INTO medicines (name, price, quantity) "
+                                "VALUES ('Аспирин', 10, 1)").lastrowid
+        self.assertEqual(self.ids('аспирин')[0], late)
+        self.assertEqual(Pharmacy.search_medicines('аспирин', 3)[0][0], late)
+        self.assertEqual(Pharmacy.search_medicines('аспирн', 3)[0][0], late)
+
+    def test_typos(self):
+        self.assertEqual(self.ids('аспирн'), [1, 4])
+        self.assertEqual(self.ids('бромгксин сироп'), [3])
+        self.assertEqual(self.ids('валидл'), [5])
+        # короткие слова не исправляются
+        self.assertEqual(self.ids('вал'), [5])
+        self.assertEqual(self.ids('вла'), [])
+
+    def test_correct_term(self):
+        self.assertEqual(Pharmacy.correct_term('бромгексн'), ['бромгексин'])
+        self.assertEqual(Pharmacy.correct_term('фармстнадарт'), ['фармстандарт'])
+        self.assertEqual(Pharmacy.correct_term('ксилол'), [])
+
+    def test_prefix_distance(self):
+        self.assertEqual(pharmacy_db.prefix_distance('асприн', 'аспирин', 1), 1)
+        self.assertEqual(pharmacy_db.prefix_distance('аспир', 'аспирин', 1), 0)
+        self.assertEqual(pharmacy_db.prefix_distance('апсрин', 'аспирин', 1), 2)
+
+    def test_triggers_keep_index_in_sync(self):
+        conn = Pharmacy.get_connection()
+        with conn:
+            conn.execute("INSERT INTO medicines (id, name, price, quantity) "
+                         "VALUES (6, 'Глицин', 50, 3)")
+            conn.execute("UPDATE medicines SET name = 'Ношпа' WHERE id = 5")
+            conn.execute("DELETE FROM medicines WHERE id = 3")
+        self.assertEqual(self.ids('глицин'), [6])
+        self.assertEqual(self.ids('ношпа'), [5])
+        self.assertEqual(self.ids('валидол'), [])
+        self.assertEqual(self.ids('бромгексин'), [])
+        conn.execute("INSERT INTO medicines_fts (medicines_fts) VALUES ('integrity-check')")
+
+    def test_stock_update_keeps_index(self):
+        conn = Pharmacy.get_connection()
+        version = conn.execute('SELECT version FROM catalog_version').fetchone()[0]
+        with conn:
+            conn.execute("UPDATE medicines SET quantity = 0, price = 90 WHERE id = 1")
+        self.assertEqual(conn.execute('SELECT version FROM catalog_version').fetchone()[0], version)
+        self.assertEqual(Pharmacy.search_medicines('аспирин т')[0][4:], (0, 90))
+
+    def test_vocabulary_follows_catalog(self):
+        self.assertEqual(Pharmacy.correct_term('глицен'), [])
+        conn = Pharmacy.get_connection()
+        with conn:
+            conn.execute("INSERT INTO medicines (id, name, price, quantity) "
+                         "VALUES (6, 'Глицин', 50, 3)")
+        self.assertEqual(Pharmacy.correct_term('глицен'), ['глицин'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import unittest
+
+import pong_ai
+import pong_engine
+from pong_ai import CpuPlayer
+
+
+class TestPredict(unittest.TestCase):
+    rules = pong_engine.SPEEDUP_RULES
+
+    def test_straight_and_away(self):
+        self.assertEqual(pong_ai.predict_y(self.rules, 400, 100, 5, 0, 755), 100)
+        self.assertIsNone(pong_ai.predict_y(self.rules, 400, 100, -5, 3, 755))
+        self.assertIsNone(pong_ai.predict_y(self.rules, 400, 100, 0, 3, 755))
+
+    def test_wall_bounces(self):
+        # 71 тик: y = 100 - 355 -> отражение от верхней стены -> 255
+        self.assertAlmostEqual(pong_ai.predict_y(self.rules, 400, 100, 5, -5, 755), 255)
+        # две стены: 100 + 71 * 15 = 1165 -> 1165 - 970 = 195
+        self.assertAlmostEqual(pong_ai.predict_y(self.rules, 400, 100, 5, 15, 755), 195)
+
+    def test_matches_engine(self):
+        rules = self.rules
+        state = pong_engine.new_state(rules)
+        state.paddle1_y = state.paddle2_y = -1000   # ракетки не мешают
+        state.ball_x, state.ball_y, state.ball_dx, state.ball_dy = 100, 200, 7, 23
+        cpu = CpuPlayer(rules)
+        expected = pong_ai.predict_y(rules, 100, 200, 7, 23, cpu.plane_x)
+        while state.ball_x + state.ball_dx < cpu.plane_x:
+            pong_engine.step(state)
+        t = (cpu.plane_x - state.ball_x) / state.ball_dx
+        y = state.ball_y + state.ball_dy * t
+        self.assertAlmostEqual(y, expected)
+
+
+class TestCpuPlayer(unittest.TestCase):
+    def play(self, rules, cpu1, cpu2, ticks):
+        state = pong_engine.new_state(rules, seed=1)
+        for _ in range(ticks):
+            pong_engine.step(state, (cpu1.decide(state), cpu2.decide(state)))
+        return state
+
+    def test_perfect_players_never_miss(self):
+        rules = pong_engine.Rules(win_score=0)
+        perfect = dict(reaction=0, error=0, period=1)
+        state = self.play(rules, CpuPlayer(rules, 1, **perfect),
+                          CpuPlayer(rules, 2, **perfect), 5000)
+        self.assertEqual((state.score1, state.score2), (0, 0))
+
+    def test_easy_loses_to_hard(self):
+        rules = pong_engine.Rules(win_score=0)
+        state = self.play(rules, CpuPlayer.level(rules, 'hard', 1, seed=1),
+                          CpuPlayer.level(rules, 'easy', 2, seed=2), 20000)
+        self.assertGreater(state.score1, state.score2)
+
+    def test_reaction_delay(self):
+        rules = pong_engine.SPEEDUP_RULES
+        cpu = CpuPlayer(rules, reaction=3, error=0, period=1)
+        state = pong_engine.new_state(rules)
+        state.ball_dx = -5   # мяч уходит - цель в центре
+        cpu.decide(state)
+        state.ball_dx, state.ball_y = 5, 0
+        state.ball_dy = 0
+        for _ in range(3):
+            cpu.decide(state)
+            self.assertFalse(cpu.approaching)
+        cpu.decide(state)
+        self.assertTrue(cpu.approaching)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,125 @@
+import os
+import tempfile
+import unittest
+
+import pong_auth
+from pong_auth import CredentialCache, HashingService, KdfParams
+from pong_db import Database
+
+
+FAST = KdfParams(n=2 ** 8, r=8, p=1)
+
+
+class TestPasswordHash(unittest.TestCase):
+    def test_salted_and_verifiable(self):
+        first = pong_auth.hash_password('secret', FAST)
+        second = pong_auth.hash_password('secret', FAST)
+        self.assertNotEqual(first, second)
+        self.assertEqual(pong_auth.verify_password('secret', first, FAST), (True, False))
+        self.assertEqual(pong_auth.verify_password('wrong', first, FAST), (False, False))
+
+    def test_outdated_cost_needs_rehash(self):
+        stored = pong_auth.hash_password('secret', KdfParams(n=2 ** 9))
+        self.assertEqual(pong_auth.verify_password('secret', stored, FAST), (True, True))
+
+    def test_legacy_sha256(self):
+        stored = pong_auth.legacy_hash('secret')
+        self.assertEqual(pong_auth.verify_password('secret', stored, FAST), (True, True))
+        self.assertEqual(pong_auth.verify_password('wrong', stored, FAST), (False, False))
+
+    def test_calibrate(self):
+        params = pong_auth.calibrate(target=0.05, max_n=2 ** 14)
+        self.assertGreaterEqual(params.n, 2 ** 10)
+        self.assertLessEqual(params.n, 2 ** 14)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestCredentialCache(unittest.TestCase):
+    def test_hit_miss_and_ttl(self):
+        clock = FakeClock()
+        cache = CredentialCache(maxsize=4, ttl=10, clock=clock)
+        self.assertFalse(cache.check('anna', 'secret'))
+        cache.put('anna', 'secret')
+        self.assertTrue(cache.check('anna', 'secret'))
+        self.assertFalse(cache.check('anna', 'wrong'))
+        clock.now = 11
+        self.assertFalse(cache.check('anna', 'secret'))
+        self.assertEqual(cache.stats(), {'hits': 1, 'misses': 3, 'size': 0})
+
+    def test_lru_eviction(self):
+        cache = CredentialCache(maxsize=2)
+        cache.put('a', '1')
+        cache.put('b', '2')
+        cache.check('a', '1')
+        cache.put('c', '3')
+        self.assertTrue(cache.check('a', '1'))
+        self.assertFalse(cache.check('b', '2'))
+
+    def test_invalidate_drops_stale_put(self):
+        cache = CredentialCache()
+        cache.put('anna', 'secret')
+        generation = cache.generation('anna')
+        cache.invalidate('anna')
+        self.assertFalse(cache.check('anna', 'secret'))
+        cache.put('anna', 'secret', generation)
+        self.assertFalse(cache.check('anna', 'secret'))
+
+
+class TestHashingService(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        Database.configure(os.path.join(self.tmp.name, 'test.db'))
+        Database.init_db()
+        self.service = HashingService(FAST)
+
+    def tearDown(self):
+        self.service.shutdown()
+        Database.close()
+        self.tmp.cleanup()
+
+    def test_register_and_login(self):
+        self.assertTrue(self.service.register('anna', 'secret').result())
+        self.assertFalse(self.service.register('anna', 'other').result())
+        self.assertTrue(self.service.verify_login('anna', 'secret').result())
+        self.assertFalse(self.service.verify_login('anna', 'wrong').result())
+        self.assertFalse(self.service.verify_login('boris', 'secret').result())
+
+    def test_create_users(self):
+        accounts = [('anna', 'one'), ('boris', ''), ('vera', 'three')]
+        created, errors = self.service.create_users(accounts).result()
+        self.assertEqual(created, 2)
+        self.assertEqual([index for index, _, _ in errors], [1])
+        self.assertTrue(self.service.verify_login('vera', 'three').result())
+
+    def test_login_cache(self):
+        self.service.register('anna', 'secret').result()
+        self.assertTrue(self.service.verify_login('anna', 'secret').result())
+        future = self.service.verify_login('anna', 'secret')
+        self.assertTrue(future.done() and future.result())
+        self.assertEqual(self.service.cache.hits, 1)
+
+        self.assertTrue(self.service.change_password('anna', 'changed').result())
+        self.assertFalse(self.service.verify_login('anna', 'secret').result())
+        self.assertTrue(self.service.verify_login('anna', 'changed').result())
+
+        self.assertTrue(self.service.delete_user('anna'))
+        self.assertFalse(self.service.verify_login('anna', 'changed').result())
+
+    def test_legacy_hash_migrated_on_login(self):
+        Database.create_user('anna', pong_auth.legacy_hash('secret'))
+        self.assertFalse(self.service.verify_login('anna', 'wrong').result())
+        self.assertFalse(Database.get_password_hash('anna').startswith('scrypt$'))
+        self.assertTrue(self.service.verify_login('anna', 'secret').result())
+        self.assertTrue(Database.get_password_hash('anna').startswith('scrypt$'))
+        self.assertTrue(self.service.verify_login('anna', 'secret').result())
+
+
+if __name__ == '__main__':
+    unittest.main()
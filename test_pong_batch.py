@@ -0,0 +1,61 @@
+import unittest
+
+import numpy as np
+
+import pong_batch
+import pong_engine
+
+
+class TestBatchSimulator(unittest.TestCase):
+    def test_matches_scalar_engine(self):
+        for continuous in (True, False):
+            with self.subTest(continuous=continuous):
+                rules = pong_engine.Rules(pong_engine.SPEEDUP, continuous=continuous)
+                self.check_parity(rules)
+
+    def check_parity(self, rules):
+        sim = pong_batch.BatchSimulator(4, rules)
+        sim.ball_dy[1] = -5
+        sim.ball_x[2] = 100
+        sim.ball_dy[3] = 30000
+        states = [sim.game(i) for i in range(4)]
+        moves1 = np.array([0, -1, 1, 0])
+        moves2 = np.array([1, 0, -1, 0])
+        for tick in range(3000):
+            m1 = moves1 if tick % 7 == 0 else None
+            m2 = moves2 if tick % 5 == 0 else None
+            sim.step(m1, m2)
+            for i, state in enumerate(states):
+                inputs = (int(moves1[i]) if m1 is not None else 0,
+                          int(moves2[i]) if m2 is not None else 0)
+                pong_engine.step(state, inputs)
+        for i, state in enumerate(states):
+            game = sim.game(i)
+            self.assertEqual((game.ball_x, game.ball_y, game.score1, game.score2),
+                             (state.ball_x, state.ball_y, state.score1, state.score2))
+
+    def test_swept_classic_stays_in_field(self):
+        rules = pong_engine.CLASSIC_RULES
+        sim = pong_batch.BatchSimulator(500, rules, seed=5)
+        sim.ball_dy[:] = sim.rng.uniform(-400, 400, 500)
+        for _ in range(500):
+            sim.step()
+            self.assertTrue((sim.ball_y >= 0).all())
+            self.assertTrue((sim.ball_y <= rules.height - rules.ball_size).all())
+
+    def test_finished_and_reset(self):
+        sim = pong_batch.BatchSimulator(4, pong_engine.CLASSIC_RULES, seed=3)
+        sim.run(2000)
+        self.assertFalse(sim.finished().any())
+        self.assertGreater(int(sim.score1.sum() + sim.score2.sum()), 0)
+
+        sim = pong_batch.BatchSimulator(2, pong_engine.SPEEDUP_RULES)
+        sim.score1[0] = 10
+        done = sim.finished()
+        self.assertEqual(done.tolist(), [True, False])
+        sim.reset_matches(done)
+        self.assertEqual(sim.score1.tolist(), [0, 0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,194 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+import pong_db
+from pong_db import Database, ResultWriter
+
+
+class TestDatabase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        Database.configure(os.path.join(self.tmp.name, 'test.db'))
+        Database.init_db()
+
+    def tearDown(self):
+        Database.close()
+        self.tmp.cleanup()
+
+    def test_wal_and_persistent_connection(self):
+        conn = Database.get_connection()
+        self.assertIs(conn, Database.get_connection())
+        mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+        self.assertEqual(mode, 'wal')
+
+    def test_migrations(self):
+        conn = Database.get_connection()
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        self.assertEqual(version, len(pong_db.MIGRATIONS))
+        Database.init_db()   # повторный запуск ничего не ломает
+
+    def test_user_games_uses_index(self):
+        conn = Database.get_connection()
+        plan = ' '.join(row[3] for row in conn.execute(
+            "EXPLAIN QUERY PLAN " + pong_db.USER_GAMES_SQL, ('anna',)))
+        self.assertIn('idx_game_history_user_date_id', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+
+    def test_user_games_order(self):
+        Database.save_game_results([
+            ('anna', '2024-01-01 10:00:00', 10, 1, 'Игрок 1'),
+            ('anna', '2024-03-01 10:00:00', 10, 2, 'Игрок 1'),
+            ('boris', '2024-02-01 10:00:00', 3, 10, 'Игрок 2'),
+        ])
+        games = Database.get_user_games('anna')
+        self.assertEqual([g[0] for g in games],
+                         ['2024-03-01 10:00:00', '2024-01-01 10:00:00'])
+
+    def test_user_games_pages(self):
+        rows = [('anna', f'2024-01-01 10:00:{i // 2:02d}', 10, i % 10, 'Игрок 1')
+                for i in range(25)]
+        Database.save_game_results(rows)
+        seen = []
+        after = None
+        while True:
+            page = Database.get_user_games_page('anna', after, limit=10)
+            if not page:
+                break
+            seen.extend(page)
+            after = (page[-1][1], page[-1][0])
+        self.assertEqual(len(seen), 25)
+        self.assertEqual(len({row[0] for row in seen}), 25)
+        keys = [(row[1], row[0]) for row in seen]
+        self.assertEqual(keys, sorted(keys, reverse=True))
+
+        conn = Database.get_connection()
+        plan = ' '.join(row[3] for row in conn.execute(
+            "EXPLAIN QUERY PLAN " + pong_db.USER_GAMES_PAGE_SQL, ('anna', 'x', 1, 10)))
+        self.assertNotIn('TEMP B-TREE', plan)
+
+    def test_users(self):
+        self.assertTrue(Database.create_user('anna', 'h'))
+        self.assertFalse(Database.create_user('anna', 'h'))
+        self.assertTrue(Database.user_exists('anna'))
+        self.assertEqual(Database.get_password_hash('anna'), 'h')
+        self.assertIsNone(Database.get_password_hash('boris'))
+        self.assertTrue(Database.update_password_hash('anna', 'h', 'h2'))
+        self.assertFalse(Database.update_password_hash('anna', 'h', 'h3'))
+        self.assertEqual(Database.get_password_hash('anna'), 'h2')
+
+    def test_create_users_bulk(self):
+        Database.create_user('anna', 'h')
+        accounts = [('boris', 'h1'), ('anna', 'h2'), ('', 'h3'), ('vera', 'h4'), ('vera', 'h5')]
+        created, errors = Database.create_users(accounts)
+        self.assertEqual(created, 2)
+        self.assertEqual([(index, name) for index, name, _ in errors],
+                         [(1, 'anna'), (2, ''), (4, 'vera')])
+        self.assertEqual(Database.get_password_hash('anna'), 'h')
+        self.assertEqual(Database.get_password_hash('vera'), 'h4')
+
+    def test_user_stats_incremental(self):
+        Database.save_game_results([
+            ('anna', '2024-01-01 10:00:00', 10, 4, 'Игрок 1'),
+            ('anna', '2024-01-02 10:00:00', 10, 5, 'Игрок 1'),
+            ('anna', '2024-01-03 10:00:00', 10, 6, 'Игрок 1'),
+            ('anna', '2024-01-04 10:00:00', 2, 10, 'Игрок 2'),
+        ])
+        Database.save_game_result('anna', 10, 0, 'Игрок 1')
+        stats = Database.get_user_stats('anna')
+        self.assertEqual(stats['games'], 5)
+        self.assertEqual((stats['wins'], stats['losses']), (4, 1))
+        self.assertEqual((stats['points_for'], stats['points_against']), (42, 25))
+        self.assertEqual((stats['current_streak'], stats['best_streak']), (1, 3))
+        self.assertIsNone(Database.get_user_stats('boris'))
+
+    def test_user_stats_rebuild_matches(self):
+        rows = [('anna' if i % 3 else 'boris', f'2024-01-01 10:{i // 60:02d}:{i % 60:02d}',
+                 10 if i % 4 else i % 10, i % 10 if i % 4 else 10,
+                 'Игрок 1' if i % 4 else 'Игрок 2') for i in range(200)]
+        Database.save_game_results(rows[:120])
+        Database.save_game_results(rows[120:])
+        incremental = [Database.get_user_stats(name) for name in ('anna', 'boris')]
+        self.assertEqual(Database.rebuild_user_stats(), 2)
+        self.assertEqual([Database.get_user_stats(name) for name in ('anna', 'boris')],
+                         incremental)
+
+    def test_user_stats_backfilled_by_migration(self):
+        conn = Database.get_connection()
+        with conn:
+            conn.execute("DROP TABLE user_stats")
+            conn.execute("PRAGMA user_version = 3")
+            conn.execute('''
+                INSERT INTO game_history (username, game_date, player1_score, player2_score, winner)
+                VALUES ('anna', '2024-01-01 10:00:00', 10, 7, 'Игрок 1')
+            ''')
+        Database.init_db()
+        self.assertEqual(Database.get_user_stats('anna')['wins'], 1)
+
+    def test_replay_linked_to_game(self):
+        writer = ResultWriter()
+        writer.submit('anna', 10, 2, 'Игрок 1', replay=b'first')
+        writer.submit('anna', 3, 10, 'Игрок 2')
+        writer.submit('anna', 10, 4, 'Игрок 1', replay=b'third')
+        writer.close()
+        page = Database.get_user_games_page('anna')
+        replays = {row[3]: Database.get_replay(row[0]) for row in page}
+        self.assertEqual(replays, {2: b'first', 10: None, 4: b'third'})
+        self.assertEqual(Database.get_user_stats('anna')['games'], 3)
+
+    def test_results_from_other_thread(self):
+        thread = threading.Thread(
+            target=Database.save_game_result, args=('anna', 10, 3, 'Игрок 1'))
+        thread.start()
+        thread.join()
+        games = Database.get_user_games('anna')
+        self.assertEqual([g[1:] for g in games], [(10, 3, 'Игрок 1')])
+
+
+    def test_result_writer_batches(self):
+        writer = ResultWriter(batch_size=50, flush_interval=10)
+        for i in range(120):
+            self.assertTrue(writer.submit('anna', 10, i % 10, 'Игрок 1'))
+        writer.flush()
+        self.assertEqual(writer.written, 120)
+        self.assertEqual(writer.batches, 3)
+        writer.submit('anna', 3, 10, 'Игрок 2')
+        writer.close()
+        self.assertEqual(len(Database.get_user_games('anna')), 121)
+
+    def test_result_writer_time_threshold(self):
+        writer = ResultWriter(batch_size=1000, flush_interval=0.05)
+        writer.submit('anna', 10, 0, 'Игрок 1')
+        for _ in range(100):
+            if writer.written:
+                break
+            time.sleep(0.01)
+        self.assertEqual(writer.written, 1)
+        writer.close()
+
+    def test_result_writer_skips_bad_row(self):
+        writer = ResultWriter(batch_size=100, flush_interval=10)
+        writer.submit(None, 1, 2, 'Игрок 2', game_date='2026-01-01 00:00:00')
+        for i in range(5):
+            writer.submit('anna', 10, i, 'Игрок 1')
+        self.assertTrue(writer.flush(5))
+        self.assertEqual(writer.written, 5)
+        self.assertEqual(len(Database.get_user_games('anna')), 5)
+        self.assertEqual(Database.get_user_stats('anna')['games'], 5)
+        writer.submit('anna', 3, 10, 'Игрок 2')
+        failed = writer.close()
+        self.assertEqual(failed, [(None, '2026-01-01 00:00:00', 1, 2, 'Игрок 2', None)])
+        self.assertEqual((writer.written, writer.stats()['failed']), (6, 1))
+
+    def test_result_writer_back_pressure(self):
+        writer = ResultWriter(max_pending=2)
+        writer.close()   # писатель остановлен - очередь никто не разбирает
+        accepted = [writer.submit('anna', 10, 0, 'Игрок 1') for _ in range(4)]
+        self.assertEqual(accepted, [True, True, False, False])
+        self.assertEqual(writer.rejected, 2)
+        self.assertEqual(writer.pending(), 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,124 @@
+import unittest
+
+import pong_engine
+
+
+class TestPongEngine(unittest.TestCase):
+    def test_wall_bounce(self):
+        state = pong_engine.new_state(pong_engine.SPEEDUP_RULES)
+        state.ball_y = 2
+        state.ball_dy = -5
+        pong_engine.step(state)
+        self.assertEqual(state.ball_dy, 5)
+
+    def test_speedup_paddle_hit(self):
+        state = pong_engine.new_state(pong_engine.SPEEDUP_RULES)
+        state.ball_x = 30
+        state.ball_y = state.paddle1_y + 10
+        state.ball_dx = -5
+        state.ball_dy = 5
+        pong_engine.step(state)
+        self.assertEqual(state.ball_dx, 5)
+        self.assertEqual(state.ball_dy, 6)
+
+    def test_goal_and_reset(self):
+        state = pong_engine.new_state(pong_engine.SPEEDUP_RULES)
+        state.ball_x = 2
+        state.ball_y = 10
+        state.ball_dx = -5
+        state.ball_dy = 3
+        self.assertEqual(pong_engine.step(state), 2)
+        self.assertEqual(state.score2, 1)
+        self.assertEqual((state.ball_x, state.ball_y), (400, 250))
+        self.assertEqual((state.ball_dx, state.ball_dy), (5, 10))
+
+    def test_winner(self):
+        state = pong_engine.new_state(pong_engine.SPEEDUP_RULES)
+        state.score1 = 10
+        self.assertEqual(pong_engine.winner(state), 1)
+        pong_engine.reset_match(state)
+        self.assertEqual(pong_engine.winner(state), 0)
+
+    def test_classic_is_reproducible(self):
+        a = pong_engine.new_state(pong_engine.CLASSIC_RULES, seed=7)
+        b = pong_engine.new_state(pong_engine.CLASSIC_RULES, seed=7)
+        pong_engine.run(a, 5000)
+        pong_engine.run(b, 5000)
+        self.assertEqual((a.ball_x, a.ball_y, a.score1, a.score2),
+                         (b.ball_x, b.ball_y, b.score1, b.score2))
+
+    def test_move_paddle(self):
+        state = pong_engine.new_state(pong_engine.SPEEDUP_RULES)
+        pong_engine.step(state, (-1, 1))
+        self.assertEqual(state.paddle1_y, 200)
+        self.assertEqual(state.paddle2_y, 220)
+
+    def test_held_paddle_stops_at_walls(self):
+        rules = pong_engine.SPEEDUP_RULES
+        state = pong_engine.new_state(rules)
+        for _ in range(100):
+            pong_engine.step(state, (-1, 1))
+        self.assertEqual(state.paddle1_y, 0)
+        self.assertEqual(state.paddle2_y, rules.height - rules.paddle_height)
+
+
+    def test_fast_ball_does_not_tunnel(self):
+        for speed in (40, 300, 5000):
+            state = pong_engine.new_state(pong_engine.SPEEDUP_RULES)
+            state.ball_x = 400
+            state.ball_y = state.paddle1_y + 30
+            state.ball_dx = -speed
+            state.ball_dy = 0.0
+            scored = 0
+            while state.ball_dx < 0 and not scored:
+                scored = pong_engine.step(state)
+            self.assertNotEqual(scored, 2)
+
+    def test_swept_wall_bounce_is_exact(self):
+        state = pong_engine.new_state(pong_engine.SPEEDUP_RULES)
+        state.ball_x = 400
+        state.ball_y = 10
+        state.ball_dx = 0
+        state.ball_dy = -30
+        pong_engine.step(state)
+        self.assertAlmostEqual(state.ball_y, 20)
+        self.assertEqual(state.ball_dy, 30)
+
+    def test_leftover_time_after_max_bounces(self):
+        state = pong_engine.new_state(pong_engine.SPEEDUP_RULES)
+        state.ball_x = 400
+        state.ball_dx = 5
+        state.ball_dy = 30000
+        pong_engine.step(state)
+        self.assertAlmostEqual(state.ball_x, 405)
+        self.assertTrue(0 <= state.ball_y <= 500 - 15)
+
+    def test_speedup_swept_needs_top_edge_on_paddle(self):
+        state = pong_engine.new_state(pong_engine.SPEEDUP_RULES)
+        state.ball_x = 40
+        state.ball_y = state.paddle1_y - 10
+        state.ball_dx = -20
+        state.ball_dy = 0
+        self.assertEqual(pong_engine.step(state), 0)
+        self.assertLess(state.ball_dx, 0)
+
+        rules = pong_engine.Rules(pong_engine.CLASSIC, continuous=True)
+        state = pong_engine.new_state(rules)
+        state.ball_x = 40
+        state.ball_y = state.paddle1_y - 10
+        state.ball_dx = -20
+        state.ball_dy = 0
+        pong_engine.step(state)
+        self.assertGreater(state.ball_dx, 0)
+
+    def test_discrete_rules_tunnel(self):
+        rules = pong_engine.Rules(pong_engine.SPEEDUP, continuous=False)
+        state = pong_engine.new_state(rules)
+        state.ball_x = 400
+        state.ball_y = state.paddle1_y + 30
+        state.ball_dx = -500
+        self.assertEqual(pong_engine.step(state), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
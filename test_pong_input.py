@@ -0,0 +1,41 @@
+import unittest
+
+from pong_input import HeldKeys
+
+
+UP1, DOWN1, UP2, DOWN2, OTHER = range(5)
+
+
+class TestHeldKeys(unittest.TestCase):
+    def setUp(self):
+        self.keys = HeldKeys({UP1: (1, -1), DOWN1: (1, 1), UP2: (2, -1), DOWN2: (2, 1)})
+
+    def test_two_players_at_once(self):
+        self.keys.press(UP1)
+        self.keys.press(DOWN2)
+        self.assertEqual(self.keys.poll(), (-1, 1))
+        self.assertEqual(self.keys.poll(), (-1, 1))   # удержание действует каждый тик
+        self.keys.release(UP1)
+        self.assertEqual(self.keys.poll(), (0, 1))
+
+    def test_opposite_keys_cancel(self):
+        self.keys.press(UP1)
+        self.keys.press(DOWN1)
+        self.assertEqual(self.keys.poll(), (0, 0))
+
+    def test_tap_between_ticks_is_not_lost(self):
+        self.keys.press(DOWN1)
+        self.keys.release(DOWN1)
+        self.assertEqual(self.keys.poll(), (1, 0))
+        self.assertEqual(self.keys.poll(), (0, 0))
+
+    def test_unbound_and_clear(self):
+        self.assertFalse(self.keys.press(OTHER))
+        self.assertFalse(self.keys.release(OTHER))
+        self.keys.press(UP2)
+        self.keys.clear()
+        self.assertEqual(self.keys.poll(), (0, 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
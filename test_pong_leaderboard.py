@@ -0,0 +1,69 @@
+import os
+import tempfile
+import unittest
+
+import pong_leaderboard
+from pong_db import Database
+
+
+class TestLeaderboard(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        Database.configure(os.path.join(self.tmp.name, 'test.db'))
+        Database.init_db()
+        rows = []
+        # anna: 12 игр, 9 побед; boris: 20 игр, 10 побед; vera: 2 победы из 2
+        for name, games, wins in (('anna', 12, 9), ('boris', 20, 10), ('vera', 2, 2)):
+            for i in range(games):
+                won = i < wins
+                rows.append((name, f'2024-01-01 10:00:{i:02d}', 10 if won else 3,
+                             3 if won else 10, 'Игрок 1' if won else 'Игрок 2'))
+        Database.save_game_results(rows)
+
+    def tearDown(self):
+        Database.close()
+        self.tmp.cleanup()
+
+    def test_wins(self):
+        board = pong_leaderboard.top('wins')
+        self.assertEqual([(place, name, wins) for place, name, wins, _ in board],
+                         [(1, 'boris', 10), (2, 'anna', 9), (3, 'vera', 2)])
+        self.assertEqual(pong_leaderboard.rank('anna', 'wins'), 2)
+
+    def test_ties_share_place(self):
+        Database.save_game_results([('gleb', f'2024-01-02 10:00:{i:02d}', 10, 3, 'Игрок 1')
+                                    for i in range(9)])
+        board = pong_leaderboard.top('wins')
+        self.assertEqual([(place, name) for place, name, _, _ in board],
+                         [(1, 'boris'), (2, 'anna'), (2, 'gleb'), (4, 'vera')])
+        for place, name, _, _ in board:
+            self.assertEqual(pong_leaderboard.rank(name, 'wins'), place)
+
+    def test_win_ratio_needs_min_games(self):
+        board = pong_leaderboard.top('win_ratio')
+        self.assertEqual([name for _, name, _, _ in board], ['anna', 'boris'])
+        self.assertAlmostEqual(board[0][2], 0.75)
+        self.assertIsNone(pong_leaderboard.rank('vera', 'win_ratio'))
+        self.assertEqual(pong_leaderboard.rank('vera', 'win_ratio', min_games=1), 1)
+
+    def test_best_streak_and_limit(self):
+        board = pong_leaderboard.top('best_streak', limit=1)
+        self.assertEqual(board, [(1, 'boris', 10, 20)])
+        self.assertIsNone(pong_leaderboard.rank('gleb', 'best_streak'))
+
+    def test_unknown_board(self):
+        with self.assertRaises(ValueError):
+            pong_leaderboard.top('losses')
+
+    def test_uses_index(self):
+        conn = Database.get_connection()
+        for board, (_, value, order) in pong_leaderboard.BOARDS.items():
+            condition, params = pong_leaderboard._filter(board, 10)
+            plan = ' '.join(row[3] for row in conn.execute(
+                f"EXPLAIN QUERY PLAN SELECT username, {value} FROM user_stats "
+                f"WHERE {condition} ORDER BY {order} LIMIT 100", params))
+            self.assertNotIn('TEMP B-TREE', plan, board)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,215 @@
+import os
+import random
+import socket
+import tempfile
+import time
+import unittest
+
+import pong_engine
+import pong_net
+from pong_db import Database
+
+
+class Pipe:
+    """Канал в тиках с задержкой и потерями для проверки без сокетов"""
+
+    def __init__(self, delay, loss, seed):
+        self.delay = delay
+        self.loss = loss
+        self.rng = random.Random(seed)
+        self.queue = []
+
+    def send(self, now, data):
+        if self.rng.random() >= self.loss:
+            self.queue.append((now + self.delay, data))
+
+    def receive(self, now):
+        ready = [data for at, data in self.queue if at <= now]
+        self.queue = [(at, data) for at, data in self.queue if at > now]
+        return ready
+
+
+def simulate(server, clients, moves, ticks, delay=3, loss=0.0):
+    """Прогон сервера и клиентов по тикам; moves(player, seq) - ход игрока"""
+    up = {player: Pipe(delay, loss, player) for player in clients}
+    down = {player: Pipe(delay, loss, player + 10) for player in clients}
+    for now in range(ticks):
+        for player, client in clients.items():
+            for data in down[player].receive(now):
+                client.receive_snapshot(data)
+            if client.server is not None:
+                _, packet = client.local_tick(moves(player, client.seq))
+                up[player].send(now, packet)
+        for player in clients:
+            for data in up[player].receive(now):
+                server.receive_input(player, *pong_net.decode_input(data))
+        server.tick()
+        if server.ticks % pong_net.SNAPSHOT_INTERVAL == 0:
+            for player in clients:
+                down[player].send(now, server.snapshot_for(player))
+
+
+def connect(server):
+    clients = {}
+    for name in ('alice', 'bob'):
+        client = pong_net.ClientPrediction(server.state.rules)
+        client.welcome(server.join(name), server.state.rules.win_score)
+        clients[client.player] = client
+    return clients
+
+
+def hold_up(player, seq):
+    return -1 if player == 1 and seq < 10 else 0
+
+
+class TestProtocol(unittest.TestCase):
+    def test_snapshot_delta(self):
+        state = pong_engine.new_state()
+        base = pong_net.capture(state)
+        full = pong_net.encode_snapshot(1, base, 0)
+        pong_engine.step(state)
+        values = pong_net.capture(state)
+        delta = pong_net.encode_snapshot(2, values, 1, 1, base)
+        self.assertLess(len(delta), len(full))
+        self.assertEqual(pong_net.decode_snapshot(full, {}), (1, base, 0))
+        self.assertEqual(pong_net.decode_snapshot(delta, {1: base}), (2, values, 1))
+        # базы у клиента нет - снимок не применяется
+        self.assertIsNone(pong_net.decode_snapshot(delta, {}))
+
+    def test_input_roundtrip(self):
+        data = pong_net.encode_input(7, 40, [-1, 0, 1])
+        self.assertEqual(pong_net.decode_input(data), (7, 40, [-1, 0, 1]))
+        with self.assertRaises(pong_net.ProtocolError):
+            pong_net.decode_input(data[:-1])
+
+    def test_result_rows(self):
+        rows = pong_net.result_rows({1: 'alice', 2: 'bob'}, 3, 10)
+        self.assertEqual(rows, [('alice', 3, 10, 'Игрок 2'), ('bob', 10, 3, 'Игрок 1')])
+
+
+class TestPrediction(unittest.TestCase):
+    def test_third_player_rejected(self):
+        server = pong_net.ServerMatch()
+        self.assertEqual([server.join(name) for name in 'abc'], [1, 2, 0])
+
+    def test_leave_frees_slot_and_resets_match(self):
+        server = pong_net.ServerMatch()
+        connect(server)
+        server.state.score1 = 3
+        server.leave(1)
+        self.assertFalse(server.ready())
+        self.assertEqual(server.state.score1, 0)
+        self.assertEqual(server.join('vera'), 1)
+        self.assertTrue(server.ready())
+
+    def test_returning_client_keeps_numbering(self):
+        slot = pong_net.PlayerSlot('alice')
+        slot.receive(500, [-1, 1])
+        self.assertEqual(slot.take(), [-1])
+        self.assertEqual(slot.last_seq, 500)
+
+    def check_converges(self, loss):
+        server = pong_net.ServerMatch(pong_engine.Rules(win_score=0))
+        clients = connect(server)
+        simulate(server, clients, hold_up, 120, loss=loss)
+        # все 10 ходов вверх дошли до сервера ровно один раз
+        self.assertEqual(server.state.paddle1_y, 210 - 10 * 10)
+        for client in clients.values():
+            self.assertEqual(client.state.paddle1_y, server.state.paddle1_y)
+
+    def test_converges(self):
+        self.check_converges(0.0)
+
+    def test_converges_with_loss(self):
+        self.check_converges(0.2)
+
+    def test_prediction_keeps_pending_inputs(self):
+        server = pong_net.ServerMatch()
+        client = connect(server)[1]
+        server.tick()
+        client.receive_snapshot(server.snapshot_for(1))
+        for _ in range(3):
+            client.local_tick(-1)
+        server.tick()
+        self.assertTrue(client.receive_snapshot(server.snapshot_for(1)))
+        # сервер ввода еще не видел, а после сверки своя ракетка остается сдвинутой
+        self.assertEqual(server.state.paddle1_y, 210)
+        self.assertEqual(client.state.paddle1_y, 180)
+        self.assertEqual(client.state.ball_x, server.state.ball_x + 3 * 5)
+
+    def test_result_reported(self):
+        rows = []
+        server = pong_net.ServerMatch(pong_engine.Rules(win_score=1), on_result=rows.extend)
+        clients = connect(server)
+        simulate(server, clients, hold_up, 200)
+        self.assertEqual(rows, [('alice', 1, 0, 'Игрок 1'), ('bob', 0, 1, 'Игрок 2')])
+        self.assertEqual(clients[2].server_scores(), (1, 0))
+
+
+class TestLocalhost(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        Database.configure(os.path.join(self.tmp.name, 'net.db'))
+        Database.init_db()
+
+    def tearDown(self):
+        Database.close()
+        self.tmp.cleanup()
+
+    def test_slots_freed_by_bye_and_silence(self):
+        server = pong_net.NetServer('127.0.0.1', 0, timeout=0.3).start()
+        sockets = [socket.socket(socket.AF_INET, socket.SOCK_DGRAM) for _ in range(3)]
+
+        def hello(sock):
+            sock.sendto(pong_net.encode_hello('player'), server.address)
+            return pong_net.WELCOME_FORMAT.unpack(sock.recv(64))[1]
+
+        try:
+            for sock in sockets:
+                sock.settimeout(2)
+            self.assertEqual([hello(sock) for sock in sockets], [1, 2, 0])
+            sockets[0].sendto(pong_net.encode_bye(), server.address)
+            time.sleep(0.05)
+            self.assertEqual(hello(sockets[2]), 1)
+            # оба молчат дольше timeout - места свободны для новой пары
+            deadline = time.monotonic() + 2
+            while server.addresses and time.monotonic() < deadline:
+                time.sleep(0.05)
+            self.assertEqual(server.addresses, {})
+            self.assertFalse(server.match.players)
+            self.assertEqual(hello(sockets[0]), 1)
+        finally:
+            for sock in sockets:
+                sock.close()
+            server.stop()
+
+    def test_match_over_udp(self):
+        server = pong_net.NetServer('127.0.0.1', 0, pong_engine.Rules(win_score=1),
+                                    pong_net.SimulatedLink(0.02, 0.01, 0.1, seed=1)).start()
+        host, port = server.address
+        clients = [pong_net.NetClient(host, port, name,
+                                      pong_net.SimulatedLink(0.02, 0.01, 0.1, seed=i)).start()
+                   for i, name in enumerate(('alice', 'bob'))]
+        try:
+            deadline = time.monotonic() + 10
+            while time.monotonic() < deadline and not all(
+                    Database.get_user_stats(name) for name in ('alice', 'bob')):
+                for client in clients:
+                    client.tick(-1 if client.username == 'alice' and client.prediction.seq < 10 else 0)
+                time.sleep(1 / 60)
+        finally:
+            for client in clients:
+                client.stop()
+            # клиенты отключились с BYE - места освобождены без ожидания тишины
+            deadline = time.monotonic() + 1
+            while server.addresses and time.monotonic() < deadline:
+                time.sleep(0.01)
+            left = not server.addresses
+            server.stop()
+        self.assertTrue(left)
+        games = {name: Database.get_user_games(name)[0][1:] for name in ('alice', 'bob')}
+        self.assertEqual(games, {'alice': (1, 0, 'Игрок 1'), 'bob': (0, 1, 'Игрок 2')})
+        player = {client.username: client.prediction.player for client in clients}
+        self.assertEqual(sorted(player.values()), [1, 2])
+        alice = clients[0].prediction
+        self.assertEqual(alice.server[4 if player['alice'] == 1 else 5], 110)
@@ -0,0 +1,51 @@
+import unittest
+
+import pong_engine
+import pong_render
+
+
+class FakeWidget:
+    def __init__(self):
+        self.calls = []
+
+    def update(self, *rect):
+        self.calls.append(rect)
+
+
+class TestDirtyTracker(unittest.TestCase):
+    def test_only_moved_objects_are_repainted(self):
+        rules = pong_engine.SPEEDUP_RULES
+        widget = FakeWidget()
+        tracker = pong_render.DirtyTracker()
+
+        tracker.invalidate(widget, rules, (400, 250, 210, 210))
+        self.assertEqual(widget.calls, [()])
+
+        widget.calls.clear()
+        tracker.invalidate(widget, rules, (405, 255, 210, 210))
+        self.assertEqual(len(widget.calls), 2)
+        old, new = widget.calls[0][0], widget.calls[1][0]
+        self.assertEqual((old.x(), new.x()), (398, 403))
+        self.assertEqual(new.width(), rules.ball_size + 2 * pong_render.MARGIN)
+
+        widget.calls.clear()
+        tracker.invalidate(widget, rules, (405, 255, 210, 210))
+        self.assertEqual(widget.calls, [])
+
+        tracker.reset()
+        tracker.invalidate(widget, rules, (405, 255, 210, 210))
+        self.assertEqual(widget.calls, [()])
+
+
+    def test_work_counter(self):
+        work = pong_render.WorkCounter()
+        tracker = pong_render.DirtyTracker(work)
+        widget = FakeWidget()
+        for x in range(400, 410):
+            tracker.invalidate(widget, pong_engine.SPEEDUP_RULES, (x, 250, 210, 210))
+            work.end_frame()
+        self.assertEqual(work.per_frame(), {'repaint': (1 + 9 * 2) / 10})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import random
+import unittest
+
+import pong_engine
+import pong_replay
+from pong_replay import Recorder, Replay, ReplayError, ReplayPlayer
+
+
+def record_match(rules, seed, ticks, input_seed=0):
+    """Матч со случайным вводом: запись и снимки состояния по тикам"""
+    state = pong_engine.new_state(rules, seed=123)
+    pong_engine.run(state, 37)   # запись начинается не с нового состояния
+    recorder = Recorder(state, seed)
+    rng = random.Random(input_seed)
+    inputs = pong_engine.NO_INPUT
+    states = [pong_replay.snapshot(state)[:8]]
+    for _ in range(ticks):
+        if rng.random() < 0.05:
+            inputs = (rng.choice((-1, 0, 1)), rng.choice((-1, 0, 1)))
+        recorder.record(inputs)
+        pong_engine.step(state, inputs)
+        states.append(pong_replay.snapshot(state)[:8])
+    return recorder.replay, states
+
+
+class TestReplay(unittest.TestCase):
+    def test_round_trip(self):
+        replay, _ = record_match(pong_engine.SPEEDUP_RULES, 5, 1000)
+        loaded = Replay.loads(replay.dumps())
+        self.assertEqual(loaded.rules, pong_engine.SPEEDUP_RULES)
+        self.assertEqual((loaded.seed, loaded.start, loaded.ticks, loaded.changes),
+                         (replay.seed, replay.start, replay.ticks, replay.changes))
+        self.assertEqual(loaded.input_at(0), replay.input_at(0))
+
+    def test_compact(self):
+        replay, _ = record_match(pong_engine.SPEEDUP_RULES, 5, 3600)
+        # минута игры: заголовок плюс 2 байта на смену ввода
+        self.assertLess(len(replay.dumps()), pong_replay.HEADER.size + 8 + 3 * len(replay.changes))
+
+    def test_deterministic_classic(self):
+        # в CLASSIC отскок от ракетки и подача случайны - повтор держится на зерне
+        replay, states = record_match(pong_engine.CLASSIC_RULES, 99, 5000)
+        player = ReplayPlayer(Replay.loads(replay.dumps()))
+        for expected in states[1:]:
+            player.step()
+            self.assertEqual(pong_replay.snapshot(player.state)[:8], expected)
+        self.assertTrue(player.finished())
+        self.assertEqual(player.step(), 0)
+
+    def test_seek(self):
+        replay, states = record_match(pong_engine.CLASSIC_RULES, 7, 3000)
+        player = ReplayPlayer(replay, keyframe_interval=100)
+        state = player.state
+        for tick in (2500, 120, 120, 2999, 0, 1501, 3000, 5000):
+            player.seek(tick)
+            expected = states[min(tick, 3000)]
+            self.assertIs(player.state, state)
+            self.assertEqual(pong_replay.snapshot(state)[:8], expected, tick)
+
+    def test_corrupt(self):
+        replay, _ = record_match(pong_engine.SPEEDUP_RULES, 5, 100)
+        data = replay.dumps()
+        with self.assertRaises(ReplayError):
+            Replay.loads(b'XXXX' + data[4:])
+        with self.assertRaises(ReplayError):
+            Replay.loads(data[:-1])
+        with self.assertRaises(ReplayError):
+            Replay.loads(data[:10])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+import io
+import os
+import tempfile
+import unittest
+
+import pong_tournament
+from pong_db import Database, ResultWriter
+
+
+class TestTournament(unittest.TestCase):
+    def test_schedule(self):
+        jobs = pong_tournament.schedule(['easy', 'hard'], 3)
+        self.assertEqual(len(jobs), 6)
+        self.assertEqual([index for index, _, _ in jobs], list(range(6)))
+        self.assertEqual(jobs[0][1:], ('easy', 'hard'))
+        self.assertEqual(jobs[-1][1:], ('hard', 'easy'))
+
+    def test_match_is_deterministic(self):
+        job = (5, 'easy', 'normal')
+        first = pong_tournament.play_match(job, seed=7)
+        self.assertEqual(first, pong_tournament.play_match(job, seed=7))
+        self.assertEqual(max(first[3:5]), 10)
+        self.assertFalse(first[-1])
+
+    def test_max_ticks_draw(self):
+        result = pong_tournament.play_match((0, 'hard', 'hard'), max_ticks=100)
+        self.assertEqual(result[3:], (0, 0, 100, True))
+        self.assertEqual(pong_tournament.result_row(result),
+                         ('cpu:hard', 0, 0, pong_tournament.DRAW))
+
+    def test_capped_match_with_lead_is_draw(self):
+        # за 3000 тиков кто-то ведет, но до 10 очков не доходит
+        result = pong_tournament.play_match((0, 'easy', 'hard'), max_ticks=3000)
+        self.assertTrue(result[-1])
+        self.assertNotEqual(result[3], result[4])
+        self.assertEqual(pong_tournament.result_row(result)[3], pong_tournament.DRAW)
+        table = pong_tournament.run(['easy', 'hard'], 3, workers=1, max_ticks=3000)
+        self.assertEqual(table[('easy', 'hard')], [0, 0, 3])
+
+    def test_parallel_matches_serial(self):
+        levels = ['easy', 'normal']
+        serial = pong_tournament.run(levels, 2, seed=3, workers=1, win_score=3)
+        parallel = pong_tournament.run(levels, 2, seed=3, workers=2, win_score=3)
+        self.assertEqual(serial, parallel)
+        self.assertEqual(sum(sum(cell) for cell in serial.values()), 4)
+
+    def test_results_written(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            Database.configure(os.path.join(tmp, 'tournament.db'))
+            Database.init_db()
+            writer = ResultWriter(batch_size=4)
+            progress = pong_tournament.Progress(6, out=io.StringIO())
+            pong_tournament.run(['easy', 'hard'], 3, workers=1, win_score=2,
+                                writer=writer, progress=progress)
+            writer.close()
+            self.assertEqual(progress.done, 6)
+            self.assertEqual(len(Database.get_user_games('cpu:easy')), 3)
+            self.assertEqual(Database.get_user_stats('cpu:hard')['games'], 3)
+            Database.close()
+
+
+if __name__ == '__main__':
+    unittest.main()